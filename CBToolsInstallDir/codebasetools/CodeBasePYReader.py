@@ -0,0 +1,2665 @@
+"""
+------------------------------------------------------
+CodeBasePYReader Pure Python Read-Only Table Engine
+------------------------------------------------------
+
+The CodeBasePYReader module is a pure Python, read-only stand-in for the compiled CodeBasePYWrapperXX.pyd
+engine used by CodeBaseTools.  It exposes the same module level function names and return value conventions
+as the compiled engine for the operations which do not change data, so an instance of _cbTools() can be
+built on top of it without any changes to calling code.  It is intended for environments where no compiled
+engine is available, like Linux servers and containers, and for versions of Python for which the .pyd has
+not yet been built.
+
+Select it explicitly with:
+::
+    oCBT = CodeBaseTools.cbToolsX(cEngine="READER")
+
+When no compiled engine matches the running Python, CodeBaseTools loads this module automatically.
+
+How the data is read
+--------------------
+The .DBF file is memory mapped read-only when the table is opened.  The table header and field definitions
+are parsed once, and field values are decoded directly from the mapped record area with struct.unpack_from()
+or by slicing just the bytes of the field required, so no copy of the full record is ever built.  Memo fields
+(types M, X and G) are read from the .FPT file, which is also memory mapped, using the block number stored in
+the record.  Since the operating system shares the page cache for mapped files, many worker processes reading
+the same table share one copy of the data in memory.
+
+The extra function tocolumns(), used by _cbTools.tocolumns(), takes advantage of the mapped record area by
+slicing each field out of all the selected records at once with numpy, when numpy is installed.
+
+The production .CDX index is also mapped if present.  Index tags can be listed with ataginfo(), made the
+current order with setorderto(), and used by seek().  Keys are read from the leaf nodes of the compact
+index B-Tree.  No index keys are ever computed by this module, so the index file must be current.
+
+Field types supported are the ones listed in the CodeBaseTools module docstring: C, N, F, B, I, L, D, T, Y,
+M, Z (Char binary), X (Memo binary) and G.  Null values in Visual FoxPro tables are honored.
+
+Filter expressions
+------------------
+Logical expressions passed to locate(), count(), calcstats() and the scan() filters are evaluated by a
+small interpreter for the subset of the VFP expression language CodeBase itself supports: field names,
+literals of all basic types, the arithmetic, comparison, $ and logical operators, and commonly used
+functions like UPPER(), ALLTRIM(), DTOS(), STOD(), STR(), VAL(), EMPTY(), DELETED() and IIF().  String
+comparison with '=' follows the VFP SET EXACT OFF rule.
+
+Limitations
+-----------
+- Nothing can be written.  Every engine function that would change a table, index or memo returns the
+  failure value the compiled engine returns, and sets the error number to -79001.
+- Tables are always opened shared and read-only.  useexcl() fails.
+- Temporary indexes (maketempindex()) are not available.
+- Changes made by other processes become visible after refreshbuffers(), which re-maps the files.
+- Calls from several threads are serialized by one engine lock, even when they use different session
+  handles.  The handles keep the sessions, error messages and tallies apart, but there is no parallel work.
+"""
+
+from __future__ import print_function, absolute_import
+import os
+import sys
+import mmap
+import struct
+import decimal
+import bisect
+import collections
+import threading
+from datetime import date, datetime, timedelta
+
+if sys.version_info[0] <= 2:
+    _ver3x = False
+    xLongType = long
+    xStrTypes = (str, unicode)
+else:
+    _ver3x = True
+    xLongType = int
+    xStrTypes = (str,)
+
+__author__ = "Jim Heuer"
+__version__ = "1.00"
+__copyright__ = "M-P System Services, Inc., Portland, OR, 2008-2020"
+
+ENGINE_NAME = "READER"
+
+MAXDATASESSIONS = 100
+JULIAN_OFFSET = 1721425  # VFP Julian day number minus the Python date ordinal
+NOT_AVAILABLE = -79001
+
+gcErrorMessage = ""
+gnLastErrorNumber = 0
+gnProcessTally = 0
+gcCustomCodePage = "cp1252"
+gbDebugMode = False
+
+gxSessions = dict()
+gnCurrentSession = -1
+goSession = None
+
+_xDateFormats = {"AMERICAN": "MM/DD/YY", "ANSI": "YY.MM.DD", "BRITISH": "DD/MM/YY", "FRENCH": "DD/MM/YY",
+                 "GERMAN": "DD.MM.YY", "ITALIAN": "DD-MM-YY", "JAPAN": "YY/MM/DD", "TAIWAN": "YY/MM/DD",
+                 "USA": "MM-DD-YY", "MDY": "MM/DD/YY", "DMY": "DD/MM/YY", "YMD": "YY/MM/DD"}
+
+
+def _seterror(cMessage, nNumber):
+    global gcErrorMessage, gnLastErrorNumber
+    gcErrorMessage = cMessage
+    gnLastErrorNumber = nNumber
+
+
+def _clearerror():
+    global gcErrorMessage, gnLastErrorNumber
+    gcErrorMessage = ""
+    gnLastErrorNumber = 0
+
+
+def _asstr(xValue):
+    if not _ver3x and isinstance(xValue, unicode):
+        return xValue.encode("cp1252", "replace")
+    return xValue
+
+
+def _tobytes(cValue):
+    if isinstance(cValue, bytes):
+        return cValue
+    return cValue.encode("cp1252", "replace")
+
+
+def _frombytes(cValue):
+    if _ver3x:
+        return cValue.decode("latin-1")
+    return cValue
+
+
+def _decodemulti(cRaw):
+    """ Windows Double Byte decoding.  Falls back to cp1252 where the mbcs codec doesn't exist. """
+    try:
+        return cRaw.decode("mbcs", "replace")
+    except LookupError:
+        return cRaw.decode("cp1252", "replace")
+
+
+def jdn2date(nJulian):
+    """ Converts a VFP Julian Day Number into a Python date.  Returns None for the empty date. """
+    if nJulian <= JULIAN_OFFSET:
+        return None
+    try:
+        return date.fromordinal(nJulian - JULIAN_OFFSET)
+    except (ValueError, OverflowError):
+        return None
+
+
+def date2jdn(dValue):
+    """ Converts a Python date (or datetime) into the VFP Julian Day Number. """
+    return dValue.toordinal() + JULIAN_OFFSET
+
+
+# **************************************************************************************************
+# Session and Table objects.  These hold the state the compiled engine keeps for each data session.
+# **************************************************************************************************
+
+class _ReaderSession(object):
+    """
+    Equivalent of one entry in the compiled engine's gaSessions[] array.  Holds the open tables, the
+    currently selected table and the DELETED, filter and locate settings for one data session.
+    """
+    def __init__(self, bLargeMode=False):
+        self.bLargeMode = bool(bLargeMode)
+        self.xTables = collections.OrderedDict()  # Keyed by upper case alias.
+        self.oCurrent = None
+        self.bDeleted = False
+        self.cDateFormat = "MM/DD/YY"
+        self.xFilter = None
+        self.oFilterTable = None
+        self.xLocate = None
+        self.oLocateTable = None
+
+    def closeall(self):
+        for oTable in list(self.xTables.values()):
+            oTable.close()
+        self.xTables.clear()
+        self.oCurrent = None
+        self.xFilter = None
+        self.oFilterTable = None
+        self.xLocate = None
+        self.oLocateTable = None
+
+
+class _ReaderField(object):
+    """
+    Parsed field descriptor from the .DBF header.  cType is the type code as reported by the compiled engine,
+    that is, binary Char and Memo fields are reported as Z and X.
+    """
+    __slots__ = ("cName", "cType", "cRawType", "nOffset", "nWidth", "nDecimals", "bNulls", "bBinary",
+                 "bSystem", "nNullBit")
+
+    def __init__(self):
+        self.cName = ""
+        self.cType = ""
+        self.cRawType = ""
+        self.nOffset = 0
+        self.nWidth = 0
+        self.nDecimals = 0
+        self.bNulls = False
+        self.bBinary = False
+        self.bSystem = False
+        self.nNullBit = -1
+
+
+class _ReaderMemo(object):
+    """ Memory mapped .FPT memo file. """
+    def __init__(self, cPath):
+        self.cPath = cPath
+        self.oFile = open(cPath, "rb")
+        self.xMap = mmap.mmap(self.oFile.fileno(), 0, access=mmap.ACCESS_READ)
+        self.nBlockSize = struct.unpack_from(">H", self.xMap, 6)[0]
+        if self.nBlockSize == 0:
+            self.nBlockSize = 1  # VFP allows a block size of 1 byte when set to 0.
+
+    def read(self, nBlock):
+        """ Returns the raw bytes stored for the memo starting at block nBlock.  Empty bytes for block 0. """
+        if nBlock <= 0:
+            return b""
+        nOffset = nBlock * self.nBlockSize
+        if nOffset + 8 > len(self.xMap):
+            raise ValueError("Memo block out of range")
+        nLength = struct.unpack_from(">I", self.xMap, nOffset + 4)[0]
+        return self.xMap[nOffset + 8:nOffset + 8 + nLength]
+
+    def close(self):
+        if self.xMap is not None:
+            self.xMap.close()
+            self.oFile.close()
+        self.xMap = None
+
+
+class _ReaderTag(object):
+    """
+    One tag from the compact .CDX index.  The key/recno pairs are read from the leaf level of the B-Tree when
+    first needed and kept in ascending key order.  Descending tags are traversed in reverse.
+    """
+    def __init__(self, oIndex, cName, nHeaderOffset):
+        self.oIndex = oIndex
+        self.cName = cName
+        self.nHeaderOffset = nHeaderOffset
+        xMap = oIndex.xMap
+        self.nRoot = struct.unpack_from("<I", xMap, nHeaderOffset)[0]
+        self.nKeyLen = struct.unpack_from("<H", xMap, nHeaderOffset + 12)[0]
+        self.nOptions = struct.unpack_from("<B", xMap, nHeaderOffset + 14)[0]
+        self.bDescending = struct.unpack_from("<H", xMap, nHeaderOffset + 502)[0] == 1
+        nForLen = struct.unpack_from("<H", xMap, nHeaderOffset + 506)[0]
+        xPool = xMap[nHeaderOffset + 512:nHeaderOffset + 1024]
+        xParts = xPool.split(b"\x00")
+        self.cExpr = _frombytes(xParts[0]).strip()
+        self.cFilter = ""
+        if (self.nOptions & 0x08) and nForLen > 1 and len(xParts) > 1:
+            self.cFilter = _frombytes(xParts[1]).strip()
+        self.cTrail = b" "
+        self.cKeyType = "C"
+        self.xKeys = None
+        self.xRecnos = None
+        self.xPosByRecno = None
+
+    def unique(self):
+        if self.nOptions & 0x04:
+            return 15  # Candidate
+        if self.nOptions & 0x01:
+            return 25
+        return 0
+
+    def load(self):
+        """ Reads every key in the tag from the leaf nodes, left to right. """
+        if self.xKeys is not None:
+            return
+        xMap = self.oIndex.xMap
+        xKeys = list()
+        xRecnos = list()
+        nNode = self.nRoot
+        # Walk down the left edge of the tree to the first leaf.
+        while True:
+            nAttr = struct.unpack_from("<H", xMap, nNode)[0]
+            if nAttr & 0x02:
+                break
+            nNode = struct.unpack_from(">I", xMap, nNode + 12 + self.nKeyLen + 4)[0]
+        while nNode not in (0, 0xFFFFFFFF):
+            self._readleaf(nNode, xKeys, xRecnos)
+            nNode = struct.unpack_from("<I", xMap, nNode + 8)[0]
+        self.xKeys = xKeys
+        self.xRecnos = xRecnos
+
+    def _readleaf(self, nNode, xKeys, xRecnos):
+        xMap = self.oIndex.xMap
+        nCount = struct.unpack_from("<H", xMap, nNode + 2)[0]
+        nRecMask = struct.unpack_from("<I", xMap, nNode + 14)[0]
+        nDupMask, nTrailMask, nRecBits, nDupBits, nTrailBits, nInfoLen = \
+            struct.unpack_from("<6B", xMap, nNode + 18)
+        nKeyLen = self.nKeyLen
+        nInfo = nNode + 24
+        nKeyPos = nNode + 512
+        cPrior = b""
+        for jj in range(nCount):
+            nBits = 0
+            for kk in range(nInfoLen - 1, -1, -1):
+                nBits = (nBits << 8) | struct.unpack_from("<B", xMap, nInfo + kk)[0]
+            nInfo += nInfoLen
+            nRecno = nBits & nRecMask
+            nDup = (nBits >> nRecBits) & nDupMask
+            nTrail = (nBits >> (nRecBits + nDupBits)) & nTrailMask
+            nNew = nKeyLen - nDup - nTrail
+            nKeyPos -= nNew
+            cKey = cPrior[:nDup] + xMap[nKeyPos:nKeyPos + nNew] + self.cTrail * nTrail
+            xKeys.append(cKey)
+            xRecnos.append(nRecno)
+            cPrior = cKey
+
+    def count(self):
+        self.load()
+        return len(self.xRecnos)
+
+    def recno(self, nPos):
+        """ Record number at logical position nPos (honoring descending order). """
+        if self.bDescending:
+            return self.xRecnos[len(self.xRecnos) - 1 - nPos]
+        return self.xRecnos[nPos]
+
+    def position(self, nRecno):
+        """ Logical position of the record nRecno in this tag, or -1 if the tag doesn't include it. """
+        self.load()
+        if self.xPosByRecno is None:
+            self.xPosByRecno = dict()
+            nLast = len(self.xRecnos) - 1
+            for jj, nRec in enumerate(self.xRecnos):
+                self.xPosByRecno[nRec] = (nLast - jj if self.bDescending else jj)
+        return self.xPosByRecno.get(nRecno, -1)
+
+    def find(self, cTarget):
+        """
+        Returns the logical position of the first key which starts with cTarget, or -1.  The second
+        element of the returned tuple is the ascending index where the search stopped.
+        """
+        self.load()
+        nIdx = bisect.bisect_left(self.xKeys, cTarget)
+        if nIdx < len(self.xKeys) and self.xKeys[nIdx][:len(cTarget)] == cTarget:
+            if self.bDescending:
+                # In descending order the first matching key is the last one in ascending order.
+                nHigh = nIdx
+                while nHigh + 1 < len(self.xKeys) and self.xKeys[nHigh + 1][:len(cTarget)] == cTarget:
+                    nHigh += 1
+                return len(self.xKeys) - 1 - nHigh
+            return nIdx
+        return -1
+
+    def reset(self):
+        self.xKeys = None
+        self.xRecnos = None
+        self.xPosByRecno = None
+
+
+class _ReaderIndex(object):
+    """ Memory mapped production .CDX file and its tags. """
+    def __init__(self, cPath):
+        self.cPath = cPath
+        self.oFile = open(cPath, "rb")
+        self.xMap = mmap.mmap(self.oFile.fileno(), 0, access=mmap.ACCESS_READ)
+        # The file header is itself a tag whose keys are the tag names and whose record numbers point at the
+        # headers of the tags.
+        oDirectory = _ReaderTag(self, "", 0)
+        oDirectory.cTrail = b" "
+        oDirectory.load()
+        xFound = list()
+        for cKey, nOffset in zip(oDirectory.xKeys, oDirectory.xRecnos):
+            cName = _frombytes(cKey.rstrip(b" \x00")).upper()
+            xFound.append((nOffset, cName))
+        xFound.sort()  # Creation order, which is the order VFP reports them in.
+        self.xTags = collections.OrderedDict()
+        for nOffset, cName in xFound:
+            self.xTags[cName] = _ReaderTag(self, cName, nOffset)
+
+    def close(self):
+        if self.xMap is not None:
+            self.xMap.close()
+            self.oFile.close()
+        self.xMap = None
+        self.xTags = collections.OrderedDict()
+
+
+class _ReaderTable(object):
+    """
+    One open .DBF table.  The record pointer is kept as a logical position within the current order (record
+    number order when no tag is selected).  Position -1 is BOF and position == count() is EOF.
+    """
+    def __init__(self, cPath, cAlias):
+        self.cPath = os.path.abspath(cPath)
+        self.cAlias = cAlias
+        self.oFile = None
+        self.xMap = None
+        self.oMemo = None
+        self.oIndex = None
+        self.oOrder = None
+        self.nPos = 0
+        self.bEof = False
+        self.bBof = False
+        self._open()
+
+    def _open(self):
+        self.oFile = open(self.cPath, "rb")
+        self.xMap = mmap.mmap(self.oFile.fileno(), 0, access=mmap.ACCESS_READ)
+        self._readheader()
+        if self.bHasMemo:
+            cMemo = self._companion(".FPT")
+            if cMemo:
+                self.oMemo = _ReaderMemo(cMemo)
+        if self.bHasIndex:
+            cIndex = self._companion(".CDX")
+            if cIndex:
+                self.oIndex = _ReaderIndex(cIndex)
+                for oTag in self.oIndex.xTags.values():
+                    self._settagtype(oTag)
+
+    def _companion(self, cExt):
+        cBase = os.path.splitext(self.cPath)[0]
+        for cTry in (cBase + cExt, cBase + cExt.lower()):
+            if os.path.exists(cTry):
+                return cTry
+        return ""
+
+    def _readheader(self):
+        xMap = self.xMap
+        if len(xMap) < 32:
+            raise ValueError("Not a DBF table")
+        self.nVersion = struct.unpack_from("<B", xMap, 0)[0]
+        self.nHeaderRecCount = struct.unpack_from("<I", xMap, 4)[0]
+        self.nHeaderLen, self.nRecLen = struct.unpack_from("<HH", xMap, 8)
+        nFlags = struct.unpack_from("<B", xMap, 28)[0]
+        self.bHasIndex = bool(nFlags & 0x01)
+        self.xFields = list()
+        self.xFieldDict = dict()
+        self.oNullFlags = None
+        nPos = 32
+        nAutoOffset = 1
+        nNullBit = 0
+        while nPos + 32 <= self.nHeaderLen and struct.unpack_from("<B", xMap, nPos)[0] != 0x0D:
+            oFld = _ReaderField()
+            oFld.cName = _frombytes(xMap[nPos:nPos + 11].split(b"\x00")[0]).strip().upper()
+            oFld.cRawType = _frombytes(xMap[nPos + 11:nPos + 12]).upper()
+            oFld.nOffset = struct.unpack_from("<I", xMap, nPos + 12)[0]
+            oFld.nWidth, oFld.nDecimals, nFldFlags = struct.unpack_from("<BBB", xMap, nPos + 16)
+            if oFld.nOffset == 0:
+                oFld.nOffset = nAutoOffset  # FoxPro 2.x and dBase tables don't store the displacement.
+            nAutoOffset = oFld.nOffset + oFld.nWidth
+            oFld.bSystem = bool(nFldFlags & 0x01) or oFld.cRawType == "0"
+            oFld.bNulls = bool(nFldFlags & 0x02)
+            oFld.bBinary = bool(nFldFlags & 0x04) or oFld.cRawType == "G"
+            oFld.cType = oFld.cRawType
+            if oFld.bBinary and oFld.cRawType == "C":
+                oFld.cType = "Z"
+            elif oFld.bBinary and oFld.cRawType == "M":
+                oFld.cType = "X"
+            if oFld.cRawType in ("V", "Q"):
+                nNullBit += 1  # Varlength flag comes first.
+            if oFld.bNulls:
+                oFld.nNullBit = nNullBit
+                nNullBit += 1
+            if oFld.cRawType == "0":
+                self.oNullFlags = oFld
+            if not oFld.bSystem:
+                self.xFields.append(oFld)
+                self.xFieldDict[oFld.cName] = oFld
+            nPos += 32
+        self.bHasMemo = any(oF.cRawType in ("M", "G") for oF in self.xFields)
+        self.nRecCount = self.nHeaderRecCount
+        if self.nRecLen > 0:
+            # Never trust the header beyond the mapped size.  Another process may be part way through an append.
+            self.nRecCount = min(self.nHeaderRecCount, (len(xMap) - self.nHeaderLen) // self.nRecLen)
+
+    def _settagtype(self, oTag):
+        """ Works out whether keys are character or binary numeric from the key expression. """
+        cExpr = oTag.cExpr.upper()
+        oFld = self.xFieldDict.get(cExpr)
+        if oFld is not None and oFld.cType in ("N", "F", "B", "I", "Y", "D", "T"):
+            oTag.cKeyType = oFld.cType
+            oTag.cTrail = b"\x00"
+        elif oFld is not None and oFld.cType == "L":
+            oTag.cKeyType = "L"
+        else:
+            oTag.cKeyType = "C"
+
+    def close(self):
+        if self.oIndex is not None:
+            self.oIndex.close()
+        if self.oMemo is not None:
+            self.oMemo.close()
+        if self.xMap is not None:
+            self.xMap.close()
+            self.oFile.close()
+        self.xMap = None
+        self.oMemo = None
+        self.oIndex = None
+
+    def refresh(self):
+        """ Re-maps all files to pick up changes by other processes.  Keeps the current record and order. """
+        nRecno = self.recno()
+        cOrder = (self.oOrder.cName if self.oOrder is not None else "")
+        self.close()
+        self.oOrder = None
+        self._open()
+        if cOrder and self.oIndex is not None:
+            self.oOrder = self.oIndex.xTags.get(cOrder)
+        if 0 < nRecno <= self.nRecCount:
+            self.gotorecord(nRecno)
+        else:
+            self.nPos = self.count()
+            self.bEof = True
+
+    # Position handling
+    def count(self):
+        if self.oOrder is not None:
+            return self.oOrder.count()
+        return self.nRecCount
+
+    def recat(self, nPos):
+        if self.oOrder is not None:
+            return self.oOrder.recno(nPos)
+        return nPos + 1
+
+    def recno(self):
+        """ Record number of the current record.  Returns reccount() + 1 at EOF like VFP. """
+        if self.bEof or self.nPos >= self.count():
+            return self.nRecCount + 1
+        if self.nPos < 0:
+            return self.recat(0) if self.count() > 0 else 1
+        return self.recat(self.nPos)
+
+    def isdeleted(self, nRecno):
+        return self.xMap[self.recoffset(nRecno):self.recoffset(nRecno) + 1] == b"*"
+
+    def recoffset(self, nRecno):
+        return self.nHeaderLen + (nRecno - 1) * self.nRecLen
+
+    def moveto(self, nPos, nDirection, bSkipDeleted):
+        """
+        Puts the pointer at logical position nPos, and if bSkipDeleted, then keeps moving in nDirection
+        until a non-deleted record is found.  Returns True if positioned on a record.
+        """
+        nCount = self.count()
+        if bSkipDeleted:
+            while 0 <= nPos < nCount and self.isdeleted(self.recat(nPos)):
+                nPos += nDirection
+        self.bEof = False
+        self.bBof = False
+        if nPos >= nCount:
+            self.nPos = nCount
+            self.bEof = True
+            return False
+        if nPos < 0:
+            self.nPos = -1
+            self.bBof = True
+            return False
+        self.nPos = nPos
+        return True
+
+    def gotorecord(self, nRecno):
+        """ Direct move to a record number.  Deleted records are allowed, as with the compiled engine. """
+        self.bEof = False
+        self.bBof = False
+        if self.oOrder is None:
+            self.nPos = nRecno - 1
+        else:
+            nPos = self.oOrder.position(nRecno)
+            if nPos < 0:
+                # Record is excluded by the tag FOR filter.  VFP still goes there, we just can't skip from it.
+                self.nPos = self.count()
+                self.bEof = True
+                return False
+            self.nPos = nPos
+        return True
+
+    def setorder(self, oTag):
+        nRecno = (self.recno() if (not self.bEof and 0 <= self.nPos < self.count()) else 0)
+        self.oOrder = oTag
+        if nRecno > 0:
+            self.gotorecord(nRecno)
+
+    # Field value handling
+    def isnull(self, oFld, nRecOffset):
+        if oFld.nNullBit < 0 or self.oNullFlags is None:
+            return False
+        nByte = struct.unpack_from("<B", self.xMap, nRecOffset + self.oNullFlags.nOffset + oFld.nNullBit // 8)[0]
+        return bool((nByte >> (oFld.nNullBit % 8)) & 1)
+
+    def rawfield(self, oFld, nRecOffset):
+        return self.xMap[nRecOffset + oFld.nOffset:nRecOffset + oFld.nOffset + oFld.nWidth]
+
+    def memoblock(self, oFld, nRecOffset):
+        if oFld.nWidth == 4:
+            return struct.unpack_from("<i", self.xMap, nRecOffset + oFld.nOffset)[0]
+        cRaw = self.rawfield(oFld, nRecOffset).strip()
+        return int(cRaw) if cRaw else 0
+
+    def memoraw(self, oFld, nRecOffset):
+        if self.oMemo is None:
+            raise ValueError("Memo file not found for " + self.cPath)
+        return self.oMemo.read(self.memoblock(oFld, nRecOffset))
+
+    def value(self, oFld, nRecno, bConvert=True, bStrip=False, cCodeAsc="X", cCodeBin="X"):
+        """
+        Decodes one field of record nRecno directly from the map.  Follows the type conversion rules of
+        cbxGetPythonValue() in the compiled engine.
+        """
+        nRecOffset = self.recoffset(nRecno)
+        if oFld.bNulls and self.isnull(oFld, nRecOffset):
+            return None if bConvert else ".NULL."
+        cType = oFld.cType
+        if cType in ("C", "Z", "M", "X", "G"):
+            if cType in ("C", "Z"):
+                cRaw = self.rawfield(oFld, nRecOffset)
+            else:
+                cRaw = self.memoraw(oFld, nRecOffset)
+            if cType in ("C", "M"):
+                return _maketext(cRaw, cCodeAsc, bStrip)
+            return _makebinary(cRaw, cCodeBin, bStrip)
+        if cType == "I":
+            nValue = struct.unpack_from("<i", self.xMap, nRecOffset + oFld.nOffset)[0]
+            return nValue if bConvert else "%d" % nValue
+        if cType in ("N", "F"):
+            cRaw = _frombytes(self.rawfield(oFld, nRecOffset))
+            if not bConvert:
+                return cRaw
+            cRaw = cRaw.strip()
+            try:
+                return float(cRaw) if cRaw else 0.0
+            except ValueError:
+                return 0.0
+        if cType == "B":
+            nValue = struct.unpack_from("<d", self.xMap, nRecOffset + oFld.nOffset)[0]
+            return nValue if bConvert else "%.*f" % (oFld.nDecimals, nValue)
+        if cType == "L":
+            cRaw = _frombytes(self.rawfield(oFld, nRecOffset))
+            return (cRaw in ("T", "t", "Y", "y")) if bConvert else cRaw
+        if cType == "D":
+            cRaw = _frombytes(self.rawfield(oFld, nRecOffset))
+            if not bConvert:
+                return cRaw
+            try:
+                if int(cRaw[0:4]) < 200:
+                    return None
+                return date(int(cRaw[0:4]), int(cRaw[4:6]), int(cRaw[6:8]))
+            except ValueError:
+                return None
+        if cType == "T":
+            nJulian, nMillis = struct.unpack_from("<ii", self.xMap, nRecOffset + oFld.nOffset)
+            dDate = jdn2date(nJulian)
+            if dDate is None or dDate.year < 200:
+                return None if bConvert else ""
+            tValue = datetime(dDate.year, dDate.month, dDate.day) + timedelta(seconds=(nMillis + 500) // 1000)
+            if bConvert:
+                return tValue
+            return tValue.strftime("%Y%m%d%H%M%S") + "000"
+        if cType == "Y":
+            nValue = struct.unpack_from("<q", self.xMap, nRecOffset + oFld.nOffset)[0]
+            cValue = str(decimal.Decimal(nValue).scaleb(-4).quantize(decimal.Decimal("0.0001")))
+            return decimal.Decimal(cValue) if bConvert else cValue
+        return _frombytes(self.rawfield(oFld, nRecOffset))
+
+    def blankvalue(self, oFld, bBinaryAsUnicode=True):
+        cType = oFld.cType
+        if cType in ("C", "M"):
+            return ""
+        if cType in ("Z", "X", "G"):
+            return "" if bBinaryAsUnicode else b""
+        if cType == "I":
+            return 0
+        if cType in ("N", "F", "B"):
+            return 0.0
+        if cType == "Y":
+            return decimal.Decimal("0.0000")
+        if cType == "L":
+            return False
+        return None
+
+
+def _codes(cCoding):
+    """ Splits the coding parameter into its text and binary conversion codes. """
+    cCodeAsc = "X"
+    cCodeBin = "X"
+    if not cCoding:
+        return cCodeAsc, cCodeBin
+    for cC in cCoding[:2]:
+        if cC in "W8" and cCodeAsc == "X":
+            cCodeAsc = cC
+        if cC in "DUCPA" and cCodeBin == "X":
+            cCodeBin = cC
+    return cCodeAsc, cCodeBin
+
+
+def _maketext(cRaw, cCodeAsc, bStrip):
+    if cCodeAsc == "W":
+        return _decodemulti(cRaw)
+    if cCodeAsc == "8":
+        return cRaw.decode("utf-8", "replace")
+    if bStrip:
+        cRaw = cRaw.rstrip(b" ")
+    if not _ver3x:
+        return cRaw.split(b"\x00")[0]
+    return cRaw.decode("latin-1")
+
+
+def _makebinary(cRaw, cCodeBin, bStrip):
+    if cCodeBin == "D":
+        return _decodemulti(cRaw)
+    if cCodeBin == "U":
+        return cRaw.decode("utf-8", "replace")
+    if cCodeBin == "C":
+        return cRaw.decode(gcCustomCodePage, "replace")
+    if bStrip:
+        cRaw = cRaw.rstrip(b" ")
+    return cRaw if _ver3x else bytearray(cRaw)
+
+
+# **************************************************************************************************
+# Expression interpreter for filter, locate, count and calcstats expressions.
+# **************************************************************************************************
+
+class _ExprError(Exception):
+    pass
+
+
+def _islogicalop(cExpr, nPos):
+    cTest = cExpr[nPos:nPos + 7].upper()
+    return any(cTest.startswith(cOp) for cOp in (".AND.", ".OR.", ".NOT.", ".T.", ".F.", ".NULL."))
+
+
+def _tokenize(cExpr):
+    xTokens = list()
+    nPos = 0
+    nLen = len(cExpr)
+    while nPos < nLen:
+        c = cExpr[nPos]
+        if c.isspace():
+            nPos += 1
+            continue
+        if c in "\"'[":
+            cEnd = "]" if c == "[" else c
+            nEnd = cExpr.find(cEnd, nPos + 1)
+            if nEnd < 0:
+                raise _ExprError("Unterminated string in expression")
+            xTokens.append(("STR", cExpr[nPos + 1:nEnd]))
+            nPos = nEnd + 1
+            continue
+        if c == ".":
+            nEnd = cExpr.find(".", nPos + 1)
+            cWord = cExpr[nPos:nEnd + 1].upper() if nEnd > 0 else ""
+            if cWord in (".AND.", ".OR.", ".NOT.", ".T.", ".F.", ".NULL.", ".Y.", ".N."):
+                xTokens.append(("OP", cWord) if cWord in (".AND.", ".OR.", ".NOT.") else ("LIT", cWord))
+                nPos = nEnd + 1
+                continue
+        if c.isdigit() or (c == "." and nPos + 1 < nLen and cExpr[nPos + 1].isdigit()):
+            nEnd = nPos
+            while nEnd < nLen and (cExpr[nEnd].isdigit() or
+                                   (cExpr[nEnd] == "." and nEnd + 1 < nLen and cExpr[nEnd + 1].isdigit())):
+                nEnd += 1
+            cNum = cExpr[nPos:nEnd]
+            xTokens.append(("NUM", float(cNum) if "." in cNum else int(cNum)))
+            nPos = nEnd
+            continue
+        if c.isalpha() or c == "_":
+            nEnd = nPos
+            while nEnd < nLen and (cExpr[nEnd].isalnum() or cExpr[nEnd] in "_."):
+                if cExpr[nEnd] == "." and (_islogicalop(cExpr, nEnd) or
+                                           not (nEnd + 1 < nLen and (cExpr[nEnd + 1].isalpha() or
+                                                                     cExpr[nEnd + 1] == "_"))):
+                    break  # Either an operator like .AND. or not an alias.fieldname reference.
+                nEnd += 1
+            xTokens.append(("NAME", cExpr[nPos:nEnd].upper()))
+            nPos = nEnd
+            continue
+        for cOp in ("==", "<>", "!=", "<=", ">=", "**"):
+            if cExpr.startswith(cOp, nPos):
+                xTokens.append(("OP", cOp))
+                nPos += 2
+                break
+        else:
+            if c in "=<>#+-*/%^()$!,":
+                xTokens.append(("OP", c))
+                nPos += 1
+            else:
+                raise _ExprError("Unrecognized character in expression: " + c)
+    return xTokens
+
+
+def _padcompare(xLeft, xRight):
+    """ VFP style blank padded comparison of two strings.  Returns -1, 0 or 1. """
+    nLen = max(len(xLeft), len(xRight))
+    xLeft = xLeft.ljust(nLen)
+    xRight = xRight.ljust(nLen)
+    return (xLeft > xRight) - (xLeft < xRight)
+
+
+def _vfpequal(xLeft, xRight, bExact):
+    if xLeft is None or xRight is None:
+        return None
+    if isinstance(xLeft, xStrTypes) and isinstance(xRight, xStrTypes):
+        if bExact:
+            return xLeft.rstrip() == xRight.rstrip()
+        # SET EXACT OFF: compare only to the length of the right hand side.
+        return xLeft.ljust(len(xRight))[:len(xRight)] == xRight
+    if isinstance(xLeft, date) and isinstance(xRight, date) and \
+            isinstance(xLeft, datetime) != isinstance(xRight, datetime):
+        return _ttod(xLeft) == _ttod(xRight)  # Date compared with datetime compares just the dates.
+    return xLeft == xRight
+
+
+def _compare(cOp, xLeft, xRight):
+    if cOp in ("=", "=="):
+        return _vfpequal(xLeft, xRight, cOp == "==")
+    if cOp in ("<>", "!=", "#"):
+        bEq = _vfpequal(xLeft, xRight, False)
+        return None if bEq is None else not bEq
+    if xLeft is None or xRight is None:
+        return None
+    if isinstance(xLeft, xStrTypes) and isinstance(xRight, xStrTypes):
+        nCmp = _padcompare(xLeft, xRight)
+    else:
+        nCmp = (xLeft > xRight) - (xLeft < xRight)
+    if cOp == "<":
+        return nCmp < 0
+    if cOp == ">":
+        return nCmp > 0
+    if cOp == "<=":
+        return nCmp <= 0
+    return nCmp >= 0
+
+
+def _arith(cOp, xLeft, xRight):
+    if xLeft is None or xRight is None:
+        return None
+    if cOp == "+":
+        if isinstance(xLeft, date) and not isinstance(xRight, date):
+            return xLeft + (timedelta(seconds=xRight) if isinstance(xLeft, datetime) else timedelta(days=xRight))
+        return xLeft + xRight
+    if cOp == "-":
+        if isinstance(xLeft, xStrTypes):
+            # VFP string minus moves the trailing blanks of the left operand to the end.
+            cStripped = xLeft.rstrip()
+            return cStripped + xRight + " " * (len(xLeft) - len(cStripped))
+        if isinstance(xLeft, date) and isinstance(xRight, date):
+            xDiff = xLeft - xRight
+            return xDiff.total_seconds() if isinstance(xLeft, datetime) else xDiff.days
+        if isinstance(xLeft, date):
+            return xLeft - (timedelta(seconds=xRight) if isinstance(xLeft, datetime) else timedelta(days=xRight))
+        return xLeft - xRight
+    if cOp == "*":
+        return xLeft * xRight
+    if cOp == "/":
+        return float(xLeft) / xRight
+    if cOp == "%":
+        return xLeft % xRight
+    return float(xLeft) ** xRight
+
+
+def _vfpstr(xNum, nLen=10, nDec=0):
+    if xNum is None:
+        return " " * nLen
+    cRet = "%.*f" % (nDec, float(xNum))
+    if len(cRet) > nLen:
+        cRet = "%.0f" % float(xNum)
+        if len(cRet) > nLen:
+            return "*" * nLen
+    return cRet.rjust(nLen)
+
+
+def _vfpempty(xValue):
+    if xValue is None:
+        return True
+    if isinstance(xValue, xStrTypes) or isinstance(xValue, (bytes, bytearray)):
+        return len(xValue.strip()) == 0
+    if isinstance(xValue, bool):
+        return not xValue
+    if isinstance(xValue, (int, xLongType, float, decimal.Decimal)):
+        return xValue == 0
+    return False
+
+
+def _stod(cValue):
+    try:
+        return date(int(cValue[0:4]), int(cValue[4:6]), int(cValue[6:8]))
+    except (ValueError, TypeError):
+        return None
+
+
+def _vfpval(cValue):
+    cValue = (cValue or "").strip()
+    nEnd = 0
+    while nEnd < len(cValue) and (cValue[nEnd].isdigit() or cValue[nEnd] in ".-+"):
+        nEnd += 1
+    try:
+        return float(cValue[:nEnd])
+    except ValueError:
+        return 0.0
+
+
+def _substr(cValue, nStart, nLen=None):
+    nStart = int(nStart) - 1
+    if nLen is None:
+        return cValue[nStart:]
+    return cValue[nStart:nStart + int(nLen)]
+
+
+def _datetimefunc(*xArgs):
+    if not xArgs:
+        return datetime.now().replace(microsecond=0)
+    xParts = [int(x) for x in xArgs] + [0] * (6 - len(xArgs))
+    return datetime(*xParts[:6])
+
+
+def _datefunc(*xArgs):
+    if not xArgs:
+        return date.today()
+    return date(int(xArgs[0]), int(xArgs[1]), int(xArgs[2]))
+
+
+def _ttod(tValue):
+    return None if tValue is None else date(tValue.year, tValue.month, tValue.day)
+
+
+def _round(nValue, nDec=0):
+    return round(float(nValue), int(nDec))
+
+
+def _inlist(xValue, *xList):
+    return any(_vfpequal(xValue, x, False) for x in xList)
+
+
+_xFunctions = {
+    "UPPER": lambda c: c.upper(),
+    "LOWER": lambda c: c.lower(),
+    "ALLTRIM": lambda c: c.strip(),
+    "TRIM": lambda c: c.rstrip(),
+    "RTRIM": lambda c: c.rstrip(),
+    "LTRIM": lambda c: c.lstrip(),
+    "LEFT": lambda c, n: c[:int(n)],
+    "RIGHT": lambda c, n: c[-int(n):] if int(n) > 0 else "",
+    "SUBSTR": _substr,
+    "LEN": lambda c: len(c),
+    "AT": lambda cFind, cIn: cIn.find(cFind) + 1,
+    "SPACE": lambda n: " " * int(n),
+    "REPLICATE": lambda c, n: c * int(n),
+    "PADL": lambda c, n, cFill=" ": c.rjust(int(n), cFill)[-int(n):],
+    "PADR": lambda c, n, cFill=" ": c.ljust(int(n), cFill)[:int(n)],
+    "CHR": lambda n: chr(int(n)),
+    "ASC": lambda c: ord(c[0]) if c else 0,
+    "STR": _vfpstr,
+    "VAL": _vfpval,
+    "EMPTY": _vfpempty,
+    "ISNULL": lambda x: x is None,
+    "NVL": lambda x, xAlt: xAlt if x is None else x,
+    "IIF": lambda b, x, y: x if b else y,
+    "BETWEEN": lambda x, xLow, xHigh: (None if x is None else xLow <= x <= xHigh),
+    "INLIST": _inlist,
+    "ABS": lambda n: abs(n),
+    "INT": lambda n: int(n),
+    "ROUND": _round,
+    "MAX": lambda *x: max(x),
+    "MIN": lambda *x: min(x),
+    "MOD": lambda n, m: n % m,
+    "DTOS": lambda d: "" if d is None else d.strftime("%Y%m%d"),
+    "STOD": _stod,
+    "TTOD": _ttod,
+    "DATE": _datefunc,
+    "DATETIME": _datetimefunc,
+    "YEAR": lambda d: 0 if d is None else d.year,
+    "MONTH": lambda d: 0 if d is None else d.month,
+    "DAY": lambda d: 0 if d is None else d.day,
+}
+
+
+class _ExprCompiler(object):
+    """
+    Recursive descent compiler which turns a VFP logical or value expression into a Python closure taking a
+    record number.  Field names are bound to the field descriptors of the table at compile time.
+    """
+    def __init__(self, oTable, cExpr):
+        self.oTable = oTable
+        self.cExpr = cExpr
+        self.xTokens = _tokenize(cExpr)
+        self.nPos = 0
+
+    def compile(self):
+        if not self.xTokens:
+            raise _ExprError("Empty expression")
+        xFunc = self._or()
+        if self.nPos != len(self.xTokens):
+            raise _ExprError("Unexpected text in expression: " + str(self.xTokens[self.nPos][1]))
+        return xFunc
+
+    def _peek(self):
+        return self.xTokens[self.nPos] if self.nPos < len(self.xTokens) else (None, None)
+
+    def _take(self, cValue=None):
+        xTok = self._peek()
+        if cValue is not None and xTok[1] != cValue:
+            raise _ExprError("Expected " + cValue + " in expression")
+        self.nPos += 1
+        return xTok
+
+    def _or(self):
+        xLeft = self._and()
+        while self._peek() == ("OP", ".OR."):
+            self._take()
+            xRight = self._and()
+            xLeft = (lambda a, b: lambda n: bool(a(n)) or bool(b(n)))(xLeft, xRight)
+        return xLeft
+
+    def _and(self):
+        xLeft = self._not()
+        while self._peek() == ("OP", ".AND."):
+            self._take()
+            xRight = self._not()
+            xLeft = (lambda a, b: lambda n: bool(a(n)) and bool(b(n)))(xLeft, xRight)
+        return xLeft
+
+    def _not(self):
+        if self._peek() in (("OP", ".NOT."), ("OP", "!")):
+            self._take()
+            xInner = self._not()
+            return lambda n: not xInner(n)
+        return self._compare()
+
+    def _compare(self):
+        xLeft = self._additive()
+        cOp = self._peek()[1]
+        if self._peek()[0] == "OP" and cOp in ("=", "==", "<>", "!=", "#", "<", ">", "<=", ">=", "$"):
+            self._take()
+            xRight = self._additive()
+            if cOp == "$":
+                return lambda n: (xLeft(n) or "") in (xRight(n) or "")
+            return (lambda a, b, c: lambda n: _compare(c, a(n), b(n)))(xLeft, xRight, cOp)
+        return xLeft
+
+    def _additive(self):
+        xLeft = self._term()
+        while self._peek()[0] == "OP" and self._peek()[1] in ("+", "-"):
+            cOp = self._take()[1]
+            xRight = self._term()
+            xLeft = (lambda a, b, c: lambda n: _arith(c, a(n), b(n)))(xLeft, xRight, cOp)
+        return xLeft
+
+    def _term(self):
+        xLeft = self._unary()
+        while self._peek()[0] == "OP" and self._peek()[1] in ("*", "/", "%"):
+            cOp = self._take()[1]
+            xRight = self._unary()
+            xLeft = (lambda a, b, c: lambda n: _arith(c, a(n), b(n)))(xLeft, xRight, cOp)
+        return xLeft
+
+    def _unary(self):
+        if self._peek() == ("OP", "-"):
+            self._take()
+            xInner = self._unary()
+            return lambda n: -xInner(n)
+        if self._peek() == ("OP", "+"):
+            self._take()
+            return self._unary()
+        xBase = self._primary()
+        if self._peek()[0] == "OP" and self._peek()[1] in ("^", "**"):
+            self._take()
+            xExp = self._unary()
+            return lambda n: _arith("^", xBase(n), xExp(n))
+        return xBase
+
+    def _primary(self):
+        cKind, xValue = self._take()
+        if cKind is None:
+            raise _ExprError("Expression ended unexpectedly")
+        if cKind in ("STR", "NUM"):
+            return lambda n: xValue
+        if cKind == "LIT":
+            xConst = {".T.": True, ".Y.": True, ".F.": False, ".N.": False, ".NULL.": None}[xValue]
+            return lambda n: xConst
+        if cKind == "OP" and xValue == "(":
+            xInner = self._or()
+            self._take(")")
+            return xInner
+        if cKind == "NAME":
+            if self._peek() == ("OP", "("):
+                return self._function(xValue)
+            return self._field(xValue)
+        raise _ExprError("Unexpected token in expression: " + str(xValue))
+
+    def _function(self, cName):
+        self._take("(")
+        xArgs = list()
+        if self._peek() != ("OP", ")"):
+            xArgs.append(self._or())
+            while self._peek() == ("OP", ","):
+                self._take()
+                xArgs.append(self._or())
+        self._take(")")
+        oTable = self.oTable
+        if cName == "DELETED":
+            return lambda n: oTable.isdeleted(n)
+        if cName == "RECNO":
+            return lambda n: n
+        if cName == "RECCOUNT":
+            return lambda n: oTable.nRecCount
+        xFunc = _xFunctions.get(cName)
+        if xFunc is None:
+            raise _ExprError("Function not supported: " + cName + "()")
+        return lambda n: xFunc(*[x(n) for x in xArgs])
+
+    def _field(self, cName):
+        if "." in cName:
+            cAlias, cName = cName.split(".", 1)
+            if cAlias != self.oTable.cAlias.upper():
+                raise _ExprError("Only fields of the current table may be referenced: " + cAlias)
+        oFld = self.oTable.xFieldDict.get(cName)
+        if oFld is None:
+            raise _ExprError("Variable not found: " + cName)
+        oTable = self.oTable
+        if oFld.cType == "Y":
+            return lambda n: _currencyfloat(oTable.value(oFld, n))
+        return lambda n: oTable.value(oFld, n)
+
+
+def _currencyfloat(xValue):
+    return None if xValue is None else float(xValue)
+
+
+def _compileexpr(oTable, cExpr):
+    """ Returns the compiled closure or None, in which case the error has been set. """
+    try:
+        return _ExprCompiler(oTable, _asstr(cExpr)).compile()
+    except _ExprError as e:
+        _seterror("Bad Expression: " + str(e), -79010)
+    except (ValueError, KeyError) as e:
+        _seterror("Bad Expression: " + str(e), -79010)
+    return None
+
+
+# **************************************************************************************************
+# Internal helpers equivalent to the cbx functions of the compiled engine.
+# **************************************************************************************************
+
+def _table(cAlias=""):
+    """ Returns the table for the alias or the currently selected table.  None with error set if not found. """
+    if goSession is None:
+        _seterror("CodeBaseTools has been shut down!", -10000)
+        return None
+    if cAlias:
+        oTable = goSession.xTables.get(_asstr(cAlias).upper())
+        if oTable is None:
+            _seterror("Alias Name Not Found", -9994)
+        return oTable
+    if goSession.oCurrent is None:
+        _seterror("No Table Open in Selected Area", -9999)
+    return goSession.oCurrent
+
+
+def _splitfieldname(cFieldName):
+    """ Handles the alias.fieldname notation.  Returns (table, field) or (None, None) with error set. """
+    cFieldName = _asstr(cFieldName).upper().strip()
+    cAlias = ""
+    if "." in cFieldName:
+        cAlias, cFieldName = cFieldName.split(".", 1)
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None, None
+    oFld = oTable.xFieldDict.get(cFieldName)
+    if oFld is None:
+        _seterror("Field not recognized: " + cFieldName, -4912)
+        return None, None
+    return oTable, oFld
+
+
+def _currentrecno(oTable):
+    """ Record number of the current record or 0 with error set if there isn't one. """
+    if oTable.bEof or oTable.bBof or oTable.nPos < 0 or oTable.nPos >= oTable.count():
+        _seterror("No current record", -9990)
+        return 0
+    return oTable.recat(oTable.nPos)
+
+
+def _saveposition(oTable):
+    return oTable.nPos, oTable.bEof, oTable.bBof
+
+
+def _restoreposition(oTable, xSaved):
+    oTable.nPos, oTable.bEof, oTable.bBof = xSaved
+
+
+def _defaultalias(cPath):
+    cAlias = os.path.splitext(os.path.basename(cPath))[0].upper()
+    cAlias = "".join([c for c in cAlias if c.isalnum() or c == "_"])
+    if not cAlias or cAlias[0].isdigit():
+        cAlias = "_" + cAlias
+    return cAlias
+
+
+def _notavailable(cName, xFailValue):
+    """ Builds the stub for engine functions which would write to a table. """
+    def _stub(*args):
+        _seterror(cName + "() is not available in the read-only Python reader engine", NOT_AVAILABLE)
+        return xFailValue
+    _stub.__name__ = cName
+    _stub.__doc__ = "Not available in the read-only engine.  Always returns " + repr(xFailValue) + "."
+    return _stub
+
+
+# **************************************************************************************************
+# Engine functions.  Names, parameters and return values match the compiled CodeBasePYWrapperXX.pyd.
+# **************************************************************************************************
+
+def initdatasession(nLargeMode=0):
+    """ Creates a new data session and makes it current.  Returns its number or -1 if none are left. """
+    global gnCurrentSession, goSession
+    _clearerror()
+    for jj in range(MAXDATASESSIONS):
+        if jj not in gxSessions:
+            gxSessions[jj] = _ReaderSession(nLargeMode == 1 or nLargeMode is True)
+            gnCurrentSession = jj
+            goSession = gxSessions[jj]
+            return jj
+    _seterror("NO AVAILABLE DATA SESSIONS", -20000)
+    return -1
+
+
+def switchdatasession(nSession):
+    global gnCurrentSession, goSession
+    if nSession not in gxSessions:
+        _seterror("Data Session not found", -20001)
+        return -1
+    gnCurrentSession = nSession
+    goSession = gxSessions[nSession]
+    return nSession
+
+
+def closedatasession(nSession):
+    global gnCurrentSession, goSession
+    oSession = gxSessions.pop(nSession, None)
+    if oSession is None:
+        return False
+    oSession.closeall()
+    if nSession == gnCurrentSession:
+        gnCurrentSession = -1
+        goSession = None
+        if gxSessions:
+            switchdatasession(sorted(gxSessions.keys())[0])
+    return True
+
+
+def getcurrentsession():
+    return gnCurrentSession
+
+
+def getlargemode():
+    return goSession.bLargeMode if goSession is not None else False
+
+
+def geterrormessage():
+    return gcErrorMessage
+
+
+def geterrornumber():
+    return gnLastErrorNumber
+
+
+def gettally():
+    return gnProcessTally
+
+
+def setcustomencoding(cEncoding):
+    global gcCustomCodePage
+    gcCustomCodePage = cEncoding if cEncoding else "cp1252"
+    return True
+
+
+def setdateformat(cFormat):
+    _clearerror()
+    if not cFormat:
+        goSession.cDateFormat = "MM/DD/YY"
+        return 1
+    cFormat = _asstr(cFormat).upper()
+    if cFormat in _xDateFormats:
+        goSession.cDateFormat = cFormat
+        return 1
+    if len(cFormat) <= 16 and "YY" in cFormat and "MM" in cFormat and "DD" in cFormat:
+        goSession.cDateFormat = cFormat
+        return 1
+    _seterror("Unrecognized date format", -10001)
+    return 0
+
+
+def getdateformat():
+    return goSession.cDateFormat if goSession is not None else "MM/DD/YY"
+
+
+def setdebugmode(nHow):
+    global gbDebugMode
+    if nHow == -1:
+        return gbDebugMode
+    gbDebugMode = (nHow == 1)
+    return True
+
+
+def setdeleted(nHow):
+    if nHow == -1:
+        return goSession.bDeleted
+    goSession.bDeleted = (nHow == 1)
+    return True
+
+
+def use(cTableName, cAlias="", nReadOnly=1, nNoBuffering=0):
+    """ Opens the table shared and read-only.  The read only flag is accepted for compatibility. """
+    _clearerror()
+    if goSession is None:
+        _seterror("CodeBaseTools has been shut down!  Can't use()", -10000)
+        return False
+    cTableName = _asstr(cTableName)
+    if not os.path.exists(cTableName):
+        if os.path.exists(cTableName + ".dbf"):
+            cTableName = cTableName + ".dbf"
+        else:
+            _seterror("File Not Found: " + cTableName, -60)
+            return False
+    cFullPath = os.path.abspath(cTableName)
+    if cAlias:
+        cAlias = _asstr(cAlias).upper()
+        if cAlias in goSession.xTables:
+            closetable(cAlias)
+    else:
+        cAlias = _defaultalias(cFullPath)
+        oOther = goSession.xTables.get(cAlias)
+        if oOther is not None:
+            if os.path.normcase(oOther.cPath) == os.path.normcase(cFullPath):
+                closetable(cAlias)
+            else:
+                import random
+                cAlias = "TMP" + "".join(random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+                                         for jj in range(12))
+    try:
+        oTable = _ReaderTable(cFullPath, cAlias)
+    except (IOError, OSError, ValueError, struct.error) as e:
+        _seterror("Unable to open table: " + str(e), -70)
+        return False
+    goSession.xTables[cAlias] = oTable
+    goSession.oCurrent = oTable
+    oTable.moveto(0, 1, goSession.bDeleted)
+    return True
+
+
+useexcl = _notavailable("useexcl", False)
+
+
+def select(cAlias):
+    _clearerror()
+    oTable = _table(cAlias) if cAlias else None
+    if oTable is None:
+        if not cAlias:
+            _seterror("Alias Name Not Found", -9994)
+        return False
+    goSession.oCurrent = oTable
+    return True
+
+
+def alias():
+    if goSession is None or goSession.oCurrent is None:
+        return ""
+    return goSession.oCurrent.cAlias
+
+
+def used(cAlias):
+    _clearerror()
+    if goSession is None or _asstr(cAlias).upper() not in goSession.xTables:
+        _seterror("Alias Not In Use", -9994)
+        return False
+    return True
+
+
+def dbf(cAlias=""):
+    _clearerror()
+    oTable = _table(cAlias)
+    return oTable.cPath if oTable is not None else ""
+
+
+def isreadonly(cAlias=""):
+    _clearerror()
+    oTable = _table(cAlias)
+    return True if oTable is not None else None
+
+
+def isexclusive():
+    _clearerror()
+    oTable = _table()
+    return False if oTable is not None else None
+
+
+def closetable(cAlias=""):
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return False
+    if goSession.oFilterTable is oTable:
+        clearfilter()
+    if goSession.oLocateTable is oTable:
+        locateclear()
+    oTable.close()
+    del goSession.xTables[oTable.cAlias]
+    if goSession.oCurrent is oTable:
+        goSession.oCurrent = None
+    return True
+
+
+def closedatabases():
+    _clearerror()
+    if goSession is not None:
+        goSession.closeall()
+    return True
+
+
+def refreshbuffers():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return False
+    try:
+        oTable.refresh()
+    except (IOError, OSError, ValueError, struct.error) as e:
+        _seterror("Refresh failed: " + str(e), -79002)
+        return False
+    return True
+
+
+def refreshrecord():
+    _clearerror()
+    return _table() is not None  # Record bytes always come straight from the map.
+
+
+def flush():
+    _clearerror()
+    return _table() is not None
+
+
+def flushall():
+    _clearerror()
+    return True
+
+
+def reccount():
+    _clearerror()
+    oTable = _table()
+    return oTable.nRecCount if oTable is not None else -1
+
+
+def fcount():
+    _clearerror()
+    oTable = _table()
+    return len(oTable.xFields) if oTable is not None else -1
+
+
+def recno():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return -1
+    return oTable.recno()
+
+
+def eof():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return None
+    return oTable.bEof or oTable.count() == 0
+
+
+def bof():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return None
+    return oTable.bBof or oTable.count() == 0
+
+
+def deleted():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return None
+    nRecno = _currentrecno(oTable)
+    if nRecno == 0:
+        return None
+    return oTable.isdeleted(nRecno)
+
+
+def goto(cHow, nCount=1):
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return False
+    cHow = (_asstr(cHow) or " ")[0].upper()
+    bDeleted = goSession.bDeleted
+    if cHow == "T":
+        bOK = oTable.moveto(0, 1, bDeleted)
+    elif cHow == "B":
+        bOK = oTable.moveto(oTable.count() - 1, -1, bDeleted)
+    elif cHow in ("N", "P", "S"):
+        if cHow == "N":
+            nCount = 1
+        elif cHow == "P":
+            nCount = -1
+        elif nCount == 0:
+            nCount = 1
+        bOK = _skip(oTable, nCount)
+    elif cHow == "R":
+        if oTable.nRecCount == 0:
+            _seterror("No records in table", -9997)
+            return False
+        if nCount < 1 or nCount > oTable.nRecCount:
+            _seterror("Record Number out of range", -9996)
+            return False
+        bOK = oTable.gotorecord(nCount)
+    else:
+        _seterror("Invalid GOTO Parameter", -9998)
+        return False
+    if not bOK and gnLastErrorNumber == 0:
+        _seterror("GOTO Failed - record doesn't exist", -9995)
+    return bOK
+
+
+def _skip(oTable, nCount):
+    nDirection = (1 if nCount > 0 else -1)
+    nPos = oTable.nPos
+    if oTable.bBof and nCount > 0:
+        nPos = -1
+    bDeleted = goSession.bDeleted
+    for jj in range(abs(nCount)):
+        if not oTable.moveto(nPos + nDirection, nDirection, bDeleted):
+            return False
+        nPos = oTable.nPos
+    return True
+
+
+def skip(nCount=1):
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return False
+    if nCount == 0:
+        nCount = 1
+    if not _skip(oTable, nCount):
+        _seterror("SKIP Failed", -13241)
+        return False
+    return True
+
+
+def afields(cAlias=""):
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if not oTable.xFields:
+        _seterror("No fields defined for current table.", -9989)
+        return None
+    return [{"cName": oF.cName, "cType": oF.cType, "nWidth": oF.nWidth, "nDecimals": oF.nDecimals,
+             "bNulls": oF.bNulls} for oF in oTable.xFields]
+
+
+def afieldtypes():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return None
+    return dict((oF.cName, oF.cType) for oF in oTable.xFields)
+
+
+def fieldinfo(cFieldName):
+    _clearerror()
+    oTable, oFld = _splitfieldname(cFieldName)
+    if oFld is None:
+        return None
+    return oFld.cType, oFld.nWidth, oFld.nDecimals, oFld.bNulls, oFld.bBinary
+
+
+def _fieldlist(oTable, cFieldList):
+    """ Resolves the comma delimited field list to descriptors.  None with error set on a bad name. """
+    if not cFieldList:
+        return oTable.xFields
+    xRet = list()
+    for cName in _asstr(cFieldList).split(","):
+        cName = cName.strip().upper()
+        if not cName:
+            continue
+        oFld = oTable.xFieldDict.get(cName)
+        if oFld is None:
+            _seterror("Field not recognized: " + cName, -4912)
+            return None
+        xRet.append(oFld)
+    return xRet
+
+
+def scatter(cAlias="", bConvertTypes=True, bStripBlanks=False, cFieldList="", bIsList=False, cCoding="XX"):
+    """ Returns the current record as a dict keyed by field name, or as a list if bIsList is True. """
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    nRecno = _currentrecno(oTable)
+    if nRecno == 0:
+        return None
+    xFields = _fieldlist(oTable, cFieldList)
+    if xFields is None:
+        return None
+    cCodeAsc, cCodeBin = _codes(cCoding)
+    if bIsList:
+        return [oTable.value(oF, nRecno, bConvertTypes, bStripBlanks, cCodeAsc, cCodeBin) for oF in xFields]
+    return dict((oF.cName, oTable.value(oF, nRecno, bConvertTypes, bStripBlanks, cCodeAsc, cCodeBin))
+                for oF in xFields)
+
+
+def scatterbatch(cAlias, nCount, cFieldList="", bStripBlanks=False, cCoding="XX", bIsList=False, bConvertTypes=True,
+                 nDirection=1):
+    """
+    Returns up to nCount records starting at the current one, in the current order, as a tuple of
+    (records, record numbers).  Records are dicts, or tuples if bIsList is True.  Deleted records are passed
+    over when setdeleted() is ON, as are records failing the preparefilter() expression, if any.  The pointer
+    is left on the record after the last one returned.  Both lists are empty at EOF.  None on error.
+    """
+    global gnProcessTally
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if goSession.xFilter is not None and goSession.oFilterTable is not oTable:
+        _seterror("Filter Expression Applies to the Currently Selected Table Only", -8933)
+        return None
+    xFields = _fieldlist(oTable, cFieldList)
+    if xFields is None:
+        raise ValueError(gcErrorMessage)
+    cCodeAsc, cCodeBin = _codes(cCoding)
+    nDirection = (-1 if nDirection < 0 else 1)
+    nCount = max(nCount, 1)
+    bDeleted = goSession.bDeleted
+    xFilter = goSession.xFilter
+    xRecords = list()
+    xRecnos = list()
+    xNames = [oF.cName for oF in xFields]
+    nPos = oTable.nPos
+    nLast = oTable.count()
+    if oTable.bEof or oTable.bBof:
+        nPos = -1
+    while 0 <= nPos < nLast and len(xRecords) < nCount:
+        nRecno = oTable.recat(nPos)
+        nPos += nDirection
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFilter is not None and not xFilter(nRecno):
+            continue
+        xValues = [oTable.value(oF, nRecno, bConvertTypes, bStripBlanks, cCodeAsc, cCodeBin) for oF in xFields]
+        if bIsList:
+            xRecords.append(tuple(xValues))
+        else:
+            xRecords.append(dict(zip(xNames, xValues)))
+        xRecnos.append(nRecno)
+    if not (oTable.bEof or oTable.bBof):
+        oTable.moveto(nPos, nDirection, False)
+    gnProcessTally = len(xRecords)
+    return xRecords, xRecnos
+
+
+def recordbuffer(cAlias=""):
+    """
+    Returns the current record as a tuple of its record number and a bytes copy of the record in the .DBF layout,
+    deleted flag first, for the lazy record views of scatterview().  None on error, or when there is no current
+    record.
+    """
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    nRecno = _currentrecno(oTable)
+    if nRecno == 0:
+        return None
+    nOffset = oTable.recoffset(nRecno)
+    return nRecno, oTable.xMap[nOffset:nOffset + oTable.nRecLen]
+
+
+def recordbatch(cAlias, nCount, nDirection=1):
+    """
+    Raw buffer version of scatterbatch().  Walks the records the same way and returns a tuple of one bytes object
+    with the records one after the other, each nRecLen bytes long, and the list of their record numbers.
+    """
+    global gnProcessTally
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if goSession.xFilter is not None and goSession.oFilterTable is not oTable:
+        _seterror("Filter Expression Applies to the Currently Selected Table Only", -8933)
+        return None
+    nDirection = (-1 if nDirection < 0 else 1)
+    nCount = max(nCount, 1)
+    bDeleted = goSession.bDeleted
+    xFilter = goSession.xFilter
+    xParts = list()
+    xRecnos = list()
+    nPos = oTable.nPos
+    nLast = oTable.count()
+    if oTable.bEof or oTable.bBof:
+        nPos = -1
+    while 0 <= nPos < nLast and len(xRecnos) < nCount:
+        nRecno = oTable.recat(nPos)
+        nPos += nDirection
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFilter is not None and not xFilter(nRecno):
+            continue
+        nOffset = oTable.recoffset(nRecno)
+        xParts.append(oTable.xMap[nOffset:nOffset + oTable.nRecLen])
+        xRecnos.append(nRecno)
+    if not (oTable.bEof or oTable.bBof):
+        oTable.moveto(nPos, nDirection, False)
+    gnProcessTally = len(xRecnos)
+    return b"".join(xParts), xRecnos
+
+
+def getposition(cAlias=""):
+    """
+    Returns the position of the table as a tuple of the record number, a flag which is 0 on a record, 1 at EOF and
+    2 at BOF, and the name of the selected tag ("" for record number order), for setposition().
+    """
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if oTable.bEof or oTable.nPos >= oTable.count():
+        nFlag = 1
+    elif oTable.bBof or oTable.nPos < 0:
+        nFlag = 2
+    else:
+        nFlag = 0
+    return oTable.recno(), nFlag, ("" if oTable.oOrder is None else oTable.oOrder.cName)
+
+
+def setposition(cAlias, nRecno, nFlag, cTagName):
+    """ Puts back a position from getposition(), selecting the tag first.  Returns True, or False on error. """
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return False
+    oTag = None
+    if cTagName:
+        oTag = oTable.oIndex.xTags.get(_asstr(cTagName).upper()) if oTable.oIndex is not None else None
+        if oTag is None:
+            _seterror("Tag Not Found: " + cTagName, -9992)
+            return False
+    oTable.oOrder = oTag
+    if nFlag == 1:
+        oTable.moveto(oTable.count(), 1, False)
+    elif nFlag == 2:
+        oTable.moveto(-1, -1, False)
+    elif nRecno < 1 or nRecno > oTable.nRecCount:
+        _seterror("Record Number out of range", -9996)
+        return False
+    else:
+        oTable.gotorecord(nRecno)
+    return True
+
+
+def scatterblank(cAlias="", bBinaryAsUnicode=True):
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    return dict((oF.cName, oTable.blankvalue(oF, bBinaryAsUnicode)) for oF in oTable.xFields)
+
+
+def _fieldvalue(cFieldName, bConvert=True, bStrip=False, cCoding="XX"):
+    """ Returns (found, value) for the alias.fieldname value of the current record. """
+    oTable, oFld = _splitfieldname(cFieldName)
+    if oFld is None:
+        return False, None
+    nRecno = _currentrecno(oTable)
+    if nRecno == 0:
+        return False, None
+    cCodeAsc, cCodeBin = _codes(cCoding)
+    return True, oTable.value(oFld, nRecno, bConvert, bStrip, cCodeAsc, cCodeBin)
+
+
+def curval(cFieldName, bConvertType=False, cCoding="XX"):
+    _clearerror()
+    bOK, xValue = _fieldvalue(cFieldName, bConvertType, bConvertType, cCoding)
+    if not bOK:
+        return None if bConvertType else (None, None)
+    if bConvertType:
+        return xValue
+    oTable, oFld = _splitfieldname(cFieldName)
+    return xValue, oFld.cType
+
+
+def scatterfieldex(cFieldName, bStrip=False):
+    _clearerror()
+    bOK, xValue = _fieldvalue(cFieldName, False, bStrip)
+    if not bOK:
+        return None
+    if isinstance(xValue, (bytes, bytearray)) and _ver3x:
+        xValue = bytes(xValue).decode("latin-1")
+    return xValue
+
+
+def scatterfieldlogical(cFieldName):
+    _clearerror()
+    bOK, xValue = _fieldvalue(cFieldName)
+    return bool(xValue) if bOK else None
+
+
+def scatterfieldlong(cFieldName):
+    _clearerror()
+    oTable, oFld = _splitfieldname(cFieldName)
+    bOK, xValue = _fieldvalue(cFieldName)
+    if not bOK:
+        return None
+    if xValue is None:
+        return 0
+    if oFld.cType == "D":
+        return date2jdn(xValue)
+    try:
+        return int(xValue)
+    except (TypeError, ValueError):
+        _seterror("Not a numeric field: " + oFld.cName, -4913)
+        return None
+
+
+def scatterfielddouble(cFieldName):
+    _clearerror()
+    oTable, oFld = _splitfieldname(cFieldName)
+    bOK, xValue = _fieldvalue(cFieldName)
+    if not bOK:
+        return None
+    if oFld.cType not in ("N", "F", "B", "Y", "I"):
+        _seterror("Not a numeric field: " + oFld.cName, -4913)
+        return None
+    return 0.0 if xValue is None else float(xValue)
+
+
+def scatterfielddecimal(cFieldName):
+    _clearerror()
+    oTable, oFld = _splitfieldname(cFieldName)
+    if oFld is None:
+        return None
+    if oFld.cType not in ("N", "F", "Y"):
+        _seterror("Not a Number, Float or Currency field: " + oFld.cName, -4913)
+        return None
+    bOK, xValue = _fieldvalue(cFieldName, False)
+    if not bOK or xValue == ".NULL.":
+        return None
+    try:
+        return decimal.Decimal(xValue.strip() or "0")
+    except decimal.InvalidOperation:
+        return decimal.Decimal("0")
+
+
+def scatterfielddate(cFieldName):
+    _clearerror()
+    bOK, xValue = _fieldvalue(cFieldName)
+    if not bOK or not isinstance(xValue, date):
+        return None
+    return _ttod(xValue) if isinstance(xValue, datetime) else xValue
+
+
+def scatterfielddatetime(cFieldName):
+    _clearerror()
+    bOK, xValue = _fieldvalue(cFieldName)
+    if not bOK or not isinstance(xValue, date):
+        return None
+    if not isinstance(xValue, datetime):
+        return datetime(xValue.year, xValue.month, xValue.day)
+    return xValue
+
+
+# Index tags
+def tagcount():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return -1
+    return len(oTable.oIndex.xTags) if oTable.oIndex is not None else 0
+
+
+def ataginfo():
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return None
+    xRet = list()
+    if oTable.oIndex is not None:
+        for oTag in oTable.oIndex.xTags.values():
+            xRet.append({"cTagName": oTag.cName, "cTagExpr": oTag.cExpr, "cTagFilt": oTag.cFilter,
+                         "nDirection": (10 if oTag.bDescending else 0), "nUnique": oTag.unique()})
+    return xRet
+
+
+def order():
+    _clearerror()
+    oTable = _table()
+    if oTable is None or oTable.oOrder is None:
+        return ""
+    return oTable.oOrder.cName
+
+
+def setorderto(cTagName):
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return False
+    if not cTagName:
+        oTable.setorder(None)
+        return True
+    oTag = oTable.oIndex.xTags.get(_asstr(cTagName).upper()) if oTable.oIndex is not None else None
+    if oTag is None:
+        _seterror("Tag Not Found: " + cTagName, -9992)
+        return False
+    oTable.setorder(oTag)
+    return True
+
+
+def _encodedouble(nValue):
+    cRaw = bytearray(struct.pack(">d", float(nValue)))
+    if nValue >= 0:
+        cRaw[0] |= 0x80
+    else:
+        cRaw = bytearray(255 - b for b in cRaw)
+    return bytes(cRaw)
+
+
+def _seekkey(oTag, cMatch):
+    """ Converts the seek() match string into the binary key format stored in the tag. """
+    cType = oTag.cKeyType
+    if cType == "C" or cType == "L":
+        return _tobytes(cMatch)
+    if cType == "I" and oTag.nKeyLen == 4:
+        return struct.pack(">I", (int(float(cMatch)) + 0x80000000) & 0xFFFFFFFF)
+    if cType == "D":
+        dValue = _stod(cMatch)
+        if dValue is None:
+            raise ValueError("Date seek value must be YYYYMMDD")
+        return _encodedouble(date2jdn(dValue))
+    if cType == "T":
+        tValue = datetime.strptime(cMatch[:16], "%Y%m%d%H:%M:%S")
+        nDay = date2jdn(tValue) + (tValue.hour * 3600 + tValue.minute * 60 + tValue.second) / 86400.0
+        return _encodedouble(nDay)
+    return _encodedouble(float(cMatch))[:oTag.nKeyLen]
+
+
+def seek(cMatch, cAlias="", cTagName=""):
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if not cMatch:
+        _seterror("No Match Value Provided", -99955)
+        return None
+    if oTable.oIndex is None:
+        _seterror("No Index Tags Available", -9993)
+        return None
+    oTag = oTable.oIndex.xTags.get(_asstr(cTagName).upper()) if cTagName else oTable.oOrder
+    if oTag is None:
+        _seterror("No Order Set or Tag Not Recognized", -9992)
+        return None
+    try:
+        cKey = _seekkey(oTag, _asstr(cMatch))
+    except (ValueError, struct.error) as e:
+        _seterror("Seek Failed: " + str(e), -9991)
+        return None
+    nRecno = _findkey(oTable, oTag, cKey)
+    if nRecno == 0:
+        oTable.nPos = oTable.count()
+        oTable.bEof = True
+        oTable.bBof = False
+        return False
+    oTable.gotorecord(nRecno)
+    return True
+
+
+def _findkey(oTable, oTag, cKey):
+    """
+    Record number of the first record matching the encoded key cKey on oTag, passing over deleted records when
+    setdeleted() is ON, or 0 if there is none.
+    """
+    nPos = oTag.find(cKey)
+    if nPos >= 0 and goSession.bDeleted:
+        nLast = oTag.count()
+        while nPos < nLast:
+            nRecno = oTag.recno(nPos)
+            if not oTable.isdeleted(nRecno):
+                break
+            nAsc = (nLast - 1 - nPos if oTag.bDescending else nPos)
+            if oTag.xKeys[nAsc][:len(cKey)] != cKey:
+                nPos = -1
+                break
+            nPos += 1
+        else:
+            nPos = -1
+    if nPos < 0:
+        return 0
+    return oTag.recno(nPos)
+
+
+def seekmany(cAlias, cTagName, xKeys, cFieldList="", bStripBlanks=False, cCoding="XX", bConvertTypes=True):
+    """
+    Looks up each seek string in the list xKeys on the tag cTagName, as seek() would.  Returns a list aligned with
+    xKeys holding the dict of the record found for each key, or None where there is no match.  Each distinct key
+    is only looked up once.  The record pointer doesn't move.  None on error.
+    """
+    global gnProcessTally
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if oTable.oIndex is None:
+        _seterror("No Index Tags Available", -9993)
+        return None
+    oTag = oTable.oIndex.xTags.get(_asstr(cTagName).upper()) if cTagName else oTable.oOrder
+    if oTag is None:
+        _seterror("No Order Set or Tag Not Recognized", -9992)
+        return None
+    xFields = _fieldlist(oTable, cFieldList)
+    if xFields is None:
+        raise ValueError(gcErrorMessage)
+    xNames = [oF.cName for oF in xFields]
+    cCodeAsc, cCodeBin = _codes(cCoding)
+    xResults = [None] * len(xKeys)
+    xFound = dict()
+    nDone = 0
+    for jj, cMatch in enumerate(xKeys):
+        cMatch = _asstr(cMatch)
+        if not cMatch:
+            continue  # Nothing can match an empty key.
+        nRecno = xFound.get(cMatch)
+        if nRecno is None:
+            try:
+                nRecno = _findkey(oTable, oTag, _seekkey(oTag, cMatch))
+            except (ValueError, struct.error) as e:
+                _seterror("Seek Failed: " + str(e), -9991)
+                return None
+            xFound[cMatch] = nRecno
+        if nRecno:
+            xResults[jj] = dict(zip(xNames, [oTable.value(oF, nRecno, bConvertTypes, bStripBlanks, cCodeAsc,
+                                                          cCodeBin) for oF in xFields]))
+            nDone += 1
+    gnProcessTally = nDone
+    return xResults
+
+
+def _keytest(cKey, cBound):
+    """ Compares the tag key cKey with the encoded bound cBound for its length, returning -1, 0 or 1. """
+    cKey = cKey[:len(cBound)]
+    return (cKey > cBound) - (cKey < cBound)
+
+
+def scanrange(cAlias, cTagName, cLowKey, cHighKey, nCount, cFieldList="", bStripBlanks=False, cCoding="XX", nMode=1,
+              bNoData=False, bLowExcluded=False, bHighExcluded=False, bDescending=False):
+    """
+    Returns up to nCount records (0 for no limit) of the tag cTagName with keys from the seek string cLowKey to
+    cHighKey in tag order, or in reverse if bDescending, as a tuple of (records, record numbers, done flag).  Either
+    key may be empty for an open end, and bLowExcluded and bHighExcluded leave out the keys matching that end.
+    With nMode 1 the scan starts at the first key >= cLowKey, or when descending the last key <= cHighKey, with 0
+    it goes on from the current record.  Character keys are compared for the length of the bound only.  Deleted
+    records are passed over when setdeleted() is ON, as are records failing the preparefilter() expression, if
+    any.  The records list is empty if bNoData is True.  The pointer is left on the next record to look at, and
+    the order is not changed.  None on error.
+    """
+    global gnProcessTally
+    _clearerror()
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    if goSession.xFilter is not None and goSession.oFilterTable is not oTable:
+        _seterror("Filter Expression Applies to the Currently Selected Table Only", -8933)
+        return None
+    if oTable.oIndex is None:
+        _seterror("No Index Tags Available", -9993)
+        return None
+    oTag = oTable.oIndex.xTags.get(_asstr(cTagName).upper()) if cTagName else oTable.oOrder
+    if oTag is None:
+        _seterror("No Order Set or Tag Not Recognized", -9992)
+        return None
+    xFields = (list() if bNoData else _fieldlist(oTable, cFieldList))
+    if xFields is None:
+        raise ValueError(gcErrorMessage)
+    try:
+        cLow = (_seekkey(oTag, _asstr(cLowKey)) if cLowKey else None)
+        cHigh = (_seekkey(oTag, _asstr(cHighKey)) if cHighKey else None)
+    except (ValueError, struct.error) as e:
+        _seterror("Seek Failed: " + str(e), -9991)
+        return None
+    cCodeAsc, cCodeBin = _codes(cCoding)
+    xNames = [oF.cName for oF in xFields]
+    nCount = (nCount if nCount > 0 else 2000000000)
+    nStep = (-1 if bDescending else 1)
+    oTag.load()
+    xKeys = oTag.xKeys
+    nLast = len(xKeys)
+    if nMode == 1 and bDescending:
+        if cHigh is None:
+            nAsc = nLast - 1
+        else:
+            nAsc = bisect.bisect_left(xKeys, cHigh)
+            while nAsc < nLast and _keytest(xKeys[nAsc], cHigh) == 0:
+                nAsc += 1
+            nAsc -= 1
+    elif nMode == 1:
+        nAsc = (bisect.bisect_left(xKeys, cLow) if cLow is not None else 0)
+    else:
+        nRecno = _currentrecno(oTable)
+        nAsc = (oTag.position(nRecno) if nRecno else -1)
+        if nAsc >= 0 and oTag.bDescending:
+            nAsc = nLast - 1 - nAsc
+        if nAsc < 0:
+            nAsc = (-1 if bDescending else nLast)
+    bDeleted = goSession.bDeleted
+    xFilter = goSession.xFilter
+    xRecords = list()
+    xRecnos = list()
+    bDone = False
+    while len(xRecnos) < nCount:
+        if not (0 <= nAsc < nLast):
+            bDone = True
+            break
+        nLowTest = (_keytest(xKeys[nAsc], cLow) if cLow is not None else 1)
+        nHighTest = (_keytest(xKeys[nAsc], cHigh) if cHigh is not None else -1)
+        bBelow = nLowTest < 0 or (bLowExcluded and nLowTest == 0)
+        bAbove = nHighTest > 0 or (bHighExcluded and nHighTest == 0)
+        if (bBelow if bDescending else bAbove):
+            bDone = True
+            break
+        nRecno = oTag.xRecnos[nAsc]
+        nAsc += nStep
+        if bBelow or bAbove:
+            continue
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFilter is not None and not xFilter(nRecno):
+            continue
+        if not bNoData:
+            xRecords.append(dict(zip(xNames, [oTable.value(oF, nRecno, True, bStripBlanks, cCodeAsc, cCodeBin)
+                                              for oF in xFields])))
+        xRecnos.append(nRecno)
+    if 0 <= nAsc < nLast:
+        oTable.gotorecord(oTag.xRecnos[nAsc])
+    else:
+        oTable.moveto((-1 if nAsc < 0 else oTable.count()), nStep, False)
+    gnProcessTally = len(xRecnos)
+    return xRecords, xRecnos, bDone
+
+
+# Filter, locate and statistics
+def preparefilter(cExpr):
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return 0
+    xFunc = _compileexpr(oTable, cExpr)
+    if xFunc is None:
+        return 0
+    goSession.xFilter = xFunc
+    goSession.oFilterTable = oTable
+    return 1
+
+
+def testfilter():
+    _clearerror()
+    if goSession.xFilter is None:
+        _seterror("No Filter Prepared", -79003)
+        return False
+    oTable = goSession.oFilterTable
+    nRecno = _currentrecno(oTable)
+    if nRecno == 0:
+        return False
+    return bool(goSession.xFilter(nRecno))
+
+
+def clearfilter():
+    goSession.xFilter = None
+    goSession.oFilterTable = None
+    return True
+
+
+def _locatenext(oTable, nStart):
+    xFunc = goSession.xLocate
+    nCount = oTable.count()
+    bDeleted = goSession.bDeleted
+    for nPos in range(nStart, nCount):
+        nRecno = oTable.recat(nPos)
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFunc(nRecno):
+            oTable.moveto(nPos, 1, False)
+            return True
+    oTable.moveto(nCount, 1, False)
+    return False
+
+
+def locate(cExpr):
+    _clearerror()
+    oTable = _table()
+    if oTable is None:
+        return None
+    xFunc = _compileexpr(oTable, cExpr)
+    if xFunc is None:
+        return None
+    goSession.xLocate = xFunc
+    goSession.oLocateTable = oTable
+    return _locatenext(oTable, 0)
+
+
+def locatecontinue():
+    _clearerror()
+    if goSession.xLocate is None:
+        _seterror("No Locate Active", -79004)
+        return None
+    oTable = goSession.oLocateTable
+    return _locatenext(oTable, oTable.nPos + 1)
+
+
+def locateclear():
+    goSession.xLocate = None
+    goSession.oLocateTable = None
+    return True
+
+
+def count(cExpr):
+    global gnProcessTally
+    _clearerror()
+    if goSession is not None and goSession.xLocate is not None:
+        _seterror("Locate is active.  COUNT is not available", -841292)
+        return -1
+    oTable = _table()
+    if oTable is None:
+        return -1
+    xFunc = _compileexpr(oTable, cExpr)
+    if xFunc is None:
+        return -1
+    bDeleted = goSession.bDeleted
+    nCount = 0
+    for nRecno in range(1, oTable.nRecCount + 1):
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFunc(nRecno):
+            nCount += 1
+    gnProcessTally = nCount
+    return nCount
+
+
+def calcstats(nStat, cFieldExpr, cForExpr):
+    _clearerror()
+    if goSession is not None and goSession.xLocate is not None:
+        _seterror("Locate is active.  CALCSTATS is not available", -841294)
+        return None
+    oTable = _table()
+    if oTable is None:
+        return None
+    if nStat not in (1, 2, 3, 4):
+        _seterror("Bad Statistic Type", -59384)
+        return None
+    xFor = None
+    if cForExpr:
+        xFor = _compileexpr(oTable, cForExpr)
+        if xFor is None:
+            return None
+    xValue = _compileexpr(oTable, cFieldExpr)
+    if xValue is None:
+        _seterror("Bad Field Expression: " + gcErrorMessage, gnLastErrorNumber)
+        return None
+    bDeleted = goSession.bDeleted
+    nCount = 0
+    nSum = 0.0
+    nMax = None
+    nMin = None
+    for nRecno in range(1, oTable.nRecCount + 1):
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFor is not None and not xFor(nRecno):
+            continue
+        nValue = float(xValue(nRecno) or 0.0)
+        nCount += 1
+        nSum += nValue
+        nMax = nValue if nMax is None or nValue > nMax else nMax
+        nMin = nValue if nMin is None or nValue < nMin else nMin
+    if nCount == 0:
+        _seterror("No records met your selection criteria", -947324)
+        return None
+    return {1: nSum, 2: nSum / nCount, 3: nMax, 4: nMin}[nStat]
+
+
+def calcgroup(cGroupExpr, xStats, cForExpr, bSorted=False):
+    """
+    Works out the (statistic, expression) pairs in xStats for each value of cGroupExpr in one pass of the current
+    table.  Statistics are numbered as for calcstats(), plus 5 for COUNT.  Returns a list of tuples of (group value,
+    statistic, ...) in group value order, or when bSorted in the order of the current tag, where a group ends when
+    the value changes.  An empty cGroupExpr makes all the records one group with the value None.  None on error.
+    """
+    global gnProcessTally
+    _clearerror()
+    if goSession is not None and goSession.xLocate is not None:
+        _seterror("Locate is active.  CALCGROUP is not available", -841294)
+        return None
+    oTable = _table()
+    if oTable is None:
+        return None
+    xTypes = list()
+    xExprs = list()
+    for xStat in xStats:
+        if not isinstance(xStat, tuple) or len(xStat) != 2 or xStat[0] not in (1, 2, 3, 4, 5):
+            _seterror("Bad Statistic Type", -59384)
+            return None
+        xTypes.append(xStat[0])
+        if xStat[0] == 5:
+            xExprs.append(None)
+            continue
+        xValue = _compileexpr(oTable, xStat[1])
+        if xValue is None:
+            _seterror("Bad Field Expression: " + gcErrorMessage, gnLastErrorNumber)
+            return None
+        xExprs.append(xValue)
+    xFor = None
+    if cForExpr:
+        xFor = _compileexpr(oTable, cForExpr)
+        if xFor is None:
+            return None
+    xGroup = None
+    if _asstr(cGroupExpr).strip():
+        xGroup = _compileexpr(oTable, cGroupExpr)
+        if xGroup is None:
+            _seterror("Bad Group Expression: " + gcErrorMessage, gnLastErrorNumber)
+            return None
+    if bSorted and oTable.oOrder is not None:
+        oTable.oOrder.load()
+        xRecnos = oTable.oOrder.xRecnos
+        if oTable.oOrder.bDescending:
+            xRecnos = xRecnos[::-1]
+    else:
+        xRecnos = range(1, oTable.nRecCount + 1)
+    bDeleted = goSession.bDeleted
+    xGroups = dict()
+    xOrder = list()
+    xLast = None
+    for nRecno in xRecnos:
+        if bDeleted and oTable.isdeleted(nRecno):
+            continue
+        if xFor is not None and not xFor(nRecno):
+            continue
+        xKey = (None if xGroup is None else xGroup(nRecno))
+        if isinstance(xKey, (bool, date)):
+            _seterror("The group expression must give a character or numeric value, use DTOS() for dates", -59385)
+            return None
+        if xGroup is not None and not isinstance(xKey, xStrTypes):
+            xKey = float(xKey or 0.0)
+        if bSorted:
+            if xLast is None or xLast[0] != xKey:
+                xLast = [xKey, 0] + [0.0] * len(xTypes)
+                xOrder.append(xLast)
+            xEntry = xLast
+        else:
+            xEntry = xGroups.get(xKey)
+            if xEntry is None:
+                xEntry = [xKey, 0] + [0.0] * len(xTypes)
+                xGroups[xKey] = xEntry
+        for jj, nType in enumerate(xTypes):
+            if nType == 5:
+                continue
+            nValue = float(xExprs[jj](nRecno) or 0.0)
+            if nType in (1, 2):
+                xEntry[jj + 2] += nValue
+            elif nType == 3 and (xEntry[1] == 0 or nValue > xEntry[jj + 2]):
+                xEntry[jj + 2] = nValue
+            elif nType == 4 and (xEntry[1] == 0 or nValue < xEntry[jj + 2]):
+                xEntry[jj + 2] = nValue
+        xEntry[1] += 1
+    if not bSorted:
+        xOrder = [xGroups[xKey] for xKey in sorted(xGroups)]
+    xReturn = list()
+    for xEntry in xOrder:
+        xRow = [xEntry[0]]
+        for jj, nType in enumerate(xTypes):
+            if nType == 5:
+                xRow.append(xEntry[1])
+            elif nType == 2:
+                xRow.append(xEntry[jj + 2] / xEntry[1])
+            else:
+                xRow.append(xEntry[jj + 2])
+        xReturn.append(tuple(xRow))
+    gnProcessTally = len(xReturn)
+    return xReturn
+
+
+# Columnar reads
+def _columnbytes(np, xArr, xRows, oFld):
+    """ Copies just the bytes of field oFld for the selected rows out of the mapped record area. """
+    return np.ascontiguousarray(xArr[xRows, oFld.nOffset:oFld.nOffset + oFld.nWidth])
+
+
+def _columnnulls(np, xArr, xRows, oTable, oFld):
+    """ Boolean array, True where the field holds .NULL., or None if the field can't be null. """
+    if oFld.nNullBit < 0 or oTable.oNullFlags is None:
+        return None
+    xByte = xArr[xRows, oTable.oNullFlags.nOffset + oFld.nNullBit // 8]
+    return ((xByte >> (oFld.nNullBit % 8)) & 1).astype(bool)
+
+
+def _columntext(np, xBytes, nWidth, cCode, bStrip):
+    xValues = xBytes.view("S%d" % nWidth).ravel()
+    if bStrip:
+        xValues = np.char.rstrip(xValues, b" ")
+    if cCode == "X" or not _ver3x:
+        return np.char.decode(xValues, "latin-1") if _ver3x else xValues
+    cCodec = {"W": "mbcs", "D": "mbcs", "8": "utf-8", "U": "utf-8", "C": gcCustomCodePage}.get(cCode, "latin-1")
+    try:
+        return np.char.decode(xValues, cCodec, "replace")
+    except LookupError:
+        return np.char.decode(xValues, "cp1252", "replace")
+
+
+def _columnnumeric(np, xBytes, nWidth):
+    xText = np.char.strip(xBytes.view("S%d" % nWidth).ravel())
+    xText = np.where(xText == b"", b"0", xText)
+    try:
+        return xText.astype(np.float64)
+    except ValueError:
+        # Overflow asterisks or other junk in the field.  Same rule as a scatter(): bad values are 0.0.
+        xRet = np.zeros(len(xText), dtype=np.float64)
+        for jj, cRaw in enumerate(xText):
+            try:
+                xRet[jj] = float(cRaw)
+            except ValueError:
+                pass
+        return xRet
+
+
+def _columndate(np, xBytes):
+    xDigits = xBytes.astype(np.int64) - 48
+    bValid = np.all((xDigits >= 0) & (xDigits <= 9), axis=1)
+    xDigits = np.where(bValid[:, None], xDigits, 0)
+    nYear = xDigits[:, 0] * 1000 + xDigits[:, 1] * 100 + xDigits[:, 2] * 10 + xDigits[:, 3]
+    nMonth = xDigits[:, 4] * 10 + xDigits[:, 5]
+    nDay = xDigits[:, 6] * 10 + xDigits[:, 7]
+    bValid &= (nYear >= 200) & (nMonth >= 1) & (nMonth <= 12) & (nDay >= 1) & (nDay <= 31)
+    nYear = np.where(bValid, nYear, 1970)
+    nMonth = np.where(bValid, nMonth, 1)
+    nDay = np.where(bValid, nDay, 1)
+    xMonths = (nYear - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (nMonth - 1).astype("timedelta64[M]")
+    xRet = xMonths.astype("datetime64[D]") + (nDay - 1).astype("timedelta64[D]")
+    xRet[~bValid] = np.datetime64("NaT")
+    return xRet
+
+
+def _columndatetime(np, xBytes):
+    xPair = xBytes.view("<i4").reshape(-1, 2).astype(np.int64)
+    bValid = xPair[:, 0] >= date2jdn(date(200, 1, 1))
+    nSeconds = (xPair[:, 0] - date2jdn(date(1970, 1, 1))) * 86400 + (xPair[:, 1] + 500) // 1000
+    xRet = np.where(bValid, nSeconds, 0).astype("datetime64[s]")
+    xRet[~bValid] = np.datetime64("NaT")
+    return xRet
+
+
+def tocolumns(cAlias="", cFieldList="", cForExpr="", bStripBlanks=False, cCoding="XX"):
+    """
+    Reads the selected fields of every visible record of the table into one numpy array per field.  Records
+    come in the current order, and deleted records are left out when setdeleted() is ON.  The field bytes are
+    sliced for all the rows at once out of the mapped file, so only memo fields are decoded record by record.
+    Returns an OrderedDict keyed by field name, or None with the error set.  The tally is the row count.
+    """
+    global gnProcessTally
+    _clearerror()
+    try:
+        import numpy as np
+    except ImportError:
+        _seterror("tocolumns() requires the numpy package", -79020)
+        return None
+    oTable = _table(cAlias)
+    if oTable is None:
+        return None
+    xFields = _fieldlist(oTable, cFieldList)
+    if xFields is None:
+        return None
+    xFor = None
+    if cForExpr:
+        xFor = _compileexpr(oTable, cForExpr)
+        if xFor is None:
+            return None
+    cCodeAsc, cCodeBin = _codes(cCoding)
+    nRecCount = oTable.nRecCount
+    if oTable.oOrder is not None:
+        oTable.oOrder.load()
+        xRecnos = np.array(oTable.oOrder.xRecnos, dtype=np.int64)
+        if oTable.oOrder.bDescending:
+            xRecnos = xRecnos[::-1]
+        xRecnos = xRecnos[(xRecnos >= 1) & (xRecnos <= nRecCount)]
+    else:
+        xRecnos = np.arange(1, nRecCount + 1, dtype=np.int64)
+    if nRecCount > 0:
+        xArr = np.frombuffer(oTable.xMap, dtype=np.uint8, count=nRecCount * oTable.nRecLen,
+                             offset=oTable.nHeaderLen).reshape(nRecCount, oTable.nRecLen)
+    else:
+        xArr = np.zeros((0, oTable.nRecLen), dtype=np.uint8)
+    try:
+        if goSession.bDeleted and len(xRecnos):
+            xRecnos = xRecnos[xArr[xRecnos - 1, 0] != ord("*")]
+        if xFor is not None and len(xRecnos):
+            xRecnos = xRecnos[np.fromiter((bool(xFor(int(nR))) for nR in xRecnos), dtype=bool, count=len(xRecnos))]
+        xRows = xRecnos - 1
+        xReturn = collections.OrderedDict()
+        for oFld in xFields:
+            cType = oFld.cType
+            xNulls = _columnnulls(np, xArr, xRows, oTable, oFld)
+            if cType in ("M", "X", "G"):
+                xCol = np.empty(len(xRecnos), dtype=object)
+                for jj, nR in enumerate(xRecnos):
+                    xCol[jj] = oTable.value(oFld, int(nR), True, bStripBlanks, cCodeAsc, cCodeBin)
+                xReturn[oFld.cName] = xCol
+                continue
+            xBytes = _columnbytes(np, xArr, xRows, oFld)
+            if cType == "C":
+                xCol = _columntext(np, xBytes, oFld.nWidth, cCodeAsc, bStripBlanks)
+            elif cType == "Z" and cCodeBin == "X":
+                xCol = xBytes.view("S%d" % oFld.nWidth).ravel()
+                if bStripBlanks:
+                    xCol = np.char.rstrip(xCol, b" ")
+            elif cType == "Z":
+                xCol = _columntext(np, xBytes, oFld.nWidth, cCodeBin, bStripBlanks)
+            elif cType == "I":
+                xCol = xBytes.view("<i4").ravel().astype(np.int32)
+            elif cType in ("N", "F"):
+                xCol = _columnnumeric(np, xBytes, oFld.nWidth)
+            elif cType == "B":
+                xCol = xBytes.view("<f8").ravel().astype(np.float64)
+            elif cType == "Y":
+                xCol = xBytes.view("<i8").ravel() / 10000.0
+            elif cType == "L":
+                xCol = np.isin(xBytes[:, 0], np.frombuffer(b"TtYy", dtype=np.uint8))
+            elif cType == "D":
+                xCol = _columndate(np, xBytes)
+            elif cType == "T":
+                xCol = _columndatetime(np, xBytes)
+            else:
+                xCol = np.char.decode(xBytes.view("S%d" % oFld.nWidth).ravel(), "latin-1")
+            if xNulls is not None and xNulls.any():
+                if xCol.dtype.kind in "fc":
+                    xCol[xNulls] = np.nan
+                elif xCol.dtype.kind == "M":
+                    xCol[xNulls] = np.datetime64("NaT")
+                else:
+                    xCol = np.ma.masked_array(xCol, mask=xNulls)
+            xReturn[oFld.cName] = xCol
+    finally:
+        # The map can't be closed while a numpy view of it exists.
+        del xArr
+    gnProcessTally = len(xRecnos)
+    return xReturn
+
+
+# Functions which change data.  The compiled engine's failure return values are kept.
+selecttempindex = _notavailable("selecttempindex", False)
+closetempindex = _notavailable("closetempindex", False)
+tempindex = _notavailable("tempindex", 0)
+indexon = _notavailable("indexon", False)
+deletetag = _notavailable("deletetag", False)
+reindex = _notavailable("reindex", False)
+pack = _notavailable("pack", False)
+zap = _notavailable("zap", False)
+createtable = _notavailable("createtable", False)
+copytags = _notavailable("copytags", False)
+createtags = _notavailable("createtags", False)
+appendblank = _notavailable("appendblank", False)
+appendfrom = _notavailable("appendfrom", -1)
+appendlock = _notavailable("appendlock", False)
+flock = _notavailable("flock", False)
+rlock = _notavailable("rlock", False)
+unlock = _notavailable("unlock", False)
+delete = _notavailable("delete", False)
+recall = _notavailable("recall", False)
+recallall = _notavailable("recallall", False)
+replace = _notavailable("replace", False)
+replacelong = _notavailable("replacelong", False)
+replacedatetimen = _notavailable("replacedatetimen", False)
+gatherdict = _notavailable("gatherdict", False)
+insertbatch = _notavailable("insertbatch", None)
+replacewhere = _notavailable("replacewhere", None)
+deletewhere = _notavailable("deletewhere", None)
+gathermemvar = _notavailable("gathermemvar", False)
+insertintotable = _notavailable("insertintotable", False)
+copyto = _notavailable("copyto", -1)
+
+
+# **************************************************************************************************
+# Every public engine function holds the engine lock for the whole call, matching the CBX_LOCKED()
+# wrappers of the compiled engine.  The module globals are the state of the current session, which a
+# session handle swaps in for the length of each of its calls.
+# **************************************************************************************************
+
+_xEngineLock = threading.RLock()
+
+
+def _locked(xFunc):
+    def _wrapper(*args, **kwargs):
+        with _xEngineLock:
+            return xFunc(*args, **kwargs)
+    _wrapper.__name__ = xFunc.__name__
+    _wrapper.__doc__ = xFunc.__doc__
+    return _wrapper
+
+
+for _cName, _xFunc in list(globals().items()):
+    if callable(_xFunc) and not _cName.startswith("_") and getattr(_xFunc, "__module__", "") == __name__ \
+            and not isinstance(_xFunc, type) and _cName not in ("jdn2date", "date2jdn"):
+        globals()[_cName] = _locked(_xFunc)
+del _cName, _xFunc
+
+
+class session(object):
+    """
+    Handle bound to its own data session, the equivalent of the compiled engine's session type.  Every engine
+    function is available as a method, and works in the handle's session whatever session the module level
+    functions have selected.  The error message, error number and tally are kept per handle too.  Call
+    initdatasession() on the handle first, which binds the new session to it.
+    """
+    def __init__(self):
+        self.nSession = -1
+        self._xState = ("", 0, 0)  # Error message, error number and tally of the last call.
+
+    def __getattr__(self, cName):
+        xFunc = globals().get(cName)
+        if cName.startswith("_") or not callable(xFunc) or isinstance(xFunc, type):
+            raise AttributeError(cName)
+
+        def _call(*args, **kwargs):
+            return self._run(xFunc, cName, args, kwargs)
+        _call.__name__ = cName
+        _call.__doc__ = xFunc.__doc__
+        return _call
+
+    def _run(self, xFunc, cName, args, kwargs):
+        global gnCurrentSession, goSession, gcErrorMessage, gnLastErrorNumber, gnProcessTally
+        with _xEngineLock:
+            xSaved = (gnCurrentSession, gcErrorMessage, gnLastErrorNumber, gnProcessTally)
+            goSession = gxSessions.get(self.nSession)
+            gnCurrentSession = (self.nSession if goSession is not None else -1)
+            gcErrorMessage, gnLastErrorNumber, gnProcessTally = self._xState
+            try:
+                xReturn = xFunc(*args, **kwargs)
+                if cName == "closedatasession":
+                    # Unlike the module level call, closing doesn't select some other session for the handle.
+                    self.nSession = (self.nSession if self.nSession in gxSessions else -1)
+                else:
+                    self.nSession = gnCurrentSession
+                self._xState = (gcErrorMessage, gnLastErrorNumber, gnProcessTally)
+            finally:
+                gnCurrentSession, gcErrorMessage, gnLastErrorNumber, gnProcessTally = xSaved
+                goSession = gxSessions.get(gnCurrentSession)
+                if goSession is None:
+                    gnCurrentSession = -1
+            return xReturn
+
+    def __del__(self):
+        try:
+            if self.nSession >= 0:
+                closedatasession(self.nSession)
+        except Exception:
+            pass
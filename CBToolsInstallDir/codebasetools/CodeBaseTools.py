@@ -42,6 +42,27 @@ CodeBaseTools module imports the correct one based on the version of Python you
 
 Currently, this module supports Python versions: 2.7, 3.6, 3.7, 3.8, and 3.9.
 
+Pure Python read-only engine
+............................
+Where no compiled engine matches the running Python, for example on Linux or on a Python version the .pyd
+has not been built for yet, this module loads CodeBasePYReader instead.  That engine is written in Python,
+memory maps the .DBF, .FPT and .CDX files, and supports all the methods which read data: use(), goto(), skip(),
+seek(), scatter(), scan(), locate(), countfor(), calcfor() and the like.  Methods which would change a table
+fail with nErrorNumber set to -79001.  It can also be requested explicitly with cbToolsX(cEngine="READER").
+
+Threads
+.......
+Each _cbTools() instance has its own data session, and the engine state (current table, error message,
+filters and so on) belongs to the session.  The instance is bound to its session through a session handle
+from the engine, so instances don't disturb each other's selected table or error text, and one instance
+made with cbToolsX() per worker thread is the way to do work in parallel.  Only one thread at a time
+executes an engine call in a given session, so threads sharing an instance take turns.  The compiled engine
+releases the GIL while CodeBase does the work in the long running calls: indexon(), reindex(), pack(), zap(),
+calcfor(), countfor(), locate(), appendfrom() and copyto().  Other Python threads keep running during those
+calls, including engine calls in other sessions.  The pure Python reader runs only one engine call at a time
+in the whole process.  For asyncio programs, AsyncCBTools runs a session in a worker thread of its own and
+provides its methods as coroutines, so table work doesn't block the event loop.
+
 String handling for Python 2/3 compatibility
 .............................................
 Effective with the April, 2018 changes for Python 2 and 3 compatibility, all text values passed to the
@@ -275,18 +296,32 @@ table, and in the process of trying may corrupt it.  Beware.
 
 from __future__ import print_function, absolute_import
 import decimal
+import math
 import os
 import csv
 from time import time, localtime, strftime, sleep
 from locale import atoi
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import copy
 import sys
+import struct
+import weakref
 import shutil
 import random
 import glob
 import collections
-from xml.dom import minidom
+import collections.abc
+import re
+import threading
+import functools
+import itertools
+import types
+import inspect
+import asyncio
+import concurrent.futures
+import multiprocessing
+import io
+from xml.etree import ElementTree
 
 # from sqlalchemy import False_
 
@@ -296,26 +331,37 @@ nPyVer = sys.version_info.major
 nPySubVer = sys.version_info.minor
 cVersion = sys.version
 
-if nPyVer == 2 and nPySubVer == 7:
-    import CodeBasePYWrapper27 as cbp
-elif nPyVer == 3 and nPySubVer == 6:
-    import CodeBasePYWrapper36 as cbp
-elif nPyVer == 3 and nPySubVer == 7:
-    import CodeBasePYWrapper37 as cbp
-elif nPyVer == 3 and nPySubVer == 8:
-    import CodeBasePYWrapper38 as cbp
-elif nPyVer == 3 and nPySubVer == 9:
-    import CodeBasePYWrapper39 as cbp
-elif nPyVer == 3 and nPySubVer == 10:
-    import CodeBasePYWrapper310 as cbp
-elif nPyVer == 3 and nPySubVer == 11 and "32 bit" in cVersion:
-    import CodeBasePYWrapper311 as cbp
-elif nPyVer == 3 and nPySubVer == 11 and "64 bit" in cVersion:
-    import CodeBasePYWrapper64_311 as cbp
-elif nPyVer == 3 and nPySubVer == 12 and "32 bit" in cVersion:
-    import CodeBasePYWrapper312 as cbp
+# The compiled engine is preferred.  If there is no .pyd for this version of Python (or this is not Windows), the
+# pure Python read-only engine in CodeBasePYReader is loaded instead.  See _getengine().
+cbpCompiled = None
+try:
+    if nPyVer == 2 and nPySubVer == 7:
+        import CodeBasePYWrapper27 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 6:
+        import CodeBasePYWrapper36 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 7:
+        import CodeBasePYWrapper37 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 8:
+        import CodeBasePYWrapper38 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 9:
+        import CodeBasePYWrapper39 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 10:
+        import CodeBasePYWrapper310 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 11 and "32 bit" in cVersion:
+        import CodeBasePYWrapper311 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 11 and "64 bit" in cVersion:
+        import CodeBasePYWrapper64_311 as cbpCompiled
+    elif nPyVer == 3 and nPySubVer == 12 and "32 bit" in cVersion:
+        import CodeBasePYWrapper312 as cbpCompiled
+except ImportError:
+    cbpCompiled = None
+
+if cbpCompiled is not None:
+    cbp = cbpCompiled
+    gcDefaultEngine = "PYD"
 else:
-    raise ValueError("Not a supported version of Python")
+    import CodeBasePYReader as cbp
+    gcDefaultEngine = "READER"
 
 # Note test below for Python version: 2.x vs 3.x and higher.
 if sys.version_info[0] <= 2:
@@ -377,10 +423,33 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #                 with the same alias.
 # 06/22/2020 JSH. Added more license notices for Sequiter product and removed all dependencies on MPSS-specific
 #                 modules except for the CodeBasePYWrapper
+# 10/18/2026. Added the pure Python read-only engine CodeBasePYReader, which is selectable with the cEngine
+#             parameter of cbTools() and cbToolsX() and is loaded automatically when no compiled .pyd matches
+#             the running Python.
+# 10/18/2026. Each _cbTools() instance now makes its engine calls through a session handle from the engine,
+#             which keeps the instance in its own data session, rather than through the module level
+#             functions, which all share one current session.
 
 gnNextKeyTableNameLength = 0
 gcLastErrorMessage = ""
 
+
+def _getengine(cEngine=""):
+    """
+    Returns the engine module for the cEngine code.  Pass "PYD" for the compiled CodeBasePYWrapperXX.pyd,
+    "READER" for the pure Python read-only CodeBasePYReader, or "" for the default, which is the compiled engine
+    if one is available for this version of Python, otherwise the reader.
+    """
+    cEngine = (cEngine or gcDefaultEngine).upper()
+    if cEngine == "PYD":
+        if cbpCompiled is None:
+            raise ValueError("Not a supported version of Python")
+        return cbpCompiled
+    if cEngine == "READER":
+        import CodeBasePYReader
+        return CodeBasePYReader
+    raise ValueError("Unknown CodeBaseTools engine: " + str(cEngine))
+
 # **************************************************************************************************
 # The following values and functions are included to avoid requiring dependencies from other MPSS
 # modules.
@@ -693,6 +762,240 @@ class VFPINDEXTAG(object):
         return bRet
 
 
+class VFPEXPR(str):
+    """
+    Marks a string in the values dict() of replacewhere() as a VFP expression, like the WITH clause of the VFP
+    REPLACE command, in place of a value to store.  The engine evaluates it for each record changed.
+
+    Example:
+    ::
+        oCBT.replacewhere("PRICES", "CATEGORY = 'A'", {"PRICE": VFPEXPR("PRICE * 1.05"), "CHANGED": date.today()})
+    """
+    __slots__ = ()
+
+
+class SCHEMAFIELD(object):
+    """
+    Read only description of one field in a TableSchema, see tableschema().  Has the same attributes as VFPFIELD,
+    with two more:
+
+        nIndex: The position of the field in the table, starting at 0.
+
+        fnConvert: A function of one value which checks it against the field type and returns the value to store,\
+        with numeric strings converted to numbers for the numeric fields.  Raises ValueError or TypeError for a value\
+        the field can't take.  Used by TableAppender.append().
+
+        nOffset: The position of the field in the raw record, where the deleted flag is byte 0.  -1 if the .DBF\
+        header couldn't be read.  Used by RecordView.
+
+        nNullBit: The bit of the field in the _NullFlags system field, or -1 if the field doesn't take nulls.
+    """
+    __slots__ = ("cName", "cType", "nWidth", "nDecimals", "bNulls", "nIndex", "fnConvert", "nOffset", "nNullBit")
+
+    def __init__(self, cName, cType, nWidth, nDecimals, bNulls, nIndex, nOffset=-1, nNullBit=-1):
+        for cAttr, xValue in zip(self.__slots__, (cName, cType, nWidth, nDecimals, bNulls, nIndex,
+                                                  functools.partial(_appendervalue, cType), nOffset, nNullBit)):
+            object.__setattr__(self, cAttr, xValue)
+
+    def __setattr__(self, cName, xValue):
+        raise AttributeError("SCHEMAFIELD is read only")
+
+    def __str__(self):
+        return str({"cName": self.cName, "cType": self.cType, "nWidth": str(self.nWidth),
+                    "nDecimals": str(self.nDecimals), "bNulls": str(self.bNulls)})
+
+    def tovfpfield(self):
+        """ Returns a new VFPFIELD with the same values, which unlike this object may be changed. """
+        xFld = VFPFIELD()
+        xFld.cName = self.cName
+        xFld.cType = self.cType
+        xFld.nWidth = self.nWidth
+        xFld.nDecimals = self.nDecimals
+        xFld.bNulls = self.bNulls
+        return xFld
+
+
+class SCHEMATAG(object):
+    """ Read only description of one index tag in a TableSchema.  Has the same attributes as VFPINDEXTAG. """
+    __slots__ = ("cTagName", "cTagExpr", "cTagFilt", "nDirection", "nUnique")
+
+    def __init__(self, cTagName, cTagExpr, cTagFilt, nDirection, nUnique):
+        for cAttr, xValue in zip(self.__slots__, (cTagName, cTagExpr, cTagFilt, nDirection, nUnique)):
+            object.__setattr__(self, cAttr, xValue)
+
+    def __setattr__(self, cName, xValue):
+        raise AttributeError("SCHEMATAG is read only")
+
+    def __str__(self):
+        return str({"cTagName": self.cTagName, "cTagExpr": self.cTagExpr, "cTagFilt": self.cTagFilt,
+                    "nDirection": str(self.nDirection), "nUnique": str(self.nUnique)})
+
+    def tovfpindextag(self):
+        """ Returns a new VFPINDEXTAG with the same values. """
+        vTag = VFPINDEXTAG()
+        vTag.cTagName = self.cTagName
+        vTag.cTagExpr = self.cTagExpr
+        vTag.cTagFilt = self.cTagFilt
+        vTag.nDirection = self.nDirection
+        vTag.nUnique = self.nUnique
+        return vTag
+
+
+class TableSchema(object):
+    """
+    Read only structure information for one open table, as returned by the tableschema() method of _cbTools, which
+    caches it.
+
+    Attributes:
+        cAlias: The alias of the table.
+
+        cPath: The full path name of the .DBF file.
+
+        xToken: The header change token of the table when the schema was read, see tableschema().
+
+        xFields: A tuple of SCHEMAFIELD objects in the order the fields appear in the table.
+
+        xIndex: A read only mapping of the upper case field names to their position in xFields.
+
+        xTypes: A read only mapping of the upper case field names to their type codes, as afieldtypes() returns.
+
+        xTags: A tuple of SCHEMATAG objects, one for each tag in the CDX, in the order ataginfo() returns them.
+
+        cFieldList: The comma delimited list of all the field names, in table order.
+
+        nRecordLength: The length of the raw record from the .DBF header, or 0 if the header couldn't be read.
+
+        nNullFlags: The position of the _NullFlags system field in the raw record, or -1 if the table has none.
+    """
+    __slots__ = ("cAlias", "cPath", "xToken", "xFields", "xIndex", "xTypes", "xTags", "cFieldList", "nRecordLength",
+                 "nNullFlags")
+
+    def __init__(self, cAlias, cPath, xToken, xFields, xTags, nRecordLength=0, nNullFlags=-1):
+        xFields = tuple(xFields)
+        for cAttr, xValue in zip(self.__slots__, (
+                cAlias, cPath, xToken, xFields,
+                types.MappingProxyType(dict((xF.cName.upper(), xF.nIndex) for xF in xFields)),
+                types.MappingProxyType(dict((xF.cName.upper(), xF.cType) for xF in xFields)),
+                tuple(xTags), ",".join(xF.cName for xF in xFields), nRecordLength, nNullFlags)):
+            object.__setattr__(self, cAttr, xValue)
+
+    def __setattr__(self, cName, xValue):
+        raise AttributeError("TableSchema is read only")
+
+    def field(self, cName):
+        """ Returns the SCHEMAFIELD for the field cName, in any case, or None if the table has no such field. """
+        nIndex = self.xIndex.get(cName.upper())
+        return (None if nIndex is None else self.xFields[nIndex])
+
+
+class RecordView(collections.abc.Mapping):
+    """
+    Read only view of one record, as returned by scatterview() and by scan() with view=True.  Holds a copy of the raw
+    record from the engine, without decoding any of it.  A field is decoded the first time it is read and the value
+    is kept, so a loop that reads 3 fields of a 60 field table pays for 3 fields only.  Memo fields are read from the
+    table when they are first asked for, see below.
+
+    Fields can be read as view["NAME"] or as view.NAME, with the field name in any case, and the view works as a
+    read only Mapping with the same keys and values as the dict() from scatter(), so get(), keys(), items() and
+    "NAME" in view all work.  todict() returns a plain dict() of all the fields.  The Mapping method names win
+    over a field with the same name as an attribute, so use view["KEYS"] for a field called KEYS.
+
+    Attributes:
+        nRecno: The record number of the record.
+
+    Memo fields (M, X and G) hold only their block number in the raw record, so the value is read from the table the
+    first time the field is read: the record pointer goes to nRecno, the memo is read and the pointer goes back.  It
+    is the memo as it is at that time, not when the view was made.  This needs the _cbTools instance the view came
+    from to still exist, and the table to still be open under the same alias.  ValueError is raised if it can't be
+    read.
+    """
+    __slots__ = ("_oContext", "_xBuffer", "_nBase", "_xValues", "nRecno")
+
+    def __init__(self, oContext, xBuffer, nBase, nRecno):
+        self._oContext = oContext
+        self._xBuffer = xBuffer
+        self._nBase = nBase
+        self._xValues = dict()
+        self.nRecno = nRecno
+
+    def __getitem__(self, cName):
+        xValues = self._xValues
+        if cName in xValues:
+            return xValues[cName]
+        cKey = (cName.upper() if isstr(cName) else cName)
+        if cKey in xValues:
+            return xValues[cKey]
+        fnDecode = self._oContext.decoder(cKey)
+        if fnDecode is None:
+            raise KeyError(cName)
+        xValue = fnDecode(self)
+        xValues[cKey] = xValue
+        return xValue
+
+    def __getattr__(self, cName):
+        if cName.startswith("_"):
+            raise AttributeError(cName)
+        try:
+            return self[cName]
+        except KeyError:
+            raise AttributeError("No field named " + cName)
+
+    def __setattr__(self, cName, xValue):
+        if cName not in RecordView.__slots__:
+            raise AttributeError("RecordView is read only")
+        object.__setattr__(self, cName, xValue)
+
+    def __contains__(self, cName):
+        return isstr(cName) and cName.upper() in self._oContext.xSchema.xIndex
+
+    def __iter__(self):
+        return iter(self._oContext.xNames)
+
+    def __len__(self):
+        return len(self._oContext.xNames)
+
+    def __repr__(self):
+        return "<RecordView %s record %d>" % (self._oContext.cAlias, self.nRecno)
+
+    def isdeleted(self):
+        """ Returns True if the record was marked deleted when the view was made. """
+        return self._xBuffer[self._nBase:self._nBase + 1] == b"*"
+
+    def todict(self):
+        """ Returns a new dict() of all the fields of the record, as scatter() would, decoding any not yet read. """
+        return dict((cName, self[cName]) for cName in self._oContext.xNames)
+
+
+class _ViewContext(object):
+    """
+    What the RecordView objects of one table and one set of decoding options share: the TableSchema and the field
+    decoders, which are made the first time each field is read.  The _cbTools instance is held by a weak reference,
+    as the instance keeps its last context.
+    """
+    __slots__ = ("vfp", "cAlias", "xSchema", "xNames", "bStrip", "cCoding", "xDecoders", "__weakref__")
+
+    def __init__(self, vfp, cAlias, xSchema, bStrip, cCoding):
+        self.vfp = weakref.ref(vfp)
+        self.cAlias = cAlias
+        self.xSchema = xSchema
+        self.xNames = tuple(xF.cName.upper() for xF in xSchema.xFields)
+        self.bStrip = bStrip
+        self.cCoding = cCoding
+        self.xDecoders = dict()
+
+    def decoder(self, cName):
+        """ Returns the decoding function for the field cName (upper case), or None if there is no such field. """
+        fnDecode = self.xDecoders.get(cName)
+        if fnDecode is None:
+            xField = self.xSchema.field(cName) if isstr(cName) else None
+            if xField is None:
+                return None
+            oVFP = self.vfp()
+            fnDecode = _viewdecoder(self, xField, (oVFP.cPreferredEncoding if oVFP is not None else "cp1252"))
+            self.xDecoders[cName] = fnDecode
+        return fnDecode
+
+
 class _cbTools(object):
     """
     The _cbTools class is the heart of the CodeBaseTools module.  It provides a very wide range of tools for creating,
@@ -704,8 +1007,11 @@ class _cbTools(object):
     recArray = list()
     _tablenames = list()
     
-    def __init__(self, bLargeMode=False):
-        """ Initializer routine. """
+    def __init__(self, bLargeMode=False, cEngine=""):
+        """
+        Initializer routine.  cEngine selects the data engine, see cbToolsX() for the values allowed.  The code of
+        the engine actually in use is kept in the cEngine property.
+        """
         self.cErrorMessage = ""
         self.nErrorNumber = 0
         self.bUseDecimals = False  # Set this to True to return Number field values as decimal.Decimal() type values.
@@ -717,15 +1023,30 @@ class _cbTools(object):
         self.xNonPrintables = dict()
         for c in self.cNonPrintables:
             self.xNonPrintables[ord(c)] = None
-        self.cbt = cbp
+        self.nDataSession = -1  # In case the engine can't be loaded, so __del__() has nothing to do.
+        self.cbt = _getengine(cEngine)
+        self.cEngine = ("READER" if self.cbt.__name__ == "CodeBasePYReader" else "PYD")
+        if hasattr(self.cbt, "session"):
+            self.cbt = self.cbt.session()  # Engine calls on the handle always work in this instance's session.
         self.nDataSession = self.cbt.initdatasession(bLargeMode)
 
         self.oCSV = csv
         self.xLastFieldList = []  # Used by scattertorecord() to avoid having to repeat afields()
-        self.cLastRecordAlias = ""  # ditto
+        self.xLastRecordSchema = None  # ditto, the tableschema() the xLastRecordTemplate was made from.
         self.xLastRecordTemplate = None
         self.name = "CodeBaseTools"
         self.cPreferredEncoding = "cp1252"  # Windows Codepage for Western European languages.  Like "Latin-1".
+        self.xAppendRejects = []  # Rows skipped by the last CSV or TAB/TXT appendfrom(), see appendfrom().
+        self.nLookupCacheSize = 1000  # Default most results cachedlookup() keeps per table.
+        self.nLookupCacheInterval = 2.0  # Seconds between checks of a cached table's change token.
+        self.nCacheHits = 0
+        self.nCacheMisses = 0
+        self._xLookupCaches = dict()  # alias: [OrderedDict of results, change token, time of next token check]
+        self._xLookupCacheSizes = dict()
+        self.nSchemaCacheInterval = 2.0  # Seconds between checks of a cached table schema's header change token.
+        self._xSchemas = dict()  # alias: [TableSchema, time of next token check]
+        self._oLastView = None  # The _ViewContext of the last scatterview() or scan(view=True).
+        self.bQueryPlanner = True  # Lets scan() and copytoarray() use index range scans, see explain().
 
     def __getitem__(self, xfile):
         return self.TableObj(xfile)
@@ -748,6 +1069,8 @@ class _cbTools(object):
         if self.nDataSession >= 0:
             self.cbt.closedatasession(self.nDataSession)
             self.nDataSession = -1
+        self.clearschemacache()
+        self.clearlookupcache()
         return True
 
     def TableObj(self, *args, **kwargs):
@@ -850,6 +1173,48 @@ class _cbTools(object):
             - Finally, test your applications thoroughly if you are using the TableObj() mode, to make\
               sure that all functions you are using work correctly in this mode.  We make no guarantees.
 
+        Cursor mode:
+            Each field property read normally costs a curval() plus selects of the table and back, and each\
+            assignment a replace().  Pass cursor=True for a table object which instead scatter()s the current\
+            record once and answers field reads from that copy, and which keeps assignments until the record\
+            pointer moves or you call flush(), then writes them all with one gatherdict().  Iterating with\
+            "for r in oTable" or next() reads the records batchSize at a time with the engine scatterbatch().\
+            The copies are read with the trailing blanks stripped, so fields read the same as in plain mode.
+            ::
+                oShip = oCBT.TableObj(r"c:\somepath\shipmstr.dbf", cursor=True, batchSize=200)
+                for r in oShip:
+                    if r.status == "H":
+                        r.status = "R"
+                        r.relsdate = date.today()
+                oShip.flush()
+
+            - Assigned values are read back as assigned, so a string assigned to a C field comes back without\
+              the padding, until the record is read again.
+
+            - Calling any method on the object through the table object, like seek(), goto(), replace(),\
+              delete() or rlock(), first writes the pending assignments and puts the table's record pointer\
+              back on the current record (which is behind the engine's pointer while iterating in batches),\
+              then drops the copy, so the next field read scatter()s whatever record the method left current.\
+              recno() and eof() are answered from the batch while iterating.  The few methods that only\
+              describe the table, like alias(), dbf(), reccount() and afields(), do none of this.
+
+            - refreshrecord() is a method like any other: the pending assignments are written first, then the\
+              record is re-read from disk and the next field read takes a fresh copy.  To throw the pending\
+              assignments away instead, call discard() before it.
+
+            - The pending assignments are written to the engine's record buffer with gatherdict(), and CodeBase\
+              writes the record to disk, placing and releasing the record lock, when the pointer leaves it or on\
+              flush().  A lock that can't be had shows as an error from that move or flush.  If gatherdict()\
+              itself fails when the pointer is about to move, ValueError is raised, the pointer doesn't move and\
+              the assignments stay pending, while flush() just returns False.  With heavy update traffic on the\
+              table, lock the record with rlock() before assigning and call flush() before unlock(), as in plain\
+              use.
+
+            - The records of a batch are as they were when the batch was read, and changes to records other than\
+              the current one made through the _cbTools instance directly aren't seen in them.  Moving this table's\
+              record pointer through the _cbTools instance directly, not through the table object, isn't noticed\
+              either.  Call discard() or flush() first and don't use the copy afterwards.
+
         Args:
             tablename: should include full path name of table to open OR an alias of a table already open.
 
@@ -857,6 +1222,10 @@ class _cbTools(object):
 
             reset: will cause file to be re-opened if already open.
 
+            cursor: Pass True for the cursor mode described above.
+
+            batchSize: The count of records each batch reads when iterating in cursor mode, default 100.
+
         Returns:
             A table object for use in subsequent access to the table and its records.
         """
@@ -1084,6 +1453,12 @@ class _cbTools(object):
         if not lbReturn:
             self.cErrorMessage = self.cbt.geterrormessage() + " OPEN FAILED"
             self.nErrorNumber = self.cbt.geterrornumber()
+            if alias:
+                self.clearschemacache(alias)
+                self.clearlookupcache(alias)
+        else:
+            self.clearschemacache(self.cbt.alias())
+            self.clearlookupcache(self.cbt.alias())  # The alias may have held another table before.
 
         return lbReturn
 
@@ -1276,6 +1651,7 @@ class _cbTools(object):
         DELETEFILE(cTempMemo)
         DELETEFILE(cTempIndex)
 
+        self.clearschemacache()
         self.cErrorMessage = cErr
         self.nErrorNumber = nErr
         return bReturn
@@ -1356,6 +1732,7 @@ class _cbTools(object):
             unique = 0  # Make sure it's a valid value.
 
         lbReturn = self.cbt.indexon(lcTag, lcExpr, tagFilter, descending, unique)
+        self.clearschemacache(self.cbt.alias())
         if not lbReturn:
             self.cErrorMessage = self.cbt.geterrormessage()
             self.nErrorNumber = self.cbt.geterrornumber()
@@ -1523,10 +1900,11 @@ class _cbTools(object):
           of a scan().
         - Since this executes entirely in the 'C' engine, it will be much faster than scanning through a table
           with Python code calling lower level CBTools functions.
-        - If the fldexpr contains only the name of an Integer type field, the result will always be 0.0 UNLESS
-          you append a "+0" to the expression (due to an oddity in the way CodeBase handles Integer fields).  So,
-          if S_NUM is an Integer, and you need the sum of these values, pass "S_NUM+0" as the value of fldexpr.  This
-          does not apply to Number type fields.  It has not been tested with Double, Float, or Currency type fields.
+        - If the fldexpr contains only the name of an Integer type field, the engine adds the "+0" which CodeBase
+          needs to give the value of the field (without it the result would always be 0.0), so "S_NUM" and "S_NUM+0"
+          give the same result.  Older versions of the engine required you to add the "+0" yourself.
+        - To get several statistics over the same records, use calcmulti(), which reads the table once for all of
+          them.
 
         Args:
             stat: Specifies the type of calculation to be performed on the table.  Allowed values are:
@@ -1561,6 +1939,118 @@ class _cbTools(object):
             self.nErrorNumber = self.cbt.geterrornumber()
         return lnResult
 
+    def calcmulti(self, exprs, stats=None, forexpr="", alias=""):
+        """
+        Calculates several statistics over the records of a table that satisfy forexpr, all in one pass of the
+        table in the 'C' engine, in place of one calcfor() call, and so one pass, for each.  This obeys the setting
+        of DELETED and does not alter the current record pointer position or the selected table.  Like calcfor() it
+        must NEVER be used in the midst of a locate/continue/locateclear sequence.
+
+        Example:
+        ::
+            xTile = oCBT.calcmulti("CHARGES", ["SUM", "AVG", "MIN", "MAX", "COUNT"], "CARRIER = 'UPS'")
+            nTotal = xTile["SUM"]
+
+            xStats = oCBT.calcmulti([("SUM", "WEIGHT"), ("MAX", "CHARGES"), ("COUNT", "")])
+            nWeight = xStats[("SUM", "WEIGHT")]
+
+        Args:
+            exprs: Either a single numeric expression, as for the fldexpr of calcfor(), a list of expressions, or\
+            when stats is None, a list of tuples of (stat, fldexpr).
+
+            stats: A list of the statistics to work out for each expression in exprs: "SUM", "AVG", "MAX" and "MIN"\
+            as for calcfor(), and "COUNT", the number of records.  None when exprs is a list of (stat, fldexpr).
+
+            forexpr: A logical expression for the records to include.  Empty for all the records.
+
+            alias: The alias of the open table.  Empty for the currently selected table.
+
+        Returns:
+            A dict() of the results.  When exprs is a single expression the keys are the stat names, otherwise they\
+            are (stat, fldexpr) tuples, with the stat names in upper case.  The values are floats, except for COUNT\
+            which is an int.  If no records match, COUNT is 0 and the other statistics are None.  Integer fields\
+            don't need the "+0" older versions of calcfor() required.  None on error, with cErrorMessage and\
+            nErrorNumber set.
+        """
+        if stats is None:
+            xPairs = [(cStat.upper(), cExpr or "") for cStat, cExpr in exprs]
+            xKeys = xPairs
+        elif isstr(exprs):
+            xPairs = [(cStat.upper(), exprs) for cStat in stats]
+            xKeys = [cStat for cStat, cExpr in xPairs]
+        else:
+            xPairs = [(cStat.upper(), cExpr) for cExpr in exprs for cStat in stats]
+            xKeys = xPairs
+        xResult = self.calcgroup(alias, "", xPairs, forexpr)
+        if xResult is None:
+            return None
+        if xResult:
+            xValues = xResult[0][1:]
+        else:
+            xValues = [(0 if cStat == "COUNT" else None) for cStat, cExpr in xPairs]
+        return dict(zip(xKeys, xValues))
+
+    def calcgroup(self, alias, groupExpr, stats, forExpr="", bSorted=False):
+        """
+        Group-by version of calcfor().  Works out any number of statistics for each distinct value of groupExpr
+        over the records of the table alias that satisfy forExpr, all in one pass of the table in the 'C' engine,
+        in place of a calcfor() call per statistic per group.  This obeys the setting of DELETED and does not alter
+        the current record pointer position or the selected table.  Like calcfor() it must NEVER be used in the
+        midst of a locate/continue/locateclear sequence.
+
+        Example:
+        ::
+            xTotals = oCBT.calcgroup("SHIPMSTR", "CARRIER", [("SUM", "WEIGHT"), ("AVG", "CHARGES"), ("COUNT", "")],
+                                     "SHIPDATE >= DATE(2026,1,1)")
+            for cCarrier, nWeight, nAvgCharge, nCount in xTotals:
+                ...
+
+        Args:
+            alias: The alias of the open table.  Empty for the currently selected table.
+
+            groupExpr: An expression giving a character or numeric value, usually just a field name, which defines\
+            the groups.  For dates use something like DTOS(SHIPDATE).
+
+            stats: A list of tuples of (stat, fldexpr), where stat is "SUM", "AVG", "MAX" or "MIN" as for calcfor(),\
+            or "COUNT", for which fldexpr is ignored.
+
+            forExpr: A logical expression for the records to include.  Empty for all the records.
+
+            bSorted: Pass True when the current index order of the table brings records with the same group value\
+            together, for example an order on CARRIER when grouping by CARRIER.  The table is then read in that\
+            order and each group is finished when the value changes, so no hash table of the groups is needed,\
+            and the results come back in index order.  If the order doesn't keep the groups together, a group value\
+            will appear more than once in the results.
+
+        Returns:
+            A list of tuples of (group value, stat 1, stat 2, ...), one per group, in order of the group value, or in\
+            index order when bSorted is True.  Character group values are not stripped.  Numeric group values and the\
+            statistics are floats, except COUNT values which are ints.  None on error, with cErrorMessage and\
+            nErrorNumber set.  The tally is set to the number of groups.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        xStats = list()
+        for cStat, cExpr in stats:
+            lnStat = (5 if cStat.upper() == "COUNT" else self.xCalcTypes.get(cStat.upper(), 0))
+            if not lnStat:
+                self.cErrorMessage = "Bad Statistic Type"
+                self.nErrorNumber = -34934
+                return None
+            xStats.append((lnStat, cExpr or ""))
+        lcOldAlias = self.alias()
+        if alias and not self.select(alias):
+            return None
+        xResult = self.cbt.calcgroup(groupExpr, xStats, forExpr, bSorted)
+        if xResult is None:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+        else:
+            self.tally = len(xResult)
+        if alias and lcOldAlias:
+            self.cbt.select(lcOldAlias)
+        return xResult
+
     def deleted(self):
         """
         Determines if the current record of the currently selected table has been marked for deletion.
@@ -1807,6 +2297,7 @@ class _cbTools(object):
         self.nErrorNumber = 0
 
         lbReturn = self.cbt.deletetag(tagname)
+        self.clearschemacache(self.cbt.alias())
         if (not lbReturn) and (self.cbt.geterrornumber() != 0):
             self.cErrorMessage = self.cbt.geterrormessage()
             self.nErrorNumber = self.cbt.geterrornumber()
@@ -1856,29 +2347,12 @@ class _cbTools(object):
 
         Return a list() object or None on error.
         """
-        lxListReturn = list()
-        self.cErrorMessage = ""
-        self.nErrorNumber = 0
         self.tally = 0
-
-        lxInfoList = self.cbt.ataginfo()
-        if lxInfoList is not None:
-            self.tally = len(lxInfoList)
-            for xI in lxInfoList:
-                vTag = VFPINDEXTAG()
-                vTag.cTagName = xI["cTagName"]
-                vTag.cTagExpr = xI["cTagExpr"]
-                vTag.cTagFilt = xI["cTagFilt"]
-                vTag.nDirection = xI["nDirection"]
-                vTag.nUnique = xI["nUnique"]
-                lxListReturn.append(vTag)
-                vTag = None
-            del lxInfoList
-        else:
-            self.cErrorMessage = self.cbt.geterrormessage()
-            self.nErrorNumber = self.cbt.geterrornumber()
-            lxListReturn = None
-        return lxListReturn
+        xSchema = self.tableschema()
+        if xSchema is None:
+            return None
+        self.tally = len(xSchema.xTags)
+        return [xT.tovfpindextag() for xT in xSchema.xTags]
 
     def order(self):
         """
@@ -1895,6 +2369,78 @@ class _cbTools(object):
             self.nErrorNumber = self.cbt.geterrornumber()
         return cReturn
 
+    def getposition(self, alias=""):
+        """
+        Returns the position of the table alias (or the currently selected table) as a tuple of the record number,
+        a flag which is 0 on a record, 1 at EOF and 2 at BOF, and the selected index tag name ("" for record number
+        order).  Pass it to setposition() to put the table back there.  Returns None on error.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        if not hasattr(self.cbt, "getposition"):
+            self.cErrorMessage = "getposition() is not supported by this engine"
+            self.nErrorNumber = -9976
+            return None
+        xReturn = self.cbt.getposition(alias)
+        if xReturn is None:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+        return xReturn
+
+    def setposition(self, position, alias=""):
+        """
+        Puts the table alias (or the currently selected table) back at a position from getposition(): selects the
+        index tag, then goes to the record, or to EOF or BOF.  The record is gone to directly, as goto("RECORD")
+        does, even if it is deleted.  Returns True if OK, otherwise False.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        if not hasattr(self.cbt, "setposition"):
+            self.cErrorMessage = "setposition() is not supported by this engine"
+            self.nErrorNumber = -9976
+            return False
+        bReturn = self.cbt.setposition(alias, position[0], position[1], position[2])
+        if not bReturn:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+        return bReturn
+
+    def tablecursor(self, alias="", order=None):
+        """
+        Returns a TableCursor on the open table alias (or the currently selected table).  A cursor has its own
+        record pointer, index order, filter and locate expression, but shares the one open of the table with this
+        instance and with any other cursors on it, so nested scans and side lookups into the same table don't need
+        it opened again under another alias.  order is the index tag for the cursor, "" for record number order,
+        or None to take the current order of the table.  The cursor starts at the top.
+
+        Example:
+        ::
+            oOrders = oCBT.tablecursor("ORDERS", order="CUSTNO")
+            oParents = oCBT.tablecursor("ORDERS", order="ORDERNO")
+            for xOrder in oOrders.scan(forExpr="STATUS = 'O'"):
+                if oParents.seek(xOrder["PARENTNO"]):
+                    xParent = oParents.scatter()
+
+        Any _cbTools method can be called on the cursor, like seek(), scatter(), replace() or setorderto().  For
+        each call the cursor puts its position and order in place on the table, runs the method on the table, takes
+        the new position and order back and then puts the table back where it was, which costs a couple of engine
+        calls either side.  So plain calls on the table, and the other cursors, never see the cursor move.  A with
+        block on the cursor does the same around the whole block, for running several calls at the cursor position:
+        ::
+            with oParents:
+                oCBT.replace("STATUS", "C")
+                oCBT.replace("CLOSED", date.today())
+
+        goto(), skip() and scan() honor the cursor filter from setfilter(), and locate() and locatecontinue() keep
+        their expression in the cursor, so each cursor has its own LOCATE.  Both are worked with preparefilter(),
+        which is one per session, so they must not be used inside a plain scan() loop that has a forExpr.  Locks
+        are on records and tables, not cursors, and SET DELETED is for the whole session.  Don't close the table
+        while cursors are still in use on it.
+
+        Raises ValueError if the table isn't open, the order tag doesn't exist, or the engine has no getposition().
+        """
+        return TableCursor(self, alias, order)
+
     def deletetagall(self):
         """
         Deletes all index tags for the currently selected table. The CDX index file is deleted and the
@@ -1909,6 +2455,7 @@ class _cbTools(object):
         self.tally = 0
 
         lxTagList = self.cbt.ataginfo()  # Returns a list() of dict()s
+        self.clearschemacache(self.cbt.alias())
         if lxTagList is not None:
             if len(lxTagList) > 0:
                 for xT in lxTagList:
@@ -1925,6 +2472,78 @@ class _cbTools(object):
             self.nErrorNumber = self.cbt.geterrornumber()
         return bReturn
 
+    def createtags(self, tagList):
+        """
+        Creates all the index tags in tagList, a list of VFPINDEXTAG objects like ataginfo() returns, for the
+        currently selected table, which must have no index tags.  The engine builds them together in one new CDX
+        file, reading the table once, which is much quicker than one indexon() for each tag on a large table, and
+        gets VFP "Candidate" tags (nUnique 15) right, which indexon() can't add to an existing CDX.
+
+        If the one build fails, for example because a candidate tag meets a duplicate key, the tags are created
+        one at a time with indexon() instead, so all those which can be made are.  The same is done by engines
+        without the one build.  The same restrictions as deletetagall() apply to tables in a VFP Database Container.
+
+        Returns True if all the tags were created, otherwise False with cErrorMessage and nErrorNumber from the
+        first tag which failed.  Sets tally to the number of tags created.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self.tally = 0
+        if not tagList:
+            return True
+        cAlias = self.cbt.alias()
+        if hasattr(self.cbt, "createtags"):
+            bReturn = self.cbt.createtags([(xT.cTagName, xT.cTagExpr, xT.cTagFilt or "", int(xT.nDirection),
+                                            int(xT.nUnique)) for xT in tagList])
+            self.clearschemacache(cAlias)
+            if bReturn:
+                self.tally = len(tagList)
+                return True
+            if self.cbt.geterrornumber() in (-9970, -9999):
+                self.cErrorMessage = self.cbt.geterrormessage()
+                self.nErrorNumber = self.cbt.geterrornumber()
+                return False  # Nothing was tried, so nothing to fall back on.
+        bReturn = True
+        cError, nError = "", 0
+        for xT in tagList:
+            if self.indexon(xT.cTagName, xT.cTagExpr, xT.cTagFilt or "", xT.nDirection, xT.nUnique):
+                self.tally += 1
+            elif bReturn:
+                bReturn = False
+                cError, nError = self.cErrorMessage, self.nErrorNumber
+        self.cErrorMessage = cError
+        self.nErrorNumber = nError
+        return bReturn
+
+    def bulkload(self, alias=""):
+        """
+        Returns a BulkLoad for the open table alias (or the currently selected table), a context manager which
+        removes the index tags of the table for the length of a with block and builds them again at the end, with
+        createtags().  Every record appended to a table with a CDX updates each tag, so loading a lot of records
+        with appendfrom(), insertdict() loops, excel2dbf() and the like into a table with many tags is much slower
+        than into a bare table, even counting the time to build the tags again from scratch.
+
+        Example:
+        ::
+            oCBT.use(cStagingTable, alias="STAGING", exclusive=True)
+            with oCBT.bulkload("STAGING"):
+                oCBT.appendfrom("STAGING", cCsvFile, cType="CSV")
+                oCBT.appendfrom("STAGING", cMoreRows, cType="CSV")
+
+        The table must be open exclusively, since other users of the table would see it without its tags.  The
+        tag definitions are taken from ataginfo() on the way in and the tags are built again on the way out, even
+        if the with block raised an exception.  The order selected on the table is put back as well.  Records can
+        be added and changed in the block, but seek() and setorderto() have no tags to work with.
+
+        Don't use this on tables in a VFP Database Container, see deletetagall().  If the rebuild fails, for
+        example because the load put duplicate keys into a candidate tag, the tags which can be built are, and
+        ValueError is raised at the end of the with block, unless it is already ending with an exception.  The tag
+        definitions are then in the xTags property of the BulkLoad for making good by hand.
+
+        Raises ValueError if the table isn't open exclusively or its tags can't be removed.
+        """
+        return BulkLoad(self, alias)
+
     def dtt2expression(self, dateTimeValue):
         """
         Pass a date/time value and this will return a text string appropriate for a constant datetime value
@@ -1972,10 +2591,9 @@ class _cbTools(object):
     def getdatasession(self):
         """
         When multiple instances of this class exist, each will be given its own data session.
-        Other instances may set the "current" session to a different value.  If you find your
-        table is not reported 'open', when you think it should be try storing the session number
-        of your instance and restore to it with setdatasession().  If you change a current data session
-        be sure to put it back when exiting the function.
+        Each instance works through its own session handle, so other instances changing their
+        session no longer change yours.  If you switch this instance to another session with
+        setdatasession(), be sure to put it back when exiting the function.
         :return: Integer session number
         """
         nRet = 0
@@ -1986,13 +2604,15 @@ class _cbTools(object):
     def setdatasession(self, nSession):
         """
         set the data session back to what it was earlier.  the session number MUST be one that came
-        from getdatasession() or the results will be undefined.
+        from getdatasession() or the results will be undefined.  Only this instance is switched.
         :param nSession:
         :return: The session number switched to or -1 on error
         """
         nRet = -1
         if self.cbt is not None:
             nRet = self.cbt.switchdatasession(nSession)
+            self.clearschemacache()
+            self.clearlookupcache()
         return nRet
 
     def curvalstr(self, lcFieldName):
@@ -2139,6 +2759,207 @@ class _cbTools(object):
             self.nErrorNumber = self.cbt.geterrornumber()
         return lbReturn
 
+    def _seekkey(self, xKey):
+        """
+        Returns the seek() string for xKey: dates and datetimes are converted with dt2seek() and dtt2seek(), numbers
+        with str(), and anything else is passed back as it is.
+        """
+        if isinstance(xKey, datetime):
+            return self.dtt2seek(xKey)
+        if isinstance(xKey, date):
+            return self.dt2seek(xKey)
+        if isinstance(xKey, (int, xLongType, float, decimal.Decimal)) and not isinstance(xKey, bool):
+            return str(xKey)
+        return xKey
+
+    def _integertag(self, cAlias, cTag):
+        """
+        True if the index tag cTag ("" for the current order) of the table cAlias is on a bare I (Integer) field.
+        The tag's keys are whole numbers, and seeking a number with a fraction would find its truncated value.
+        """
+        oCBT = self.cbt
+        if not cTag:
+            if cAlias and (cAlias.upper() != (oCBT.alias() or "").upper()):
+                return False  # The order of a table which isn't selected isn't known here.
+            cTag = oCBT.order()
+        xSchema = self.tableschema(cAlias)
+        if (not cTag) or (xSchema is None):
+            self.cErrorMessage = ""
+            self.nErrorNumber = 0
+            return False
+        for xT in xSchema.xTags:
+            if xT.cTagName.upper() == cTag.upper():
+                try:
+                    cExpr = _plancanonical(_plantokens(xT.cTagExpr), (cAlias or oCBT.alias() or "").upper())
+                except ValueError:
+                    return False
+                return xSchema.xTypes.get(cExpr) == "I"
+        return False
+
+    def cachedlookup(self, alias, tag, key, fieldList=None):
+        """
+        Read-through cached version of a seek() followed by a scatter() for lookup tables which are read far more
+        often than they change, like zip zones or carrier codes.  Returns the dict() of the record found by seeking
+        key on the index tag of the open table alias, with the fields in fieldList (a comma delimited string, or
+        None for all the fields), or None if there is no match.  The result is a copy, so it is safe to change.
+        alias may be "" for the currently selected table, and tag "" for the current order of the table, which are
+        looked up on each call so the result is cached under the table and tag actually used.
+
+        key may be a seek() string, or a date, datetime or number, which is converted as dt2seek() and dtt2seek()
+        do.  Results, including "not found", are kept per table in a least recently used cache of up to
+        nLookupCacheSize entries, which can be set per table with setlookupcachesize().
+
+        A table's cache is dropped when its change token, taken from the .DBF header (last update date and record
+        count) and the file size and modification time, is different.  The token is checked at most once each
+        nLookupCacheInterval seconds, so edits made by other programs, VFP included, are seen within that time.
+        Changes made through this instance with replace() etc. are also only seen that way, so call
+        clearlookupcache() after updating a cached table if that matters.  A table's cache is also dropped when
+        its alias is closed or used for another table with use().
+
+        A lookup answered from the cache doesn't touch the table.  One that isn't seek()s it, which moves its
+        record pointer to the record found, or to EOF when there is no match, so don't count on where the record
+        pointer of the table is after a cachedlookup().
+
+        The nCacheHits and nCacheMisses properties count the lookups answered from the cache and from the table,
+        see also lookupcachestats().  On error returns None with cErrorMessage and nErrorNumber set.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        cAlias = (alias or self.alias()).upper()
+        if not tag:
+            xPosition = self.getposition(cAlias)
+            if xPosition is None:
+                return None
+            tag = xPosition[2]
+        xEntry = self._xLookupCaches.get(cAlias)
+        nNow = time()
+        if xEntry is None or nNow >= xEntry[2]:
+            cFileName = self.dbf(cAlias)
+            if not cFileName:
+                self._xLookupCaches.pop(cAlias, None)
+                return None
+            xToken = _dbfchangetoken(cFileName)
+            if xEntry is None or xToken is None or xEntry[1] != xToken:
+                xEntry = [collections.OrderedDict(), xToken, 0.0]
+                self._xLookupCaches[cAlias] = xEntry
+            xEntry[2] = nNow + self.nLookupCacheInterval
+        xCache = xEntry[0]
+        if isinstance(fieldList, (list, tuple)):
+            fieldList = ",".join(fieldList)
+        xKey = (tag.upper(), key, fieldList)
+        if xKey in xCache:
+            self.nCacheHits += 1
+            xRec = xCache.pop(xKey)
+            xCache[xKey] = xRec  # Back to the most recently used end.
+            return (None if xRec is None else dict(xRec))
+        self.nCacheMisses += 1
+        if _fractionalkey(key) and self._integertag(cAlias, tag):
+            xRec = None  # No I field value matches a fraction.
+        elif self.seek(self._seekkey(key), cAlias, tag):
+            xRec = self.scatter(cAlias, fieldList=fieldList)
+            if xRec is None:
+                return None  # Error is set, and nothing is cached.
+        elif self.nErrorNumber:
+            return None
+        else:
+            xRec = None
+        xCache[xKey] = xRec
+        nMax = self._xLookupCacheSizes.get(cAlias, self.nLookupCacheSize)
+        while len(xCache) > nMax:
+            xCache.popitem(last=False)
+        return (None if xRec is None else dict(xRec))
+
+    def seekmany(self, alias, tag, keys, fieldList=None, missing=None, asDict=False, stripblanks=False, coding="XX"):
+        """
+        Looks up a whole list of keys on one index tag in a single engine call, in place of a seek() and scatter()
+        for each key.  The engine sorts the keys so the index is walked in order and seeks each distinct key once.
+
+        Args:
+            alias: Alias of the open table to search, or "" for the currently selected table.
+
+            tag: Name of the index tag to seek on, or "" to use the current order of the table.
+
+            keys: Any iterable of keys.  Each is a seek() string as described for seek(), or a date, datetime or\
+            number, which is converted the way dt2seek() and dtt2seek() do.  A number with a fraction is never\
+            found on a tag on an I (Integer) field.
+
+            fieldList: Comma delimited string (or list) of the fields to return, None for all the fields.
+
+            missing: The value returned for a key with no matching record.
+
+            asDict: If True, returns a dict() keyed by the keys as passed instead of a list.
+
+            stripblanks, coding: As for scatter().
+
+        Returns:
+            A list aligned with keys holding the record dict() found for each key, or missing, or the dict() described\
+        for asDict.  tally is set to the count of keys found.  The record pointer and order of the table are not\
+        changed.  Returns None on error with cErrorMessage and nErrorNumber set.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        xKeys = list(keys)
+        if fieldList is None:
+            fieldList = ""
+        elif isinstance(fieldList, (list, tuple)):
+            fieldList = ",".join(fieldList)
+        xSeek = list(range(len(xKeys)))  # Indexes of the keys to look up.
+        if any(_fractionalkey(xKey) for xKey in xKeys) and self._integertag(alias, tag):
+            xSeek = [jj for jj in xSeek if not _fractionalkey(xKeys[jj])]  # No I field value matches a fraction.
+        if xSeek or not xKeys:
+            xFound = self.cbt.seekmany(alias, tag, [self._seekkey(xKeys[jj]) for jj in xSeek], fieldList,
+                                       stripblanks, coding)
+            if xFound is None:
+                self.cErrorMessage = self.cbt.geterrormessage()
+                self.nErrorNumber = self.cbt.geterrornumber()
+                return None
+            self.tally = self.cbt.gettally()
+        else:
+            xFound = []
+            self.tally = 0
+        if len(xSeek) == len(xKeys):
+            xRecords = xFound
+        else:
+            xRecords = [None] * len(xKeys)
+            for jj, xRec in zip(xSeek, xFound):
+                xRecords[jj] = xRec
+        if missing is not None:
+            xRecords = [(missing if xRec is None else xRec) for xRec in xRecords]
+        if asDict:
+            return dict(zip(xKeys, xRecords))
+        return xRecords
+
+    def setlookupcachesize(self, alias, nSize):
+        """
+        Sets the maximum number of cachedlookup() results kept for the table alias, in place of the default
+        nLookupCacheSize.  Pass None to go back to the default.
+        """
+        cAlias = alias.upper()
+        if nSize is None:
+            self._xLookupCaches.pop(cAlias, None)
+            self._xLookupCacheSizes.pop(cAlias, None)
+        else:
+            self._xLookupCacheSizes[cAlias] = max(int(nSize), 1)
+            xEntry = self._xLookupCaches.get(cAlias)
+            if xEntry is not None:
+                while len(xEntry[0]) > self._xLookupCacheSizes[cAlias]:
+                    xEntry[0].popitem(last=False)
+
+    def clearlookupcache(self, alias=""):
+        """ Drops the cachedlookup() results for the table alias, or for all tables if alias is empty. """
+        if alias:
+            self._xLookupCaches.pop(alias.upper(), None)
+        else:
+            self._xLookupCaches = dict()
+
+    def lookupcachestats(self):
+        """
+        Returns a dict() with the cachedlookup() counters: "hits", "misses", and "entries", which is a dict() of
+        the number of results cached for each table alias.
+        """
+        return {"hits": self.nCacheHits, "misses": self.nCacheMisses,
+                "entries": dict((cAlias, len(xEntry[0])) for cAlias, xEntry in self._xLookupCaches.items())}
+
     def skip(self, gonum=1):
         """
         Identical to the goto() method with the "SKIP" gomode value, except it runs a stripped down
@@ -2250,6 +3071,145 @@ class _cbTools(object):
             self.tally = self.cbt.gettally()
         return lbReturn
 
+    def replacewhere(self, alias, forExpr, values, batchSize=1000, coding="XX"):
+        """
+        Equivalent of REPLACE field1 WITH value1, field2 WITH value2 ... FOR forExpr in VFP.  Changes every record
+        of the open table alias (or the currently selected table) for which the VFP expression forExpr is True, or
+        all the records if forExpr is "", in one pass made by the data engine, in place of a scan() loop calling
+        rlock(), replace() and unlock() for each record.
+
+        values is a dict() of field names and new values, stored as gatherdict() stores them, with coding working
+        the same way.  Keys which are not fields are ignored.  Wrap a string in VFPEXPR to have it taken as a VFP
+        expression evaluated for each record, like VFPEXPR("PRICE * 1.05"), in which case its type must suit the
+        field.  The plain values are stored first, then the expressions are evaluated in turn, so an expression
+        sees the record as changed by the values and by the expressions before it.
+
+        The table is locked once with a flock() if the lock can be had.  Otherwise each matching record is locked
+        and tested again before it is changed, and the changes are flushed and the locks released every batchSize
+        records.  All the locks on the table, including any placed before the call, are released at the end.
+        Deleted records are skipped when setdeleted() is on.  When the query planner can answer part of forExpr
+        from an index tag, as for scan(), only the records in the range of the tag are visited.  The record
+        pointer and order of the table are left as they were.
+
+        Returns the count of records changed, also stored in the tally property, or -1 on error.  An error part
+        way through, like a record which can't be locked, stops the pass, and the records changed up to then
+        stay changed, with their count in tally.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self.tally = 0
+        cAlias = (alias or self.alias()).upper()
+        xSchema = self.tableschema(cAlias)
+        if xSchema is None:
+            return -1
+        xNames = list()
+        xValues = list()
+        xExprNames = list()
+        xExprs = list()
+        for cKey, xValue in values.items():
+            cName = cKey.upper()
+            cType = xSchema.xTypes.get(cName)
+            if cType is None:
+                continue
+            if isinstance(xValue, VFPEXPR):
+                xExprNames.append(cName)
+                xExprs.append(str(xValue))
+                continue
+            try:
+                xValue = _appendervalue(cType, xValue)
+            except (ValueError, TypeError):
+                self.cErrorMessage = "Invalid value for field %s: %r" % (cName, xValue)
+                self.nErrorNumber = -13590
+                return -1
+            xNames.append(cName)
+            xValues.append(xValue)
+        if not (xNames or xExprNames):
+            self.cErrorMessage = "No fields in Dict matched table structure"
+            self.nErrorNumber = -9985
+            return -1
+        return self._updatewhere(cAlias, forExpr, batchSize,
+                                 (",".join(xNames), xValues, ",".join(xExprNames), xExprs, coding))
+
+    def deletewhere(self, alias, forExpr="", batchSize=1000):
+        """
+        Equivalent of DELETE FOR forExpr in VFP.  Deletes every record of the open table alias (or the currently
+        selected table) for which the VFP expression forExpr is True, or all the records if forExpr is "", in one
+        pass made by the data engine.  Locking, the use of index tags and errors are as for replacewhere().
+
+        Returns the count of records deleted, not counting those already deleted, also stored in the tally
+        property, or -1 on error.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self.tally = 0
+        return self._updatewhere((alias or self.alias()).upper(), forExpr, batchSize, None)
+
+    def _updatewhere(self, cAlias, forExpr, nBatchSize, xReplace):
+        """
+        Runs replacewhere(), with xReplace holding the arguments for the engine, or deletewhere() if xReplace is
+        None.  The record numbers of the planner range, if there is one, are found first and passed to the engine.
+        Engines without the functions get a scan() with a record lock for each record instead.
+        """
+        oCBT = self.cbt
+        if not hasattr(oCBT, ("deletewhere" if xReplace is None else "replacewhere")):
+            return self._updatewhereloop(cAlias, forExpr, xReplace)
+        lcOldAlias = oCBT.alias()
+        if not self.select(cAlias):
+            return -1
+        xRecnos = None
+        xPlan = (self._queryplan(forExpr, "") if forExpr else None)
+        if xPlan is not None:
+            xPosition = oCBT.getposition(cAlias)
+            xRecnos = self._planrecnos(xPlan)
+            oCBT.clearfilter()
+            oCBT.setposition(cAlias, *xPosition)
+        if (xPlan is None) or (xRecnos is not None):
+            if xReplace is None:
+                xResult = oCBT.deletewhere(cAlias, forExpr, xRecnos, nBatchSize)
+            else:
+                xResult = oCBT.replacewhere(cAlias, forExpr, xReplace[0], xReplace[1], xReplace[2], xReplace[3],
+                                            xReplace[4], xRecnos, nBatchSize)
+            self.tally = (0 if xResult is None else oCBT.gettally())
+            if (xResult is None) or (oCBT.geterrornumber() != 0):
+                self.cErrorMessage = oCBT.geterrormessage()
+                self.nErrorNumber = oCBT.geterrornumber()
+                xResult = -1
+        else:
+            xResult = -1  # The planner lookup failed, the error is set.
+        if lcOldAlias and (lcOldAlias.upper() != cAlias):
+            oCBT.select(lcOldAlias)
+        return xResult
+
+    def _updatewhereloop(self, cAlias, forExpr, xReplace):
+        """ replacewhere() and deletewhere() for engines without them, one record lock at a time. """
+        if (xReplace is not None) and xReplace[3]:
+            self.cErrorMessage = "VFPEXPR values need the engine replacewhere()"
+            self.nErrorNumber = -9976
+            return -1
+        lcOldAlias = self.alias()
+        if not self.select(cAlias):
+            return -1
+        if xReplace is not None:
+            xData = dict(zip(xReplace[0].split(","), xReplace[1]))
+        nDone = 0
+        for nRec in self.scan(forExpr=forExpr, noData=True):
+            if (xReplace is None) and self.cbt.deleted():
+                continue
+            if not self.rlock(retries=5, interval=0.5):
+                break
+            bOK = (self.delete() if xReplace is None else self.gatherdict(cAlias, xData, xReplace[4]))
+            cError, nError = self.cErrorMessage, self.nErrorNumber
+            self.flush()
+            self.unlock()
+            if not bOK:
+                self.cErrorMessage, self.nErrorNumber = cError, nError
+                break
+            nDone += 1
+        self.tally = nDone
+        if lcOldAlias and (lcOldAlias.upper() != cAlias):
+            self.cbt.select(lcOldAlias)
+        return (-1 if self.nErrorNumber else nDone)
+
     def flushall(self):
         """
         Similar to flush() but applies to all open tables.
@@ -2354,26 +3314,10 @@ class _cbTools(object):
         If there is no currently selected table, or the alias isn't recognized, or some other error occurs, returns None.
         """
 
-        self.cErrorMessage = ""
-        self.nErrorNumber = 0
-        lxRawList = self.cbt.afields(lpcAlias)
-        if lxRawList is None:
-            lxListReturn = None
-            self.cErrorMessage = self.cbt.geterrormessage()
-            self.nErrorNumber = self.cbt.geterrornumber()
-        else:
-            lxListReturn = list()
-            for xF in lxRawList:
-                xFld = VFPFIELD()
-                cTest = xF["cName"]
-                # print(repr(cTest), type(cTest), ord(cTest[5:6]))
-                xFld.cName = cTest
-                xFld.cType = xF["cType"]
-                xFld.nWidth = xF["nWidth"]
-                xFld.nDecimals = xF["nDecimals"]
-                xFld.bNulls = xF["bNulls"]
-                lxListReturn.append(xFld)
-        return lxListReturn
+        xSchema = self.tableschema(lpcAlias)
+        if xSchema is None:
+            return None
+        return [xF.tovfpfield() for xF in xSchema.xFields]
 
     def afielddict(self, lpcAlias=""):
         """
@@ -2406,19 +3350,12 @@ class _cbTools(object):
         'C' engine directly for this information.
         """
 
-        self.cErrorMessage = ""
-        self.nErrorNumber = 0
-        lxRawList = self.cbt.afields("")
         lxReturn = None
-        if lxRawList is None:
-            self.cErrorMessage = self.cbt.geterrormessage()
-            self.nErrorNumber  = self.cbt.geterrornumber()
-        else:
-            lpcFieldName = lpcFieldName.upper()
-            for xF in lxRawList:
-                if xF["cName"] == lpcFieldName:
-                    lxReturn = (xF["cType"], xF["nWidth"], xF["nDecimals"], xF["bNulls"])
-                    break
+        xSchema = self.tableschema()
+        if xSchema is not None:
+            xF = xSchema.field(lpcFieldName)
+            if xF is not None:
+                lxReturn = (xF.cType, xF.nWidth, xF.nDecimals, xF.bNulls)
         return lxReturn
 
     def afieldtypes(self):
@@ -2431,14 +3368,82 @@ class _cbTools(object):
         Returns the dictionary on success, None on failure.  Much faster than getting all afields() info, but NOTE:
         the ordering of the dict() is unrelated to the sequence of fields in the table.
         """
-        self.cErrorMessage = ""
-        self.nErrorNumber = 0
+        xSchema = self.tableschema()
+        if xSchema is None:
+            return None
+        return dict(xSchema.xTypes)
 
-        lxRetDict = self.cbt.afieldtypes()
-        if lxRetDict is None:
-            self.cErrorMessage = self.cbt.geterrormessage()
+    def tableschema(self, alias=""):
+        """
+        Returns a TableSchema with the fields, field types and index tags of the open table alias, or of the
+        currently selected table, from a cache kept for each alias in this session.  afields(), afieldtypes(),
+        ataginfo() and the methods built on them, like copytoarray(), insertintotable(), scattertorecord(),
+        cursortoxml() and appendfrom(), take the structure from here, so it is only read from the engine once.
+
+        The schema is read again when the table's header change token, taken from the record and header length in
+        the .DBF header and the size and time of the .CDX file, is different.  The token is checked at most once
+        each nSchemaCacheInterval seconds, so tags added by other programs are seen within that time.  The cache
+        entry is dropped by use() and closetable() of the alias, by indexon(), deletetag(), deletetagall() and
+        copyindexto() on the table, and for all tables by updatestructure(), createtable(), closedatabases() and
+        setdatasession().  clearschemacache() drops it by hand.
+
+        The TableSchema and the descriptors in it are read only.  Returns None on error, with cErrorMessage and
+        nErrorNumber set.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        cAlias = (alias or self.cbt.alias() or "").upper()
+        xEntry = self._xSchemas.get(cAlias)
+        if xEntry is not None:
+            nNow = time()
+            if nNow < xEntry[1]:
+                return xEntry[0]
+            if _dbfschematoken(xEntry[0].cPath) == xEntry[0].xToken:
+                xEntry[1] = nNow + self.nSchemaCacheInterval
+                return xEntry[0]
+            del self._xSchemas[cAlias]
+        if not cAlias:
+            self.cErrorMessage = "No Table Open in Selected Area"
+            self.nErrorNumber = -9999
+            return None
+        cPath = self.cbt.dbf(cAlias)
+        xToken = (_dbfschematoken(cPath) if cPath else None)
+        lxRawList = self.cbt.afields(cAlias)
+        if lxRawList is None:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+            return None
+        lcOldAlias = self.cbt.alias()
+        bSelect = (lcOldAlias or "").upper() != cAlias
+        if bSelect:
+            self.cbt.select(cAlias)
+        lxInfoList = self.cbt.ataginfo()
+        if lxInfoList is None:
+            self.cErrorMessage = self.cbt.geterrormessage()
             self.nErrorNumber = self.cbt.geterrornumber()
-        return lxRetDict
+        if bSelect and lcOldAlias:
+            self.cbt.select(lcOldAlias)
+        if lxInfoList is None:
+            return None
+        xLayout = (_dbflayout(cPath) if cPath else None)
+        if xLayout is None:
+            xLayout = (dict(), -1, 0)
+        xSchema = TableSchema(cAlias, cPath, xToken,
+                              [SCHEMAFIELD(xF["cName"], xF["cType"], xF["nWidth"], xF["nDecimals"], xF["bNulls"], jj,
+                                           *xLayout[0].get(xF["cName"].upper(), (-1, -1)))
+                               for jj, xF in enumerate(lxRawList)],
+                              [SCHEMATAG(xI["cTagName"], xI["cTagExpr"], xI["cTagFilt"], xI["nDirection"],
+                                         xI["nUnique"]) for xI in lxInfoList],
+                              xLayout[2], xLayout[1])
+        self._xSchemas[cAlias] = [xSchema, time() + self.nSchemaCacheInterval]
+        return xSchema
+
+    def clearschemacache(self, alias=""):
+        """ Drops the cached tableschema() of the table alias, or of all the tables if alias is empty. """
+        if alias:
+            self._xSchemas.pop(alias.upper(), None)
+        else:
+            self._xSchemas = dict()
 
     def scatterblank(self, lcAlias="", lbBinaryAsUnicode=True):
         """
@@ -2507,6 +3512,91 @@ class _cbTools(object):
             del xWorkDict  # the dict in the object is re-used on the next call to scatter.
         return xRetDict
 
+    def scatterview(self, alias="", stripblanks=False, coding="XX"):
+        """
+        Lazy version of scatter() for the current record of the currently selected table or of the table alias.
+        Returns a RecordView, which holds a copy of the raw record taken from the engine in one call, and decodes
+        each field only when it is first read, with the same values scatter() would give.  For wide tables where
+        only a few fields are used, this saves the time and memory of decoding and copying all the others.
+
+        Example:
+        ::
+            xRec = oCBT.scatterview("CUSTOMER")
+            if xRec.BALANCE > 0:
+                print(xRec["CUSTNAME"])
+            xAll = xRec.todict()
+
+        stripblanks and coding work as for scatter().  Values are always converted to their Python types.  Memo
+        fields are read from the table only when first read from the view, see RecordView.  Returns None on
+        error, including when there is no current record, with cErrorMessage and nErrorNumber set.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        cAlias = (alias or self.cbt.alias() or "").upper()
+        oView = self._viewcontext(cAlias, stripblanks, coding)
+        if oView is None:
+            return None
+        return self._viewrecord(oView, cAlias)
+
+    def _viewcontext(self, cAlias, bStrip, cCoding):
+        """
+        Returns the _ViewContext for RecordView objects of the table cAlias, re-using the last one when the schema
+        and options are the same.  None with the error set if views aren't available for the table.
+        """
+        xSchema = self.tableschema(cAlias)
+        if xSchema is None:
+            return None
+        if (xSchema.nRecordLength <= 0) or (not hasattr(self.cbt, "recordbuffer")):
+            self.cErrorMessage = "Record views are not available for " + cAlias
+            self.nErrorNumber = -9977
+            return None
+        oView = self._oLastView
+        if (oView is None) or (oView.xSchema is not xSchema) or (oView.bStrip != bStrip) or \
+                (oView.cCoding != cCoding):
+            oView = _ViewContext(self, cAlias, xSchema, bool(bStrip), cCoding)
+            self._oLastView = oView
+        return oView
+
+    def _viewrecord(self, oView, cAlias):
+        """ Returns a RecordView of the current record of cAlias, or None with the error set. """
+        xRaw = self.cbt.recordbuffer(cAlias)
+        if xRaw is None:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+            return None
+        return RecordView(oView, xRaw[1], 0, xRaw[0])
+
+    def _viewmemo(self, cAlias, cName, nRecno, bStrip, cCoding):
+        """
+        Reads the memo field cName of record nRecno of the table cAlias for a RecordView, putting the record pointer
+        and the selected table back afterwards.  Raises ValueError if it can't be read.
+        """
+        oCBT = self.cbt
+        lcOldAlias = oCBT.alias()
+        if (lcOldAlias or "").upper() != cAlias and not oCBT.select(cAlias):
+            raise ValueError("Unable to read memo %s, table %s is not open" % (cName, cAlias))
+        bEof = oCBT.eof()
+        bBof = oCBT.bof()
+        nSaved = oCBT.recno()
+        xValue = None
+        if oCBT.goto("RECORD", nRecno):
+            xValue = oCBT.scatter(cAlias, True, bStrip, cName, True, cCoding)
+        if xValue is None:
+            cMessage = oCBT.geterrormessage()
+        if bEof:
+            if oCBT.goto("BOTTOM"):
+                oCBT.skip(1)
+        elif bBof:
+            if oCBT.goto("TOP"):
+                oCBT.skip(-1)
+        else:
+            oCBT.goto("RECORD", nSaved)
+        if lcOldAlias and (lcOldAlias.upper() != cAlias):
+            oCBT.select(lcOldAlias)
+        if xValue is None:
+            raise ValueError("Unable to read memo %s of record %d: %s" % (cName, nRecno, cMessage))
+        return xValue[0]
+
     def scattertolist(self, alias="", converttypes=True, stripblanks=False, fieldList=None, coding="XX"):
         """
         Like scatter except that instead of returning a dict(), it returns a list of tuples which
@@ -2563,20 +3653,22 @@ class _cbTools(object):
             xFlds = fieldList.split(",")
             if xFlds != self.xLastFieldList:
                 self.xLastFieldList = xFlds
+                self.xLastRecordSchema = None
                 xWorkRec = collections.namedtuple("CBRecord", xFlds)
                 self.xLastRecordTemplate = xWorkRec
             else:
                 xWorkRec = self.xLastRecordTemplate
         else:
-            if not alias:
-                alias = self.alias()
-            if alias == self.cLastRecordAlias:
-                xWorkRec = self.xLastRecordTemplate
-            else:
-                self.cLastRecordAlias = alias
-                xNames = [xx.cName for xx in self.afields(lpcAlias=self.cLastRecordAlias)]
-                xWorkRec = collections.namedtuple("CBRecord", xNames)
+            xSchema = self.tableschema(alias)
+            if xSchema is None:
+                return None
+            if xSchema is not self.xLastRecordSchema:
+                self.xLastRecordSchema = xSchema
+                self.xLastFieldList = []
+                xWorkRec = collections.namedtuple("CBRecord", [xF.cName for xF in xSchema.xFields])
                 self.xLastRecordTemplate = xWorkRec
+            else:
+                xWorkRec = self.xLastRecordTemplate
 
         self.cErrorMessage = ""
         self.nErrorNumber = 0
@@ -3474,7 +4566,7 @@ class _cbTools(object):
         return xRet
 
     def copytoarray(self, alias="", maxcount=1000, fieldtomatch=None, matchvalue=None, matchtype="=",
-                    converttypes=True, stripblanks=False, fieldlist="", coding="XX", bDesc=False):
+                    converttypes=True, stripblanks=False, fieldlist="", coding="XX", bDesc=False, batchSize=0):
         """
         Copies values of all (or selected) fields and all (or selected) records of the specified table into a list of
         dictionaries.
@@ -3543,6 +4635,14 @@ class _cbTools(object):
 
             bDesc: Pass True for the output to be in the current tag order but in descending, not ascending order.
 
+            batchSize: Pass a number greater than 0 to have the data engine read that many records per call with\
+            its scatterbatch() function, which is much faster for large outputs.  Default 0 reads one record at a\
+            time.  With a batchSize, maxcount limits the number of records output rather than the number examined.
+
+        If fieldtomatch is the expression of an index tag usable in the current order (or any tag in record order),
+        matchtype is "=", "==", ">=" or "<=" and bDesc is False, the query planner described in scan() and explain()
+        reads just the range of that tag holding the matching records rather than testing every record.
+
         The reason for the filter mechanism is to allow very fast record filtering in the C component before Python
         ever sees the record values.  This can potentially eliminate significant numbers of records you just don't want
         to see.  Then you can perform tests on the resulting array to refine your search more precisely.  If you are
@@ -3570,24 +4670,21 @@ class _cbTools(object):
             self.select(alias)
         xRecArray = list()
 
-        laFldArray = self.afields()
-        if laFldArray is None:
+        xSchema = self.tableschema()
+        if xSchema is None:
             self.cErrorMessage = "No table is selected for the copy"
             self.nErrorNumber = 69384
             return xRecArray  # empty list.
 
-        lnCount = len(laFldArray)
         lbTestMatch = False
         lnTally = 0
+        xPlan = None
 
         if fieldtomatch is not None:
             fieldtomatch = fieldtomatch.upper()
-            lcType = ""
             lcFiltExpr = ""
-            for jj in range(0, lnCount):
-                if fieldtomatch == laFldArray[jj].cName:
-                    lcType = laFldArray[jj].cType
-                    break
+            xMatchField = xSchema.field(fieldtomatch)
+            lcType = ("" if xMatchField is None else xMatchField.cType)
 
             if lcType == "":
                 # Bad field name...
@@ -3600,6 +4697,8 @@ class _cbTools(object):
                 self.cErrorMessage = "Invalid filter for this table"
                 self.nErrorNumber = -8349
                 return self.recArray
+            if (not bDesc) and (matchtype in ("=", "==", ">=", "<=")):
+                xPlan = self._queryplan(lcFiltExpr, self.cbt.order() or "")
 
         lnRecCnt = 0
         if maxcount == 0:
@@ -3611,6 +4710,45 @@ class _cbTools(object):
             lnResult = self.cbt.goto("BOTTOM", 0)
         lbRecordOK = True
         run_count: int = 0 #this will prevent a possible endless loop
+        if xPlan is not None:
+            xRecnos = self._planrecnos(xPlan)
+            for nRecno in (xRecnos or []):
+                if lnRecCnt >= maxcount:
+                    break
+                if not self.cbt.goto("RECORD", nRecno):
+                    continue
+                xWorkDict = self.scatter(converttypes=converttypes, stripblanks=stripblanks, fieldList=fieldlist,
+                                         coding=coding)
+                if xWorkDict is not None:
+                    if "RECORDNUMBER" not in xWorkDict:
+                        xWorkDict["RECORDNUMBER"] = nRecno
+                    xRecArray.append(self._dictcopy(xWorkDict))
+                    lnRecCnt += 1
+                    lnTally += 1
+                del xWorkDict
+            run_count = maxcount  # Skips the record by record loop below.
+        elif (batchSize > 0) and hasattr(self.cbt, "scatterbatch"):
+            if not lbTestMatch:
+                self.cbt.clearfilter()  # Any filter left from an earlier scan would be applied by scatterbatch()
+            lcAlias = self.cbt.alias()
+            while lnRecCnt < maxcount:
+                xBatch = self.cbt.scatterbatch(lcAlias, min(batchSize, maxcount - lnRecCnt), fieldlist, stripblanks,
+                                               coding, False, converttypes, (-1 if bDesc else 1))
+                if xBatch is None:
+                    self.cErrorMessage = self.cbt.geterrormessage()
+                    self.nErrorNumber = self.cbt.geterrornumber()
+                    break
+                xRecords, xRecnos = xBatch
+                if not xRecords:
+                    break
+                for xDict, nRecno in zip(xRecords, xRecnos):
+                    if "RECORDNUMBER" not in xDict:
+                        xDict["RECORDNUMBER"] = nRecno
+                    xRecArray.append(xDict)
+                lnRecCnt += len(xRecords)
+                lnTally += len(xRecords)
+                del xRecords, xRecnos, xBatch
+            run_count = maxcount  # Skips the record by record loop below.
         while True and run_count < maxcount:
             if not bDesc and self.cbt.eof():
                 break
@@ -3652,6 +4790,161 @@ class _cbTools(object):
         fieldtomatch = None
         return xRecArray
 
+    def _tocolumnarray(self, np, xValues, cType, nWidth):
+        """
+        Internal method that converts the list of values of one field, as returned by scatter(), into the numpy
+        array tocolumns() returns for that field type.
+        """
+        if cType in ("N", "F", "B", "Y"):
+            return np.array([np.nan if x is None else float(x) for x in xValues], dtype=np.float64)
+        if cType == "D":
+            return np.array(xValues, dtype="datetime64[D]")
+        if cType == "T":
+            return np.array(xValues, dtype="datetime64[s]")
+        if cType in ("M", "X", "G"):
+            xRet = np.empty(len(xValues), dtype=object)
+            xRet[:] = xValues
+            return xRet
+        xNulls = [x is None for x in xValues]
+        bHasNulls = any(xNulls)
+        if cType == "I":
+            xRet = np.array([0 if x is None else x for x in xValues], dtype=np.int32)
+        elif cType == "L":
+            xRet = np.array([False if x is None else x for x in xValues], dtype=bool)
+        elif cType == "Z" and all(isinstance(x, bytes) or x is None for x in xValues):
+            xRet = np.array([b"" if x is None else x for x in xValues], dtype="S%d" % max(nWidth, 1))
+        else:
+            xRet = np.array(["" if x is None else x for x in xValues], dtype="U%d" % max(nWidth, 1))
+        if bHasNulls:
+            xRet = np.ma.masked_array(xRet, mask=xNulls)
+        return xRet
+
+    def tocolumns(self, alias="", fieldList=None, forExpr="", order=None, stripblanks=False, coding="XX"):
+        """
+        Reads the selected fields of all the matching records of a table in one call and returns them as one
+        numpy array per field, ready for vectorized analysis without building a dict() for every record.
+        Requires the numpy package.
+
+        Parameters:
+        - alias: The alias of the table to read.  Pass "" for the currently selected table.
+        - fieldList: Comma delimited list of field names.  Pass None or "" for all fields.
+        - forExpr: Optional logical expression as for locate().  Only records for which it is True are returned.
+        - order: Name of the index tag to order the output by.  Pass None (the default) to use the order
+          currently set for the table, or "" for record number order.
+        - stripblanks: If True, trailing blanks are removed from C type fields.
+        - coding: See the introductory docs for this class module for details.
+
+        Records are returned in the specified order and respect the setdeleted() status.  The current order and
+        record position of the table are restored afterwards.
+
+        The array types by field type are:
+            - C - unicode string array ('U' dtype) of the field width
+            - Z - bytes array ('S' dtype) of the field width, unless coding converts them to unicode
+            - I - int32
+            - N, F, B - float64.  .NULL. values are NaN.
+            - Y - float64.  Use copytoarray() if you need exact decimal.Decimal values.
+            - L - bool
+            - D - datetime64[D].  Empty dates and .NULL. values are NaT.
+            - T - datetime64[s].  Empty datetimes and .NULL. values are NaT.
+            - M, X, G - object arrays holding the same values scatter() would return
+
+        When I, L, C or Z fields contain .NULL. values, the array for that field is a numpy masked array with
+        the null values masked.
+
+        Returns an OrderedDict of arrays keyed by upper case field name in the order of the fields in the table,
+        or in the order of the fieldList, if specified.  The property tally is set to the number of records
+        returned.  Returns None on error, in which case cErrorMessage and nErrorNumber will be set.
+
+        When the data engine supports it natively, as the pure Python reader engine does, the arrays are built
+        directly from the table data.  Otherwise the records are read one by one, as scan() does, and converted.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self.tally = 0
+        try:
+            import numpy as np
+        except ImportError:
+            self.cErrorMessage = "tocolumns() requires the numpy package"
+            self.nErrorNumber = -79020
+            return None
+        if fieldList is None:
+            fieldList = ""
+        lcOldAlias = self.alias()
+        if alias:
+            if not self.select(alias):
+                return None
+        elif not lcOldAlias:
+            self.cErrorMessage = "No Table Open in Selected Area"
+            self.nErrorNumber = -9999
+            return None
+        lcAlias = self.alias()
+        lcOldOrder = self.cbt.order()
+        lnOldRecno = (0 if (self.cbt.eof() or self.cbt.bof()) else self.cbt.recno())
+        xReturn = None
+        try:
+            if order is not None:
+                if not self.setorderto(order):
+                    return None
+            if hasattr(self.cbt, "tocolumns"):
+                xReturn = self.cbt.tocolumns(lcAlias, fieldList, forExpr, stripblanks, coding)
+                if xReturn is None:
+                    self.cErrorMessage = self.cbt.geterrormessage()
+                    self.nErrorNumber = self.cbt.geterrornumber()
+                else:
+                    self.tally = self.cbt.gettally()
+            else:
+                xFldInfo = self.afields(lcAlias)
+                if xFldInfo is None:
+                    return None
+                xTypes = dict([(xF.cName.upper(), (xF.cType, xF.nWidth)) for xF in xFldInfo])
+                if fieldList:
+                    xNames = [cF.strip().upper() for cF in fieldList.split(",") if cF.strip()]
+                else:
+                    xNames = [xF.cName.upper() for xF in xFldInfo]
+                for cName in xNames:
+                    if cName not in xTypes:
+                        self.cErrorMessage = "Field not recognized: " + cName
+                        self.nErrorNumber = -4912
+                        return None
+                if forExpr:
+                    if self.cbt.preparefilter(forExpr) == 0:
+                        self.cErrorMessage = self.cbt.geterrormessage()
+                        self.nErrorNumber = self.cbt.geterrornumber()
+                        return None
+                lcFieldList = ",".join(xNames)
+                xLists = [list() for cName in xNames]
+                lnCount = 0
+                oCBT = self.cbt
+                oCBT.goto("TOP", 0)
+                while not oCBT.eof():
+                    if (not forExpr) or oCBT.testfilter():
+                        xRec = oCBT.scatter(lcAlias, True, stripblanks, lcFieldList, True, coding)
+                        if xRec is None:
+                            self.cErrorMessage = oCBT.geterrormessage()
+                            self.nErrorNumber = oCBT.geterrornumber()
+                            return None
+                        for jj, xVal in enumerate(xRec):
+                            xLists[jj].append(xVal)
+                        lnCount += 1
+                    oCBT.skip(1)
+                xReturn = collections.OrderedDict()
+                for jj, cName in enumerate(xNames):
+                    xReturn[cName] = self._tocolumnarray(np, xLists[jj], xTypes[cName][0], xTypes[cName][1])
+                    xLists[jj] = None
+                self.tally = lnCount
+        finally:
+            if self.cbt.alias() != lcAlias:
+                self.cbt.select(lcAlias)
+            if forExpr and not hasattr(self.cbt, "tocolumns"):
+                self.cbt.clearfilter()
+            if order is not None:
+                self.cbt.setorderto(lcOldOrder)
+            if lnOldRecno > 0:
+                self.cbt.goto("RECORD", lnOldRecno)
+            if lcOldAlias:
+                self.cbt.select(lcOldAlias)
+        return xReturn
+
     def _makefilterstring(self, lpcFld, lpcMatch, lpcRelate, lpcFldType):
         """
         Internal method to make a filter string that CodeBase can use to evaluate a match for a current
@@ -3751,6 +5044,8 @@ class _cbTools(object):
         self.nErrorNumber = 0
 
         if self.cbt is not None:
+            self.clearschemacache(alias or self.cbt.alias())
+            self.clearlookupcache(alias or self.cbt.alias())
             lbReturn = self.cbt.closetable(alias)
             if not lbReturn:
                 self.cErrorMessage = self.cbt.geterrormessage()
@@ -3812,6 +5107,8 @@ class _cbTools(object):
         self.cErrorMessage = ""
         self.nErrorNumber = 0
         lbReturn = False
+        self.clearschemacache()
+        self.clearlookupcache()
         if self.cbt is not None:
             lbReturn = self.cbt.closedatabases()
             if not lbReturn:
@@ -3945,6 +5242,7 @@ class _cbTools(object):
             raise ValueError("Structure information must be string or list")
 
         lbReturn = self.cbt.createtable(lcTableName, xFields)
+        self.clearschemacache()
         if bMadeFields:
             del xFields
         if not lbReturn:
@@ -4041,6 +5339,7 @@ Field  Field Name     Type     Width    Dec  Nulls
         but CANDIDATE and UNIQUE indexes will.
         """
         bReturn = self.cbt.copytags(cSourceAlias, cTargetAlias)
+        self.clearschemacache(cTargetAlias)
         if not bReturn:
             self.cErrorMessage = self.cbt.geterrormessage()
             self.nErrorNumber = self.cbt.geterrornumber()
@@ -4170,7 +5469,7 @@ Field  Field Name     Type     Width    Dec  Nulls
         return lnReturn
 
     def appendfrom(self, cAlias="", cSource="", cExpr="", cType="", cDialect="", cDelimiter="", cQuoteChar="",
-                   cFieldList="", bFieldsFromRow1=True):
+                   cFieldList="", bFieldsFromRow1=True, nBatchSize=1000):
         """Copies records from an external source (.DBF or other type of file) into the specified open table.
 
         Works much like the APPEND FROM command in Visual FoxPro.  You specify a currently open alias as\
@@ -4223,6 +5522,24 @@ Field  Field Name     Type     Width    Dec  Nulls
             input table or 2) Be ABSOLUTELY CERTAIN that the target DBF table has exactly the fields you want in the\
             exact order as found in the input.
 
+            nBatchSize: For CSV and TAB/TXT input, the number of rows passed to the engine at a time.  Each batch\
+            is appended under one appendlock() of the target table.
+
+        Bulk loading of CSV and TAB/TXT files:
+            The rows are read with csv.reader() and the columns are matched to the target fields once, using\
+            afieldtypes().  Values for N, F, B and I fields are converted to numbers in Python, other types are\
+            passed as text and converted by the engine.  The rows are then handed to the engine insertbatch() in\
+            batches of nBatchSize.  A row which can't be stored, because a value won't convert or the engine\
+            refuses the record, is skipped and the load continues.  The skipped rows are listed in the\
+            xAppendRejects property as tuples of (line number in the file, error number, error message), and\
+            cErrorMessage then reports how many rows were rejected.  Columns that don't match a field in the table\
+            are ignored.
+
+            Numeric columns must hold plain numbers, like 1234.50, -7 or 1.5E3, and empty ones are stored as 0.\
+            Text like "1,234.50" or "$12.00" is rejected with error -13590.  Before the bulk loader such text was\
+            stored as the number it started with (1 and 0 for those), or 0, so check xAppendRejects when loading\
+            files with formatted numbers.  An I field given a fraction gets the whole number part, as before.
+
         Customizing csv for your needs:
             When this object class is created, the self.oCSV property is initialized\
             to an instance of csv.  That instance, configured to provide default behavior will be used for the\
@@ -4313,12 +5630,7 @@ Field  Field Name     Type     Width    Dec  Nulls
                     if cFieldList:
                         cFields = cFieldList
                     else:  # If they don't provide a field list, then we have to assume we are loading all fields.
-                        xFlds = self.afields(cAlias)
-                        xFList = list()
-                        for xF in xFlds:
-                            xFList.append(xF.cName)
-                        cFields = ",".join(xFList)
-                        cFields = cFields.upper()
+                        cFields = self.tableschema(cAlias).cFieldList.upper()
                 if cQuoteChar:
                     lcQuoteChar = cQuoteChar
                 else:
@@ -4331,42 +5643,183 @@ Field  Field Name     Type     Width    Dec  Nulls
                 if cFields:
                     xFields = cFields.split(",")
                 else:
-                    xFields = None
-                # Note: The fieldnames parm below must be a list or none, NOT a comma delimited string.
+                    xFields = None  # The field names are read from the first row.
                 if bCustomCSV:
-                    xReader = self.oCSV.DictReader(fFile, fieldnames=xFields, restkey=None, restval=None)
+                    xReader = self.oCSV.reader(fFile)
                 elif cType == "TAB":
                     if not cDelimiter:
                         lcDelimiter = "\t"
                     else:
                         lcDelimiter = cDelimiter
-                    xReader = self.oCSV.DictReader(fFile, fieldnames=xFields, restkey="UNKNOWN", restval="",
-                                                   dialect=None, delimiter=lcDelimiter, quotechar=lcQuoteChar)
+                    xReader = self.oCSV.reader(fFile, dialect=None, delimiter=lcDelimiter, quotechar=lcQuoteChar)
                 elif cType == "CSV":
                     if not cDelimiter:
                         lcDelimiter = ","
                     else:
                         lcDelimiter = cDelimiter
-                    xReader = self.oCSV.DictReader(fFile, fieldnames=xFields, restkey="UNKNOWN", restval="",
-                                                   dialect=None, delimiter=lcDelimiter, quotechar=lcQuoteChar)
+                    xReader = self.oCSV.reader(fFile, dialect=None, delimiter=lcDelimiter, quotechar=lcQuoteChar)
                 else:
                     fFile.close()
                     lnReturn = -1
                     raise ValueError("Unrecognized source file type")
-                nRecCount = 0
                 if lnReturn == 0:  # OK to start reading and appending...
-                    for xRow in xReader:
-                        bResult = self.insertdict(xRow, lcAlias=cAlias)
-                        if not bResult:
-                            lnReturn = -1  # ERROR MESSAGES
-                            break  # Already set the error flags
-                        else:
-                            lnReturn += 1
-                        del xRow
+                    lnReturn = self._appendfromcsv(xReader, cAlias, xFields, nBatchSize)
                 fFile.close()
 
         return lnReturn
 
+    def _appendfromcsv(self, xReader, cAlias, xFields, nBatchSize):
+        """
+        The bulk loader for CSV and TAB/TXT type appendfrom().  Matches the columns to the fields of cAlias and picks
+        the conversion for each column from afieldtypes() once, then converts the rows read by the csv xReader and
+        appends them nBatchSize at a time with _csvinsertbatch().  Rows which can't be stored are listed in
+        xAppendRejects and the load carries on.  Returns the count of records appended or -1 on error.
+        """
+        lnReturn = 0
+        self.xAppendRejects = []
+        if xFields is None:
+            try:
+                xFields = next(xReader)
+            except StopIteration:
+                return 0  # Empty file, nothing to do.
+        lcOldAlias = self.alias()
+        if not self.select(cAlias):
+            return -1
+        xTypes = self.afieldtypes()
+        if xTypes is None:
+            self.select(lcOldAlias)
+            return -1
+        xColumns = list()
+        xNames = list()
+        for nCol, cName in enumerate(xFields):
+            cName = cName.strip().upper()
+            if cName in xTypes and cName not in xNames:  # Columns not in the table are ignored, as by insertdict().
+                xColumns.append((nCol, _csvconverter(xTypes[cName])))
+                xNames.append(cName)
+        if not xColumns:
+            self.cErrorMessage = "No fields in source matched table structure"
+            self.nErrorNumber = -9985
+            self.select(lcOldAlias)
+            return -1
+        cFieldList = ",".join(xNames)
+        nWidth = len(xFields)
+        if nBatchSize < 1:
+            nBatchSize = 1
+        xBatch = list()
+        xLines = list()
+        for xRow in xReader:
+            if not xRow:
+                continue  # Blank lines are skipped, as csv.DictReader() does.
+            if len(xRow) < nWidth:
+                xRow.extend([""] * (nWidth - len(xRow)))
+            try:
+                xValues = tuple([(xRow[nCol] if fConvert is None else fConvert(xRow[nCol]))
+                                 for nCol, fConvert in xColumns])
+            except ValueError:
+                for jj, (nCol, fConvert) in enumerate(xColumns):
+                    try:
+                        if fConvert is not None:
+                            fConvert(xRow[nCol])
+                    except ValueError:
+                        self.xAppendRejects.append((xReader.line_num, -13590, "Invalid value for field %s: %r" %
+                                                    (xNames[jj], xRow[nCol])))
+                        break
+                continue
+            xBatch.append(xValues)
+            xLines.append(xReader.line_num)
+            if len(xBatch) >= nBatchSize:
+                nDone = self._csvinsertbatch(xBatch, xLines, cAlias, cFieldList)
+                xBatch = list()
+                xLines = list()
+                if nDone < 0:
+                    lnReturn = -1
+                    break
+                lnReturn += nDone
+        if xBatch and lnReturn >= 0:
+            nDone = self._csvinsertbatch(xBatch, xLines, cAlias, cFieldList)
+            lnReturn = (-1 if nDone < 0 else lnReturn + nDone)
+        if lnReturn >= 0 and self.xAppendRejects:
+            self.cErrorMessage = "%d rows rejected, see xAppendRejects" % len(self.xAppendRejects)
+            self.nErrorNumber = -9987
+        cError = self.cErrorMessage
+        nError = self.nErrorNumber
+        self.select(lcOldAlias)
+        self.cErrorMessage = cError
+        self.nErrorNumber = nError
+        return lnReturn
+
+    def _csvinsertbatch(self, xBatch, xLines, cAlias, cFieldList):
+        """
+        Appends one batch of converted rows for _appendfromcsv() under one appendlock() with _insertrows().  The
+        rows which are rejected are added to xAppendRejects by their line numbers in xLines.  Returns the number of
+        records appended or -1 on an error which stopped the batch.
+        """
+        bLocked = self.appendlock()
+        nDone, xRejects = self._insertrows(xBatch, cAlias, cFieldList)
+        for nRow, nError, cMessage in xRejects:
+            self.xAppendRejects.append((xLines[nRow], nError, cMessage))
+        if bLocked:
+            cError = self.cErrorMessage
+            nError = self.nErrorNumber
+            self.flush()
+            self.unlock()
+            self.cErrorMessage = cError
+            self.nErrorNumber = nError
+        return nDone
+
+    def _insertrows(self, xRows, cAlias, cFieldList):
+        """
+        Appends xRows, each a tuple of values in the order of the fields in cFieldList, to the table cAlias with
+        the engine insertbatch(), or one row at a time through insertdict() for engines without it.  Places no
+        locks, that is up to the caller.  Returns a tuple of the count of records appended, which is -1 on an
+        error that stopped the whole batch, and a list of (row index, error number, error message) for the rows
+        which were rejected.
+        """
+        xRejects = list()
+        if hasattr(self.cbt, "insertbatch"):
+            xResult = self.cbt.insertbatch(cAlias, cFieldList, xRows, "XX")
+            if xResult is None:
+                nDone = -1
+                self.cErrorMessage = self.cbt.geterrormessage()
+                self.nErrorNumber = self.cbt.geterrornumber()
+            else:
+                nDone, xRejects = xResult
+        else:
+            nDone = 0
+            xNames = cFieldList.split(",")
+            for jj, xValues in enumerate(xRows):
+                if self.insertdict(dict(zip(xNames, xValues)), lcAlias=cAlias):
+                    nDone += 1
+                else:
+                    xRejects.append((jj, self.nErrorNumber, self.cErrorMessage))
+        return nDone, xRejects
+
+    def appender(self, alias="", maxRows=1000, maxDelayMs=1000):
+        """
+        Returns a TableAppender for the open table alias (or the currently selected table), which queues records
+        in memory and appends them in groups.  Each group is written under one appendlock() with the engine
+        insertbatch() and a single flush(), in place of the lock, write, index update and flush for every record
+        that insertdict() does.  Intended for high rate writers like event loggers.
+
+        Records are added with append(dRecord), taking the same dict() of field names and values as insertdict().
+        They are checked against afieldtypes() when they are queued, so a bad record is refused right away rather
+        than at commit time.  The queue is committed when it holds maxRows records, when a record is appended more
+        than maxDelayMs milliseconds after the oldest queued record, and whenever you call commit().  Records are
+        only durable once committed, so call commit() at the points where you need them on disk, or use the
+        appender as a context manager, which commits on the way out of the with block.
+
+        Example:
+        ::
+            with oCBT.appender("EVENTLOG", maxRows=500, maxDelayMs=250) as oLog:
+                for xEvent in xEvents:
+                    oLog.append(xEvent)
+                oLog.commit()  # optional, the with block commits anything left on exit.
+
+        There is no background timer, maxDelayMs is checked as records are appended.  The appender uses this
+        _cbTools instance, so like the instance it should be used by one thread at a time.
+        """
+        return TableAppender(self, alias, maxRows, maxDelayMs)
+
     def insertintotable(self, lxValues, lcFields="", lcAlias="", lcDelimiter="<~!~>", coding="XX"):
         """
         Performs in one function the tasks of appending a new record to a table and filling the fields with new data.
@@ -4414,7 +5867,10 @@ Field  Field Name     Type     Width    Dec  Nulls
             if isstr(lxValues):
                 lcValStr = lxValues
             elif isinstance(lxValues, list):
-                lxFlds = self.afields(lcAlias)
+                xSchema = self.tableschema(lcAlias)
+                if xSchema is None:
+                    lbReturn = False
+                lxFlds = (xSchema.xFields if lbReturn else ())
                 for ix, lf in enumerate(lxFlds):  # checking and converting the types
                     lxValues[ix] = self._py2cbtype(lxValues[ix], lf.cType)
                     if lxValues[ix] is None:
@@ -4669,8 +6125,332 @@ Field  Field Name     Type     Width    Dec  Nulls
             self.nErrorNumber = self.cbt.geterrornumber()
         return lbReturn
 
+    def _queryplan(self, cFilter, cOrder=""):
+        """
+        The query planner behind scan(), copytoarray() and explain().  Splits the VFP logical expression cFilter
+        into its top level .AND. terms and looks for terms comparing an index tag expression with a literal value,
+        like "CUSTNO = 'A1234'", "AMOUNT >= 100", "SHIPDATE <= DATE(2026,6,30)" or "BETWEEN(SHIPDATE,
+        STOD('20260101'), STOD('20260630'))".  The terms on the best tag, equality first, give the low and high keys
+        of a range scan on that tag.  Only ascending tags without a FOR filter which hold every record are used, and when cOrder names
+        the tag the records must come back in, only that tag.  With cOrder empty (record order) any such tag will
+        do, and the record numbers found are sorted.
+
+        Terms on numeric, date and datetime fields with =, ==, >=, <= or BETWEEN() are answered exactly by the range
+        when it has a low key and are left out of the residual filter, the rest of cFilter, which is still tested
+        for each record in the range.  Bounds on I (Integer) fields are rounded inward to whole numbers, the low up
+        and the high down, since the tag can only hold whole numbers.  Any expression with a top level .OR. is not
+        planned.
+
+        Returns a dict() with the keys "tag", "expression", "low", "high", "residual" and "ordered" (True if the
+        range comes back in the cOrder order), or None if no tag helps or the planner is switched off with the
+        bQueryPlanner property.
+        """
+        if (not self.bQueryPlanner) or (not cFilter) or (not hasattr(self.cbt, "scanrange")):
+            return None
+        try:
+            xTokens = _plantokens(cFilter)
+        except ValueError:
+            return None
+        cAlias = (self.cbt.alias() or "").upper()
+        xSchema = self.tableschema(cAlias)
+        if (xSchema is None) or (not xSchema.xTags) or (not xTokens):
+            self.cErrorMessage = ""
+            self.nErrorNumber = 0
+            return None
+        xTypes = xSchema.xTypes
+        xCandidates = dict()  # canonical tag expression: SCHEMATAG
+        for xT in xSchema.xTags:
+            if xT.cTagFilt.strip() or (xT.nDirection != 0) or (xT.nUnique not in (0, 15)):
+                continue  # Descending, filtered and VFP "unique" tags don't hold the keys in the needed order.
+            if cOrder and (xT.cTagName.upper() != cOrder.upper()):
+                continue
+            try:
+                cExpr = _plancanonical(_plantokens(xT.cTagExpr), cAlias)
+            except ValueError:
+                continue
+            xCandidates.setdefault(cExpr, xT)
+        if not xCandidates:
+            return None
+
+        xConjuncts = _planconjuncts(xTokens)
+        if not all(xConjuncts):
+            return None
+        xRanges = dict()  # tag name: [tag info, low value, high value, indexes of the terms answered exactly]
+        for jj, xConj in enumerate(xConjuncts):
+            xTerm = _planterm(xConj, cAlias)
+            if xTerm is None:
+                continue
+            cExpr, cOp, xLow, xHigh = xTerm
+            xT = xCandidates.get(cExpr)
+            if xT is None:
+                continue
+            cType = xTypes.get(cExpr, "C")  # A tag on an expression compared with a string must give strings.
+            if not all(_planfits(cType, xValue) for xValue in (xLow, xHigh) if xValue is not None):
+                continue
+            if cType == "I":
+                # The I key of a bound is truncated, so the bounds are rounded inward, which the field values can't
+                # fall between.  "QTY = 3.5" then gives an empty range.
+                xLow = (None if xLow is None else int(math.ceil(xLow)))
+                xHigh = (None if xHigh is None else int(math.floor(xHigh)))
+            xRange = xRanges.setdefault(xT.cTagName, [xT, None, None, list()])
+            if xLow is not None:
+                xRange[1] = (xLow if xRange[1] is None else max(xRange[1], xLow))
+            if xHigh is not None:
+                xRange[2] = (xHigh if xRange[2] is None else min(xRange[2], xHigh))
+            if (cExpr in xTypes) and (cType in ("N", "F", "I", "B", "D", "T")) and \
+                    (cOp in ("=", "==", ">=", "<=", "BETWEEN")):
+                xRange[3].append(jj)
+        if not xRanges:
+            return None
+
+        xBest = None
+        nBest = 0
+        for xRange in xRanges.values():
+            if (xRange[1] is not None) and (xRange[2] is not None):
+                nScore = (3 if xRange[1] == xRange[2] else 2)
+            else:
+                nScore = 1
+            if nScore > nBest:
+                xBest = xRange
+                nBest = nScore
+        xT, xLow, xHigh, xExact = xBest
+        if xLow is None:
+            xExact = list()  # Without a low key, .NULL. values at the top of the tag would get in.
+        cResidual = " .AND. ".join(cFilter[xConj[0][2]:xConj[-1][3]] for jj, xConj in enumerate(xConjuncts)
+                                   if jj not in xExact)
+        return {"tag": xT.cTagName, "expression": xT.cTagExpr,
+                "low": ("" if xLow is None else self._seekkey(xLow)),
+                "high": ("" if xHigh is None else self._seekkey(xHigh)),
+                "residual": cResidual, "ordered": bool(cOrder)}
+
+    def _planfilter(self, xPlan):
+        """ Prepares the residual filter of the plan xPlan, or clears the filter if there is none.  False on error. """
+        if not xPlan["residual"]:
+            self.cbt.clearfilter()
+            return True
+        if self.cbt.preparefilter(xPlan["residual"]) == 0:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+            return False
+        return True
+
+    def _planrecnos(self, xPlan):
+        """
+        Returns the record numbers of the current table which the plan xPlan from _queryplan() selects, in the order
+        the caller needs, or None on error.
+        """
+        if not self._planfilter(xPlan):
+            return None
+        xResult = self.cbt.scanrange(self.cbt.alias(), xPlan["tag"], xPlan["low"], xPlan["high"], 0, "", False, "XX",
+                                     1, True)
+        if xResult is None:
+            self.cErrorMessage = self.cbt.geterrormessage()
+            self.nErrorNumber = self.cbt.geterrornumber()
+            return None
+        xRecnos = xResult[1]
+        if not xPlan["ordered"]:
+            xRecnos.sort()
+        return xRecnos
+
+    def _planscan(self, xPlan, noData, fieldList, getList, stripblanks, coding, batchSize, oView=None):
+        """
+        Produces the records for scan() from the plan xPlan.  With a batchSize, when the range comes back in the scan
+        order, the records are read batchSize at a time with the engine scanrange().  Otherwise the record numbers in
+        the range are found first, and each record is gone to and scattered in turn, so the current record is the
+        one just returned, as with the full scan.  With the _ViewContext oView, RecordView objects are returned,
+        always by the second way.
+        """
+        oCBT = self.cbt
+        lcCurrentTable = self.alias()
+        if xPlan["ordered"] and (batchSize > 0) and (not noData) and (not getList) and (oView is None):
+            if not self._planfilter(xPlan):
+                return
+            nMode = 1
+            while True:
+                xBatch = oCBT.scanrange(lcCurrentTable, xPlan["tag"], xPlan["low"], xPlan["high"], batchSize,
+                                        fieldList, stripblanks, coding, nMode)
+                if xBatch is None:
+                    self.cErrorMessage = self.cbt.geterrormessage()
+                    self.nErrorNumber = self.cbt.geterrornumber()
+                    raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf())
+                nMode = 0
+                xRecords, xRecnos, bDone = xBatch
+                for xRec in xRecords:
+                    yield xRec
+                del xRecords, xRecnos, xBatch
+                if bDone:
+                    break
+                if oCBT.alias() != lcCurrentTable:
+                    if not oCBT.select(lcCurrentTable):
+                        self.cErrorMessage = "Table has been closed during Scan."
+                        break
+            return
+        xRecnos = self._planrecnos(xPlan)
+        if xRecnos is None:
+            return
+        for lnRecno in xRecnos:
+            if oCBT.alias() != lcCurrentTable:
+                if not oCBT.select(lcCurrentTable):
+                    self.cErrorMessage = "Table has been closed during Scan."
+                    break
+            if not oCBT.goto("RECORD", lnRecno):
+                continue
+            if noData:
+                yield lnRecno
+                continue
+            if oView is not None:
+                lxView = self._viewrecord(oView, lcCurrentTable)
+                if lxView is None:
+                    raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf())
+                yield lxView
+                continue
+            lxWorkDict = oCBT.scatter(lcCurrentTable, True, stripblanks, fieldList, getList, coding)
+            if lxWorkDict is None:
+                if self.cbt.geterrornumber() != 0:
+                    self.cErrorMessage = self.cbt.geterrormessage()
+                    self.nErrorNumber = self.cbt.geterrornumber()
+                    raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf())
+                break
+            lxDict = self._dictcopy(lxWorkDict)
+            del lxWorkDict
+            yield lxDict
+
+    def explain(self, forExpr, indexTag="", alias=""):
+        """
+        Reports how scan() would find the records matching forExpr in the table alias (or the currently selected
+        table), scanning in the order of indexTag (or the current order).  Doesn't run the scan.  Returns a dict()
+        with:
+            - tag - The index tag whose range is scanned, or "" for a scan of the whole table.
+            - expression - The expression of that tag.
+            - low, high - The seek() strings bounding the range, "" for an open end.
+            - residual - The part of forExpr still tested for each record in the range, "" for none.  All of\
+              forExpr for a full scan.
+            - ordered - True if the range comes back in the scan order.  False if the table is in record order\
+              and the record numbers found on the tag are sorted first.
+            - estimate - The number of records the scan will look at.  For a range, the count of tag entries in\
+              it (not deleted, if setdeleted() is on), otherwise reccount().
+
+        copytoarray() uses the same plans for its match filter.  Set the bQueryPlanner property to False to turn
+        the planner off, and scan() and copytoarray() then always test every record.  Returns None on error.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        lcOldAlias = self.alias()
+        if alias and (not self.select(alias)):
+            return None
+        cOrder = (indexTag.upper() if indexTag else (self.cbt.order() or ""))
+        xPlan = self._queryplan(forExpr, cOrder)
+        if xPlan is None:
+            xPlan = {"tag": "", "expression": "", "low": "", "high": "", "residual": forExpr, "ordered": True,
+                     "estimate": self.reccount()}
+        else:
+            lnRecno = self.recno()
+            self.cbt.clearfilter()
+            xResult = self.cbt.scanrange(self.cbt.alias(), xPlan["tag"], xPlan["low"], xPlan["high"], 0, "", False,
+                                         "XX", 1, True)
+            if xResult is None:
+                self.cErrorMessage = self.cbt.geterrormessage()
+                self.nErrorNumber = self.cbt.geterrornumber()
+                xPlan = None
+            else:
+                xPlan["estimate"] = len(xResult[1])
+            if 0 < lnRecno <= self.cbt.reccount():
+                self.cbt.goto("RECORD", lnRecno)
+        if alias:
+            self.select(lcOldAlias)
+        return xPlan
+
+    def scanrange(self, alias, tag, lowKey=None, highKey=None, inclusive=True, descending=False, fieldList=None,
+                  stripblanks=False, coding="XX", noData=False, batchSize=500):
+        """
+        Iterator over the records of the open table alias whose keys on the ascending index tag are between lowKey
+        and highKey, in tag order, or from highKey down to lowKey if descending is True.  Costs time in proportion to
+        the number of records in the range, not the size of the table.
+
+        Call as:
+            for xRec in oCBT.scanrange("SHIPHIST", "SHIPDATE", date(2026, 6, 1), date(2026, 6, 30)):
+                print(xRec["SHIPKEY"])
+
+        Args:
+            alias, tag: The open table and the name of the index tag.
+
+            lowKey, highKey: The ends of the range.  Pass None (or "") for an open end.  Strings are used as they\
+            are, the same as for seek(), and match as prefixes of character keys, so lowKey="SMITH" and\
+            highKey="SMITH" gives every key starting with SMITH.  Dates, datetimes and numbers are converted to\
+            the seek() form as dt2seek() and dtt2seek() would.
+
+            inclusive: True to include the keys equal to the ends of the range, False to leave them out, or a tuple\
+            of two bools for the low and high ends separately, like (True, False) for lowKey <= key < highKey.  An\
+            excluded string end leaves out all of the keys it is a prefix of.
+
+            descending: True to start at highKey and work down to lowKey.
+
+            fieldList: A comma delimited string or a list of the field names to return, None for all fields.
+
+            stripblanks, coding: As for scatter().
+
+            noData: True to get the record numbers rather than dict()s of the records.
+
+            batchSize: The number of records the engine reads per call.
+
+        The engine positions with a seek-nearest of the starting key and compares keys itself, stopping as soon as
+        a key leaves the range.  Deleted records are skipped when setdeleted() is on.  Any filter left prepared by
+        an earlier scan() is cleared.  The order of the table is not changed, but the record pointer runs ahead of
+        the records returned and is left where the range ended.  Sets tally to the number of records returned so
+        far.  Raises ValueError if the engine fails part way, otherwise errors end the iteration with cErrorMessage
+        and nErrorNumber set.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        if isinstance(inclusive, (tuple, list)):
+            bLowIn, bHighIn = inclusive
+        else:
+            bLowIn = bHighIn = inclusive
+        cLow = ("" if lowKey is None else self._seekkey(lowKey))
+        cHigh = ("" if highKey is None else self._seekkey(highKey))
+        if fieldList is None:
+            fieldList = ""
+        elif isinstance(fieldList, (list, tuple)):
+            fieldList = ",".join(fieldList)
+        lcOldAlias = self.alias()
+        lcAlias = (alias or lcOldAlias).upper()
+        if not self.select(lcAlias):
+            return
+        xTags = self.ataginfo()
+        self.select(lcOldAlias)
+        xTag = [xT for xT in (xTags or []) if xT.cTagName.upper() == tag.upper()]
+        if not xTag:
+            self.cErrorMessage = "No Order Set or Tag Not Recognized"
+            self.nErrorNumber = -9992
+            return
+        if xTag[0].nDirection != 0:
+            self.cErrorMessage = "scanrange() needs an ascending index tag, use descending=True to read it backward"
+            self.nErrorNumber = -9988
+            return
+        self.tally = 0
+        oCBT = self.cbt
+        oCBT.clearfilter()  # A filter left from an earlier scan would be applied by the engine.
+        nMode = 1
+        while True:
+            xBatch = oCBT.scanrange(lcAlias, tag, cLow, cHigh, max(batchSize, 1), fieldList, stripblanks, coding,
+                                    nMode, noData, not bLowIn, not bHighIn, descending)
+            if xBatch is None:
+                self.cErrorMessage = oCBT.geterrormessage()
+                self.nErrorNumber = oCBT.geterrornumber()
+                if nMode == 1:
+                    return
+                raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf(lcAlias))
+            nMode = 0
+            xRecords, xRecnos, bDone = xBatch
+            for xRec in (xRecnos if noData else xRecords):
+                self.tally += 1
+                yield xRec
+            del xRecords, xRecnos, xBatch
+            if bDone:
+                break
+
     def scan(self, indexTag="", forExpr="", noData=False, fieldList=None, getList=False, stripblanks=False,
-             bNoTop=False, bDescending=False, coding="XX"):
+             bNoTop=False, bDescending=False, coding="XX", batchSize=0, view=False):
         """
         Functions as an iterator that can be used for successively returning rows from the currently selected table
         either as dictionaries, similar to scatter() which returns a dictionary for the current record, OR
@@ -4707,7 +6487,27 @@ Field  Field Name     Type     Width    Dec  Nulls
 
         If bDescending is True, then the scan moves backward through the table in the specified order.
 
+        Pass batchSize as a number greater than 0 to have the data engine read that many records at a time with
+        its scatterbatch() function instead of one record per call, which is several times faster for large scans.
+        In this mode the record pointer runs ahead of the records returned, so the current record is NOT the one
+        just returned.  Don't use it if the loop changes the scanned table with replace() or delete(), or
+        otherwise relies on the current record.  Ignored if noData is True.
+
+        Index range scans:  When scanning from the top in ascending order, forExpr is given to the query planner,
+        which looks for .AND. terms comparing an index tag expression with a literal value, like "CUSTNO = 'A1234'"
+        or "SHIPDATE >= DATE(2026,1,1)", on a tag usable in the scan order (the scan tag, or any tag when scanning in
+        record order).  If it finds some, only the records in that key range of the tag are read, and only the other
+        terms are tested for each of them.  Records come back in the same order as a full scan would return them,
+        and the iteration ends at the end of the range, not at EOF().  Use explain() to see the plan for a forExpr.
+
+        Pass view=True to get a RecordView of each record, as from scatterview(), in place of a dict().  The raw
+        records are taken from the engine (in batches with its recordbatch() function when batchSize is given) and
+        each field is decoded only when the loop reads it, so scans of wide tables that use a few fields run much
+        faster.  noData, fieldList and getList can't be used with view.  Reading a memo field of a view moves the
+        record pointer and back, see RecordView.
+
         NOTE: Nested scans are NOT supported.  seek() is supported into another table in the middle of the scan.
+        For nested scans or lookups into the same table, use the cursors from tablecursor().
         """
         self.cErrorMessage = ""
         self.nErrorNumber = 0
@@ -4720,18 +6520,32 @@ Field  Field Name     Type     Width    Dec  Nulls
         else:
             if (fieldList != "") and (noData is True):
                 raise ValueError("fieldList must be None if noData is True")
+        oView = None
+        if view:
+            if noData or getList or fieldList:
+                raise ValueError("noData, fieldList and getList can't be used with view")
+            oView = self._viewcontext(self.cbt.alias().upper(), stripblanks, coding)
+            if oView is None:
+                return
         # We have a good indexTag value set...
         lbFilterActive = False
         nSkipper = 1
         if bDescending:
             nSkipper = -1
 
+        xPlan = None
+        if forExpr and (not bNoTop) and (not bDescending):
+            xPlan = self._queryplan(forExpr, self.cbt.order() or "")
         if forExpr:  # corrected suggested by Jerry. 06/20/2012. JSH.
             if self.cbt.preparefilter(forExpr) == 0:
                 self.cErrorMessage = self.cbt.geterrormessage()
                 self.nErrorNumber = self.cbt.geterrornumber()
                 return  # Nothing we can do, illegal filter
             lbFilterActive = True
+        if xPlan is not None:
+            for xRec in self._planscan(xPlan, noData, fieldList, getList, stripblanks, coding, batchSize, oView):
+                yield xRec
+            return
         if not bNoTop:
             if not bDescending:
                 self.goto("TOP")
@@ -4739,6 +6553,47 @@ Field  Field Name     Type     Width    Dec  Nulls
                 self.goto("BOTTOM")
         lcCurrentTable = self.alias()
         oCBT = self.cbt
+        if (batchSize > 0) and (not noData) and hasattr(oCBT, ("scatterbatch" if oView is None else "recordbatch")):
+            if not lbFilterActive:
+                oCBT.clearfilter()  # Any filter left from an earlier scan would be applied by scatterbatch()
+            while True:
+                if oView is None:
+                    xBatch = oCBT.scatterbatch(lcCurrentTable, batchSize, fieldList, stripblanks, coding, getList,
+                                               True, nSkipper)
+                else:
+                    xBatch = oCBT.recordbatch(lcCurrentTable, batchSize, nSkipper)
+                if xBatch is None:
+                    if self.cbt.geterrornumber() != 0:
+                        self.cErrorMessage = self.cbt.geterrormessage()
+                        self.nErrorNumber = self.cbt.geterrornumber()
+                        raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf())
+                    break
+                if oView is not None:
+                    # One buffer for the whole batch, each view reads its own record out of it.
+                    xBuffer, xRecnos = xBatch
+                    if not xRecnos:
+                        break
+                    nWidth = len(xBuffer) // len(xRecnos)
+                    for jj, lnRecno in enumerate(xRecnos):
+                        yield RecordView(oView, xBuffer, jj * nWidth, lnRecno)
+                    del xBuffer, xRecnos, xBatch
+                    if oCBT.alias() != lcCurrentTable:
+                        if not oCBT.select(lcCurrentTable):
+                            self.cErrorMessage = "Table has been closed during Scan."
+                            break
+                    continue
+                xRecords = xBatch[0]
+                if not xRecords:
+                    break
+                for xRec in xRecords:
+                    yield (list(xRec) if getList else xRec)
+                del xRecords, xBatch
+                if oCBT.alias() != lcCurrentTable:
+                    bTest = oCBT.select(lcCurrentTable)
+                    if not bTest:
+                        self.cErrorMessage = "Table has been closed during Scan."
+                        break
+            return
         if lbFilterActive:
             if noData:
                 while not oCBT.eof() and not oCBT.bof():
@@ -4754,7 +6609,10 @@ Field  Field Name     Type     Width    Dec  Nulls
                 while not oCBT.eof() and not oCBT.bof():
                     if oCBT.testfilter():
                         # lxWorkDict = oCBT.scatter("", True, stripblanks, fieldList, getList, coding)
-                        lxWorkDict = oCBT.scatter(lcCurrentTable, True, stripblanks, fieldList, getList, coding)
+                        if oView is None:
+                            lxWorkDict = oCBT.scatter(lcCurrentTable, True, stripblanks, fieldList, getList, coding)
+                        else:
+                            lxWorkDict = self._viewrecord(oView, lcCurrentTable)
                         lxDict = None
                         if lxWorkDict is None:
                             if self.cbt.geterrornumber() != 0:
@@ -4763,7 +6621,7 @@ Field  Field Name     Type     Width    Dec  Nulls
                                 raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf())
                             break
                         else:
-                            lxDict = self._dictcopy(lxWorkDict)
+                            lxDict = (self._dictcopy(lxWorkDict) if oView is None else lxWorkDict)
                         del lxWorkDict
                         yield lxDict
                     if oCBT.alias() != lcCurrentTable:
@@ -4785,7 +6643,10 @@ Field  Field Name     Type     Width    Dec  Nulls
             else:
                 while not oCBT.eof() and not oCBT.bof():
                     # lxWorkDict = oCBT.scatter("", True, stripblanks, fieldList, getList, coding)
-                    lxWorkDict = oCBT.scatter(lcCurrentTable, True, stripblanks, fieldList, getList, coding)
+                    if oView is None:
+                        lxWorkDict = oCBT.scatter(lcCurrentTable, True, stripblanks, fieldList, getList, coding)
+                    else:
+                        lxWorkDict = self._viewrecord(oView, lcCurrentTable)
                     lxDict = None
                     if lxWorkDict is None:
                         if self.cbt.geterrornumber() != 0:
@@ -4794,7 +6655,7 @@ Field  Field Name     Type     Width    Dec  Nulls
                             raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.dbf())
                         break
                     else:
-                        lxDict = self._dictcopy(lxWorkDict)
+                        lxDict = (self._dictcopy(lxWorkDict) if oView is None else lxWorkDict)
                     del lxWorkDict
                     yield lxDict
                     if oCBT.alias() != lcCurrentTable:
@@ -4828,7 +6689,7 @@ Field  Field Name     Type     Width    Dec  Nulls
             self.nErrorNumber = self.cbt.geterrornumber()
         return lbReturn
 
-    def xmltocursor(self, cAlias="", cXML="", cFileName=""):
+    def xmltocursor(self, cAlias="", cXML="", cFileName="", nBatchSize=500):
         """
         In VFP the XMLTOCURSOR() function is the converse of the CURSORTOXML() function.  It makes possible the loading
         of XML created by CURSORTOXML() back into a cursor.  This replicates a portion of the functionality of the
@@ -4842,84 +6703,145 @@ Field  Field Name     Type     Width    Dec  Nulls
         individual records may be any value.  Tag names for fields must match the spelling (but not the case) of fields
         in the target table, or the data element will be ignored.
 
+        The XML is parsed incrementally, and each record element is discarded once it has been read, so memory use
+        stays flat however large the file is.  Records are inserted nBatchSize at a time, each batch under one
+        appendlock() where the lock can be had.  If the XML turns out to be mal-formed part way through, the
+        records before the error stay in the table.  The property tally is set to the number of records inserted.
+
         :param cAlias: Alias of an open table.  If blank, the currently selected table will be used.
         :param cXML: Text string with the XML content to be loaded.  Leave "" if loading from a file.
         :param cFileName: File name from which to load the XML.  Leave "" if cXML is passed.
+        :param nBatchSize: Number of records inserted per append lock.
         :return:  Number of records loaded.  0 indicates an error.
         """
         nRecs = 0
+        self.tally = 0
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
         cOldAlias = self.alias()
-        cTopName = ""
         bOK = True
-        cSource = cXML
+        oSource = None
         bGoodRead = True
-        oTopNode = None
         xTypes = None
         cOldError = ""
         nOldErrNum = 0
-        if not cSource:
+        if nBatchSize < 1:
+            nBatchSize = 1
+        if cXML:
+            if isinstance(cXML, bytes):
+                oSource = io.BytesIO(cXML)
+            else:
+                oSource = io.StringIO(cXML)
+        else:
             try:
-                xFile = open(cFileName, "rb")
-                cSource = xFile.read()
-                xFile.close()
+                oSource = open(cFileName, "rb")
             except:
                 bGoodRead = False
         if not bGoodRead:
             self.cErrorMessage = "Unable to read XML File"
             self.nErrorNumber = -9235
             return 0
-        if cSource:
+        try:
             if cAlias:
                 bGoodRead = self.select(cAlias)
+                bOK = bGoodRead
             if bGoodRead:
                 xTypes = self.afieldtypes()
-                cTest = cSource[0:5].upper()
-                if cTest != "<?XML":
+                cTest = oSource.read(5)
+                oSource.seek(0)
+                if isinstance(cTest, bytes):
+                    cTest = cTest.decode("latin-1")
+                if not cTest:
+                    pass  # Nothing to load, as with an empty string passed before.
+                elif cTest.upper() != "<?XML":
+                    bOK = False
                     self.cErrorMessage = "not XML data"
                 else:
+                    xPending = list()
+                    nDepth = 0
+                    oTopNode = None
+                    bParsed = True
                     try:
-                        oDom = minidom.parseString(cSource)
-                        oNodes = oDom.childNodes
-                        oTopNode = oNodes[0]
-                    except:
-                        bGoodRead = False  # we don't really care why.
+                        for cEvent, oElem in ElementTree.iterparse(oSource, events=("start", "end")):
+                            if cEvent == "start":
+                                nDepth += 1
+                                if nDepth == 1:
+                                    oTopNode = oElem
+                                continue
+                            nDepth -= 1
+                            if nDepth != 1:
+                                continue
+                            # The end of one record element, a child of the top level node.
+                            xData = dict()
+                            for xFld in oElem:
+                                cName = xFld.tag.split("}")[-1].upper()  # Drop any namespace.
+                                cValue = (xFld.text if xFld.text is not None else "")
+                                xData[cName] = self.getValueFromXMLString(cValue, xTypes.get(cName, ""))
+                            oTopNode.clear()  # Discard the records read so far, so memory use stays flat.
+                            if len(xData) > 0:
+                                xPending.append(xData)
+                            if len(xPending) >= nBatchSize:
+                                nDone = self._xmlinsertbatch(xPending, cAlias)
+                                nRecs += nDone
+                                bOK = (nDone == len(xPending))
+                                if not bOK:
+                                    break
+                                xPending = list()
+                    except ElementTree.ParseError:
+                        bParsed = False
+                    if bOK and xPending:  # Including the records read before a parse error.
+                        nDone = self._xmlinsertbatch(xPending, cAlias)
+                        nRecs += nDone
+                        bOK = (nDone == len(xPending))
+                    if bOK and not bParsed:
+                        bOK = False
                         self.cErrorMessage = "Mal-Formed XML: can't parse XML"
-                    if bGoodRead:
-                        # have at least one top level node...
-                        for oRec in oTopNode.childNodes:
-                            if oRec.nodeType == oRec.ELEMENT_NODE:
-                                xData = dict()
-                                xFlds = oRec.childNodes
-                                for xFld in xFlds:
-                                    if xFld.nodeType == oRec.ELEMENT_NODE:
-                                        cName = xFld.tagName.upper()
-                                        oValue = xFld.firstChild
-                                        if oValue is not None:
-                                            cValue = oValue.nodeValue
-                                        else:
-                                            cValue = ""
-                                        xData[cName.upper()] = self.getValueFromXMLString(cValue, xTypes.get(cName, ""))
-
-                                if len(xData) > 0:
-                                    # we have some data in the dict...
-                                    # bOK = self.insertintotable(xData)
-                                    bOK = self.insertdict(xData, lcAlias=cAlias)
-                                    if bOK:
-                                        nRecs += 1
-                                    else:
-                                        nRecs = 0
-                                        break
+                    if not bOK:
+                        self.tally = nRecs
+                        nRecs = 0
+        finally:
+            oSource.close()
+        if nRecs:
+            self.tally = nRecs
+        if bOK:
+            # An appendlock() which failed along the way leaves its message, though the records went in without it.
+            self.cErrorMessage = ""
+            self.nErrorNumber = 0
 
         cOldError = self.cErrorMessage
         nOldErrNum = self.nErrorNumber
         self.select(cOldAlias) # This clears the error, so if we have one we have to store it
-        if nOldErrNum != 0:
+        if nOldErrNum != 0 or cOldError:
             self.cErrorMessage = cOldError
             self.nErrorNumber = nOldErrNum
         return nRecs
 
+    def _xmlinsertbatch(self, xRecords, cAlias):
+        """
+        Inserts one batch of records for xmltocursor().  Places one appendlock() for the batch if it can, which
+        saves CodeBase from locking and unlocking for each record.  Returns the number of records inserted, which
+        is less than len(xRecords) on failure, in which case cErrorMessage is set.
+        """
+        bLocked = self.appendlock()
+        bOK = True
+        nDone = 0
+        for xData in xRecords:
+            bOK = self.insertdict(xData, lcAlias=cAlias)
+            if not bOK:
+                break
+            nDone += 1
+        if bLocked:
+            cError = self.cErrorMessage
+            nError = self.nErrorNumber
+            self.flush()
+            self.unlock()
+            if not bOK:
+                self.cErrorMessage = cError
+                self.nErrorNumber = nError
+        return nDone
+
     def cursortoxml(self, cAlias="", cForExpr="", cFields=None, bStripBlanks=False, cFileName="", cpRecName="",
-                    cAltMainTag=""):
+                    cAltMainTag="", nBatchSize=0):
         """
         In VFP the CURSORTOXML() function is a powerful means of copying all or part of a cursor or table into
         XML form in several different ways.  This method provides a subset of that functionality, creating a file
@@ -4939,16 +6861,21 @@ Field  Field Name     Type     Width    Dec  Nulls
                unique 8-character name in all lower case for the record tags.
         :param cAltMainTag: By default this function follows the VFP practice and wraps everything in <VFPData> tags.
                If you want something different, specify the base name here.  The system will add the brackets.
+        :param nBatchSize: If greater than 0, the records are read that many at a time.  See the batchSize
+               parameter of scan().
         :return: The XML text as a string unless the cFileName parm is not empty.  If cFileName is "", if an error
             occurs, the function will return "".  If cFileName is a file name, returns True on success, False on
             failure, and sets cErrorMessage.
 
-        NOTE: The XML text is stored in memory until output at the end.  Very large tables may produce memory
-        issues as a result, especially in 32-bit versions of Python.
+        NOTE: When cFileName is passed, each record is written to the file as it is read, so memory use stays flat
+        however large the table is.  The file is written in the encoding named in its XML declaration.  When the
+        XML is returned as a string, it is all held in memory, so very large tables may produce memory issues,
+        especially in 32-bit versions of Python.
         """
         cOldAlias = self.alias()
         bOK = True
         cXML = ""
+        xFile = None
         cPreserve = ("" if bStripBlanks else ' xml:space="preserve"')
         bFileOutput = (cFileName != "")
         cMainTagStart = "<VFPData%s>" % cPreserve
@@ -4959,46 +6886,66 @@ Field  Field Name     Type     Width    Dec  Nulls
 
         if cAlias:
             bOK = self.select(cAlias)
+        if bOK and bFileOutput:
+            try:
+                if not _ver3x:
+                    xFile = open(cFileName, "w", 1048576)
+                else:
+                    xFile = io.open(cFileName, "w", 1048576, encoding="utf-8")
+            except:
+                bOK = False
+                self.cErrorMessage = "Writing XML to file %s failed" % (cFileName,)
         if bOK:
-            if not _ver3x:
-                cXML = '<?xml version = "1.0" encoding="Windows-1252" standalone="yes"?>\n%s\n' % (cMainTagStart,)
-            else:
-                cXML = '<?xml version = "1.0" encoding="UTF-8" standalone="yes"?>\n%s\n' % (cMainTagStart,)
-            cRecName = cpRecName
-            if not cRecName:
-                for jj in range(0, 8):
-                    cRecName += random.choice("abcdefghijklmnopqrstuvwxyz")
-            if cFields is not None:
-                xFields = cFields.split(",")
-            else:
-                xFields = list()
-                xFld = self.afields()
-                for xF in xFld:
-                    xFields.append(xF.cName.upper())  # official order of the fields in the table.
-            xTypes = self.afieldtypes()
-            cRecTagStart = "\t<%s>\r\n" % (cRecName,)
-            cRecTagEnd = "\n\t</%s>" % (cRecName,)
             xRecXML = list()
-            for xRec in self.scan(forExpr=cForExpr, fieldList=cFields, stripblanks=bStripBlanks):
-                xTemp = list()
-                for cF in xFields:  # List of field names in the required order
-                    cType = xTypes[cF]
-                    xValue = xRec[cF]
-                    cF = cF.lower()
-                    xTemp.append('\t\t<%s>%s</%s>' % (cF, self.makeXMLValueString(xValue, cType), cF))
-                xRecXML.append(cRecTagStart + "\n".join(xTemp) + cRecTagEnd)
-            cXML = cXML + "\n".join(xRecXML) + "\n" + cMainTagEnd + "\n"
-
-        self.select(cOldAlias)
-        if bFileOutput:
+            if bFileOutput:
+                xWrite = xFile.write
+            else:
+                xWrite = xRecXML.append
             try:
-                xFile = open(cFileName, "w")
-                xFile.write(cXML)
-                xFile.close()
-            except:
+                if not _ver3x:
+                    xWrite('<?xml version = "1.0" encoding="Windows-1252" standalone="yes"?>\n%s\n' % (cMainTagStart,))
+                else:
+                    xWrite('<?xml version = "1.0" encoding="UTF-8" standalone="yes"?>\n%s\n' % (cMainTagStart,))
+                cRecName = cpRecName
+                if not cRecName:
+                    for jj in range(0, 8):
+                        cRecName += random.choice("abcdefghijklmnopqrstuvwxyz")
+                xSchema = self.tableschema()
+                if cFields is not None:
+                    xFields = cFields.split(",")
+                else:
+                    xFields = [xF.cName.upper() for xF in xSchema.xFields]  # official order of the fields in the table.
+                xTypes = xSchema.xTypes
+                cRecTagStart = "\t<%s>\r\n" % (cRecName,)
+                cRecTagEnd = "\n\t</%s>" % (cRecName,)
+                cSeparator = ""
+                for xRec in self.scan(forExpr=cForExpr, fieldList=cFields, stripblanks=bStripBlanks,
+                                      batchSize=nBatchSize):
+                    xTemp = list()
+                    for cF in xFields:  # List of field names in the required order
+                        cType = xTypes[cF]
+                        xValue = xRec[cF]
+                        cF = cF.lower()
+                        xTemp.append('\t\t<%s>%s</%s>' % (cF, self.makeXMLValueString(xValue, cType), cF))
+                    xWrite(cSeparator + cRecTagStart + "\n".join(xTemp) + cRecTagEnd)
+                    cSeparator = "\n"
+                xWrite("\n" + cMainTagEnd + "\n")
+            except (IOError, OSError):
                 bOK = False
                 self.cErrorMessage = "Writing XML to file %s failed" % (cFileName,)
+            finally:
+                if xFile is not None:
+                    try:
+                        xFile.close()
+                    except (IOError, OSError):
+                        bOK = False
+                        self.cErrorMessage = "Writing XML to file %s failed" % (cFileName,)
+            if not bFileOutput:
+                cXML = "".join(xRecXML)
+            del xRecXML
 
+        self.select(cOldAlias)
+        if bFileOutput:
             xRet = bOK
         else:
             if bOK:
@@ -5129,7 +7076,7 @@ Field  Field Name     Type     Width    Dec  Nulls
 
         return cRet
 
-    def getNewKey(self, dataDir, filename=None, readOnly=False, stayOpen=False, noFlush=False):
+    def getNewKey(self, dataDir, filename=None, readOnly=False, stayOpen=False, noFlush=False, count=1):
         """
         Returns the next sequential unique key number for the passed filename or a negative
         value on error.  Using this method provides an alternative to auto-incrementing keys which CodeBase
@@ -5155,6 +7102,10 @@ Field  Field Name     Type     Width    Dec  Nulls
             factor of 10 by passing noFlush=True, to bypass this flushing action.  In that case, you may still\
             wish to issue a flush() function at the end of your looping update process.
 
+            count: The number of keys to reserve.  The NEXTKEYVAL is advanced by count in the one locked update\
+            and the first key of the block is returned, the caller owns it and the count - 1 keys following it.\
+            See keyallocator() for handing out keys from reserved blocks.
+
         NOTE: CodeBase claims to support auto-generated key fields, but that functionality doesn't appear to be
         compatible with the corresponding feature in Visual FoxPro.  This function helps get around that limitation
         by using a NextKey.dbf table to store the "next key" value of each table in your system.  The NextKey.dbf
@@ -5229,7 +7180,7 @@ Field  Field Name     Type     Width    Dec  Nulls
                     if (noFlush is None) or (not noFlush):
                         oCBT.refreshrecord()
                     nReturn = oCBT.scatterfieldlong("NEXTKEYVAL")
-                    bOK = oCBT.replacelong("NEXTKEYVAL", nReturn + 1)
+                    bOK = oCBT.replacelong("NEXTKEYVAL", nReturn + count)
                     if not bOK:
                         nReturn = -1
                         self.cErrorMessage = "Unable to update NextKey table with updated value"
@@ -5247,7 +7198,7 @@ Field  Field Name     Type     Width    Dec  Nulls
                 if not readOnly:
                     xRec = dict()
                     xRec["TABLE_NAME"] = filename
-                    xRec["NEXTKEYVAL"] = nReturn + 1
+                    xRec["NEXTKEYVAL"] = nReturn + count
                     if self.appendlock(retries=5, interval=0.3):
                         self.insertintotable(xRec)
             if not stayOpen:
@@ -5265,7 +7216,29 @@ Field  Field Name     Type     Width    Dec  Nulls
             self.cErrorMessage = errormessage
         return nReturn
 
-    def setstrictaliasmode(self, bMode=False):
+    def keyallocator(self, dataDir, blockSize=100, noFlush=False):
+        """
+        Returns a KeyAllocator, which hands out the same keys as getNewKey() from blocks reserved in NEXTKEY.DBF.
+        Each block of blockSize keys for a table costs one locked NEXTKEYVAL update, after which its keys come from
+        memory, so bulk loads needing many keys avoid the seek, lock, update, flush and unlock for every key.
+
+        Example:
+        ::
+            with oCBT.keyallocator(cDataDir, blockSize=1000) as oKeys:
+                oKeys.setblocksize("SHIPMSTR", 5000)
+                for xRec in xRecords:
+                    xRec["SHIPKEY"] = oKeys.newkey("SHIPMSTR")
+                    oCBT.insertdict(xRec, "SHIPMSTR")
+
+        Applications, including VFP ones, which take keys from NEXTKEY.DBF one at a time can go on doing so while
+        the allocator is in use, since a block is reserved with the same record lock and NEXTKEYVAL update, just
+        advanced by the block size.  The keys one process gets are then not consecutive with another's.  Keys
+        reserved but not handed out are returned by close() (or at the end of the with block) if no one has
+        taken a key for that table since, otherwise they are left unused.  See the KeyAllocator class for more.
+        """
+        return KeyAllocator(self, dataDir, blockSize, noFlush)
+
+    def setstrictaliasmode(self, bMode=False):
         """
         Obsolete, but here because some old code may make this call
 
@@ -5349,9 +7322,10 @@ Field  Field Name     Type     Width    Dec  Nulls
 
 _cbToolsobj = None  # Only instantiated if needed.
 _cbToolsLargeobj = None     # only instantiated if needed
+_xEngineToolsObjs = dict()  # Instances for an explicitly requested engine, keyed by (engine, bIsLarge)
 
 
-def cbTools(bIsLarge=False):
+def cbTools(bIsLarge=False, cEngine=""):
     """
     Factory function that delivers an object reference to the _cbTools() type object.\
     Note that by default this module serves up only ONE actual copy of the _cbTools() object.\
@@ -5362,12 +7336,19 @@ def cbTools(bIsLarge=False):
         tables simultaneously, but limits tables to VFP type limits (max size 2GB).  Pass True for a version\
         that enables Larget Table mode to access tables of almost unlimited size.
 
+        cEngine: See cbToolsX().  One shared instance is kept for each engine requested.
+
     Returns:
         Object reference to a _cbTools() class object.
 
     """
     global _cbToolsLargeobj
     global _cbToolsobj
+    if cEngine and cEngine.upper() != gcDefaultEngine:
+        xKey = (cEngine.upper(), bool(bIsLarge))
+        if xKey not in _xEngineToolsObjs:
+            _xEngineToolsObjs[xKey] = _cbTools(bIsLarge, cEngine=cEngine)
+        return _xEngineToolsObjs[xKey]
     if bIsLarge:
         if _cbToolsLargeobj is None:
             _cbToolsLargeobj = _cbTools(True)
@@ -5378,7 +7359,7 @@ def cbTools(bIsLarge=False):
         return _cbToolsobj
 
 
-def cbToolsX(bIsLarge=False):
+def cbToolsX(bIsLarge=False, cEngine=""):
     """
     This version of the cbTools caller creates a brand new instance every time.  This is preferred for new work\
     because it provides for a unique session number for the instance to reduce interference between instances\
@@ -5387,6 +7368,11 @@ def cbToolsX(bIsLarge=False):
     Parameters:
         bIsLarge: See cbTools() for details.
 
+        cEngine: Selects the data engine.  "PYD" is the compiled CodeBasePYWrapperXX.pyd, "READER" is the\
+        pure Python, read-only, memory mapped engine in CodeBasePYReader which runs on any platform.  Leave\
+        empty for the default, which is the compiled engine when one exists for the running Python, otherwise\
+        the reader.  Requesting "PYD" where there is no compiled engine raises ValueError.
+
     Returns:
         The object reference to a new instance of cbTools()
 
@@ -5395,11 +7381,15 @@ def cbToolsX(bIsLarge=False):
 
     NOTE: This version is experimental.  The unique instances do not appear to be as individually isolated\
     as the CodeBase docs suggest they should be.
+
+    NOTE: Each instance is bound to its own data session through a session handle, with its own current table,\
+    filters, error message and tally, so instances are isolated, and one per thread may be used from several\
+    threads at once.  See Threads in the module docstring.
     """
     if bIsLarge:
-        return _cbTools(True)
+        return _cbTools(True, cEngine=cEngine)
     else:
-        return _cbTools(False)
+        return _cbTools(False, cEngine=cEngine)
 
 
 class TableObj(object):
@@ -5414,11 +7404,17 @@ class TableObj(object):
     For details on how this component works, see the docstring for the TableObj() method in cbTools().
     """
 
-    def __init__(self, vfp, tablename, alias="", readOnly=False, exclusive=False, reset=False):
+    # Methods which only describe the table, so in cursor mode they neither write back nor drop the current record.
+    _xCursorSafe = frozenset(["alias", "dbf", "reccount", "fcount", "afields", "afieldtypes", "tableschema",
+                              "ataginfo", "order", "isreadonly", "tagcount", "used"])
+
+    def __init__(self, vfp, tablename, alias="", readOnly=False, exclusive=False, reset=False, cursor=False,
+                 batchSize=100):
         """
         Create database object from cbTools connection object.  Ignores deleted record.
         :tablename: can include full path
         optional :reset: will cause file to be re-opened if already open
+        optional :cursor: True for the cursor mode, see the TableObj() method of _cbTools
         """
         self._fields = dict()
         self.__dict__.update(  # required because of def __setattr__
@@ -5428,6 +7424,13 @@ class TableObj(object):
             name='',
             _readOnly=readOnly,
             _exclusive=exclusive,
+            _bCursor=cursor,
+            _nBatchSize=max(int(batchSize), 1),
+            _xRow=None,  # cursor mode: the scatter() of the current record, None until a field is read.
+            _nRowRecno=0,
+            _xPending=dict(),  # cursor mode: field assignments not yet written.
+            _xAhead=collections.deque(),  # cursor mode: (recno, record) of the rest of the batch.
+            _bAhead=False,  # cursor mode: True when the engine's pointer is past the batch, not on _nRowRecno.
             nErrorNumber=0,
             cErrorMessage='',
         )
@@ -5444,7 +7447,8 @@ class TableObj(object):
                 self.open = False
                 self._vfp = None    # to return an unusable instance
         if self.open:
-            self._fields = vfp.afieldtypes()
+            xSchema = vfp.tableschema()
+            self._fields = (dict() if xSchema is None else xSchema.xTypes)
             if not self.name in self._vfp._tablenames:
                 self._vfp._tablenames.append( self.name)
 
@@ -5459,6 +7463,17 @@ class TableObj(object):
             raise AttributeError( "Closed file")
         self.cErrorMessage = self._vfp.cErrorMessage    # otherwise accessing any other function might
         self.nErrorNumber = self._vfp.nErrorNumber      # clear these
+        if self._bCursor:
+            cKey = fieldName.upper().split('.')[-1]
+            if cKey in self._fields:
+                return self._rowvalue(cKey)
+            if self._bAhead and fieldName in ("recno", "eof"):
+                return ((lambda: self._nRowRecno) if fieldName == "recno" else (lambda: False))
+            if fieldName not in self._xCursorSafe:
+                if not self._writeback():
+                    raise ValueError('Cannot write changes to "%s": %s' % (self.name, self.errormessage))
+                self._sync()
+                self._xRow = None
         curname = self._saveName()
         # in case the field was in the format FILE.FIELD - not fully working
         type = self._fields.get( fieldName.upper().split('.')[-1], '')
@@ -5483,6 +7498,12 @@ class TableObj(object):
             super(TableObj,self).__setattr__(fieldName, value)
             return
         if self.open:
+            if self._bCursor:
+                cKey = fieldName.upper().split('.')[-1]
+                if cKey not in self._fields:
+                    raise AttributeError( '%s is not a valid field in "%s"' % (fieldName,self.__dict__['name']))
+                self._xPending[cKey] = value
+                return
             curname = self._saveName()
             # in case the field was in the format FILE.FIELD - not fully working
             type = self._fields.get( fieldName.upper().split('.')[-1], '')
@@ -5539,8 +7560,25 @@ class TableObj(object):
         ::
             [r.doc_code for r in fileInstance if r.doc_reqd]
 
+        In cursor mode the records are read in batches, see the TableObj() method of _cbTools.
+
         :return: generator
         """
+        if self._bCursor:
+            if not self._writeback():
+                raise ValueError('Cannot write changes to "%s": %s' % (self.name, self.errormessage))
+            self._dropcursor()
+            curname = self._saveName()
+            self._vfp.goto("TOP")
+            if curname:
+                self._vfp.select(curname)
+
+            def nextc():
+                if self._fetch(False):
+                    yield self
+                    while self.next():
+                        yield self
+            return nextc()
         self._vfp.goto("TOP")
 
         def nextr():
@@ -5550,6 +7588,130 @@ class TableObj(object):
                 yield self
         return nextr()
 
+    def _rowvalue(self, cKey):
+        """ Cursor mode field read: the pending assignment, or the field from the copy of the current record. """
+        if cKey in self._xPending:
+            return self._xPending[cKey]
+        if self._xRow is None:
+            xRow = self._vfp.scatter(self.name, stripblanks=True)  # As curval(field, True) reads in plain mode.
+            self.cErrorMessage = self._vfp.cErrorMessage
+            self.nErrorNumber = self._vfp.nErrorNumber
+            if xRow is None:
+                return None  # No current record, see cErrorMessage.
+            self._xRow = xRow
+        return self._xRow.get(cKey)
+
+    def _fetch(self, bSkip):
+        """
+        Cursor mode: makes the next record current, reading a new batch with scatterbatch() from the engine's
+        pointer, after a skip(1) when bSkip is True and the pointer is still on the current record.  Returns False
+        at EOF.
+        """
+        oVFP = self._vfp
+        oCBT = oVFP.cbt
+        curname = self._saveName()
+        if bSkip and not self._bAhead:
+            oCBT.skip(1)
+        self._dropcursor()
+        xRows = []
+        if hasattr(oCBT, "scatterbatch"):
+            oCBT.clearfilter()  # Any filter left from a scan() would be applied by scatterbatch(), as in scan().
+            xBatch = oCBT.scatterbatch(self.name, self._nBatchSize, "", True, "XX", False, True, 1)
+            if xBatch is None:
+                self.errormessage = self.cErrorMessage = oCBT.geterrormessage()
+                self.nErrorNumber = oCBT.geterrornumber()
+            else:
+                xRows = list(zip(xBatch[1], xBatch[0]))
+                self._bAhead = bool(xRows)
+        elif not oCBT.eof():
+            xRow = oVFP.scatter(self.name, stripblanks=True)
+            if xRow is not None:
+                xRows = [(oCBT.recno(), xRow)]
+        if curname:
+            oVFP.select(curname)
+        if not xRows:
+            return False
+        self._nRowRecno, self._xRow = xRows[0]
+        self._xAhead.extend(xRows[1:])
+        return True
+
+    def _sync(self):
+        """ Cursor mode: puts the engine's pointer back on the current record if it has run ahead with a batch. """
+        if self._bAhead:
+            curname = self._saveName()
+            self._vfp.goto("RECORD", self._nRowRecno)
+            if curname:
+                self._vfp.select(curname)
+            self._bAhead = False
+            self._xAhead.clear()
+
+    def _dropcursor(self):
+        """ Cursor mode: forgets the current record copy and the batch.  Pending assignments are kept. """
+        self._xRow = None
+        self._nRowRecno = 0
+        self._xAhead.clear()
+        self._bAhead = False
+
+    def _writeback(self):
+        """
+        Cursor mode: writes the pending assignments to the current record with one gatherdict(), going to the
+        record and back if the pointer has run ahead with a batch.  Returns False with the error set, keeping the
+        assignments, if it fails.
+        """
+        if not self._xPending:
+            return True
+        oVFP = self._vfp
+        oCBT = oVFP.cbt
+        curname = self._saveName()
+        if self._bAhead:
+            bEof = oCBT.eof()
+            nAhead = oCBT.recno()
+            oCBT.goto("RECORD", self._nRowRecno)
+        lbReturn = oVFP.gatherdict(self.name, self._xPending)
+        self.errormessage = self.cErrorMessage = oVFP.cErrorMessage
+        self.nErrorNumber = oVFP.nErrorNumber
+        if self._bAhead:
+            if not bEof:
+                oCBT.goto("RECORD", nAhead)
+            elif oCBT.goto("BOTTOM"):
+                oCBT.skip(1)
+        if curname:
+            oVFP.select(curname)
+        if lbReturn:
+            if self._xRow is not None:
+                self._xRow.update(self._xPending)
+            self._xPending = dict()
+        return lbReturn
+
+    def flush(self):
+        """
+        Writes the pending assignments of a cursor mode table object with gatherdict(), then flushes the table's
+        changes to disk as _cbTools.flush() does.  Returns False on error, keeping the assignments, see the cursor
+        mode notes in the TableObj() method of _cbTools.
+        does not change current active file
+        """
+        self.errormessage = ""
+        if not self.open:
+            self.errormessage = "Cannot flush a closed file"
+            return False
+        if self._bCursor and not self._writeback():
+            return False
+        curname = self._saveName()
+        lbReturn = self._vfp.flush()
+        self.errormessage = self.cErrorMessage = self._vfp.cErrorMessage
+        self.nErrorNumber = self._vfp.nErrorNumber
+        if curname:
+            self._vfp.select(curname)
+        return lbReturn
+
+    def discard(self):
+        """
+        Drops the pending assignments of a cursor mode table object without writing them, and the copy of the
+        current record, so the next field read gets it from the table again.
+        """
+        self._xPending = dict()
+        self._xRow = None
+
     def _saveName(self):
         """
         If the "current" VFP table isn't the the one we want, switch to the one we want, then return the...
@@ -5566,10 +7728,15 @@ class TableObj(object):
     def close(self):
         """closes table AND renders instance inert.
         does not change current active file
+        In cursor mode the pending assignments are written first.  If that fails, the table is left open and
+        False is returned, call discard() to close it without them.
         """
         ret = 0
         self.errormessage = ""
         if self.open:
+            if self._bCursor and not self._writeback():
+                return False
+            self._dropcursor()
             curname = self._vfp.alias()
             ret = self._vfp.closetable( self.name)
             self.open = False
@@ -5602,9 +7769,18 @@ class TableObj(object):
     def next(self):
         """next record.
         does not change current active file
+        In cursor mode, writes the pending assignments first, raising ValueError if that fails, and takes the
+        record from the current batch, reading the next one when it runs out.
         """
         res = False
         self.errormessage = ""
+        if self.open and self._bCursor:
+            if not self._writeback():
+                raise ValueError('Cannot write changes to "%s": %s' % (self.name, self.errormessage))
+            if self._xAhead:
+                self._nRowRecno, self._xRow = self._xAhead.popleft()
+                return True
+            return self._fetch(True)
         if self.open:
             curname = self._saveName()
             self._vfp.skip(1)
@@ -5621,6 +7797,9 @@ class TableObj(object):
         res = False
         self.errormessage = ""
         if self.open:
+            if self._bCursor and not self._writeback():
+                return False
+            self._dropcursor()
             tablename = self._vfp.dbf()
             curname = self._saveName()
             self._vfp.closetable( self.name)
@@ -5640,6 +7819,1049 @@ class TableObj(object):
             self.errormessage = "Cannot reset a closed file"
         return res
 
+
+class TableCursor(object):
+    """
+    A record pointer, index order, filter and locate expression of its own on a table open in a _cbTools instance,
+    sharing the open of the table with the instance and any other cursors.  Create it with the tablecursor() method
+    of _cbTools, not directly, see tablecursor() for the details.  Methods not defined here are those of the
+    _cbTools instance, run with the cursor position in place.
+
+    Attributes:
+        alias: The alias of the table.
+
+        cErrorMessage, nErrorNumber: Error information from the most recent method call.
+    """
+
+    def __init__(self, vfp, alias="", order=None):
+        self._vfp = vfp
+        self._nDepth = 0
+        self._xSaved = None
+        self._cOldAlias = ""
+        self._cFilter = ""
+        self._cLocate = ""
+        self.alias = (alias or vfp.alias()).upper()
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        xPosition = vfp.getposition(self.alias)
+        if xPosition is None:
+            raise ValueError("Unable to open a cursor on %s: %s" % (self.alias, vfp.cErrorMessage))
+        self._xPosition = (0, 1, (xPosition[2] if order is None else (order or "").upper()))
+        with self:
+            self.goto("TOP")
+
+    def __enter__(self):
+        self._nDepth += 1
+        if self._nDepth > 1:
+            return self
+        oVFP = self._vfp
+        cError, nError = oVFP.cErrorMessage, oVFP.nErrorNumber
+        self._cOldAlias = oVFP.alias()
+        self._xSaved = oVFP.getposition(self.alias)
+        if (self._xSaved is None) or (not oVFP.select(self.alias)) or \
+                (not oVFP.setposition(self._xPosition, self.alias)):
+            cMessage = oVFP.cErrorMessage
+            if self._xSaved is not None:
+                oVFP.setposition(self._xSaved, self.alias)
+            if self._cOldAlias:
+                oVFP.select(self._cOldAlias)
+            self._nDepth -= 1
+            raise ValueError("Unable to position the cursor on %s: %s" % (self.alias, cMessage))
+        oVFP.cErrorMessage, oVFP.nErrorNumber = cError, nError
+        return self
+
+    def __exit__(self, xType, xValue, xTrace):
+        self._nDepth -= 1
+        if self._nDepth > 0:
+            return False
+        oVFP = self._vfp
+        cError, nError = oVFP.cErrorMessage, oVFP.nErrorNumber
+        xPosition = oVFP.getposition(self.alias)
+        if xPosition is not None:
+            self._xPosition = xPosition
+            oVFP.setposition(self._xSaved, self.alias)
+        if self._cOldAlias and (self._cOldAlias.upper() != self.alias):
+            oVFP.select(self._cOldAlias)
+        oVFP.cErrorMessage, oVFP.nErrorNumber = cError, nError
+        return False
+
+    def __getattr__(self, cName):
+        if cName.startswith("_"):
+            raise AttributeError(cName)
+        xMember = getattr(self._vfp, cName)
+        if not callable(xMember):
+            return xMember
+
+        def _call(*args, **kwargs):
+            with self:
+                xReturn = xMember(*args, **kwargs)
+                self.cErrorMessage = self._vfp.cErrorMessage
+                self.nErrorNumber = self._vfp.nErrorNumber
+            return xReturn
+        return _call
+
+    def __repr__(self):
+        return "<TableCursor %s recno %d>" % (self.alias, self._xPosition[0])
+
+    def _settle(self, cExpr, nDirection):
+        """
+        With the cursor in place, moves from the current record in nDirection to the first record for which cExpr
+        is True, with one engine recordbatch() walk.  Returns True if it is on one, False at EOF or BOF or on error.
+        """
+        oCBT = self._vfp.cbt
+        if oCBT.preparefilter(cExpr) == 0:
+            self.cErrorMessage = oCBT.geterrormessage()
+            self.nErrorNumber = oCBT.geterrornumber()
+            return False
+        xBatch = oCBT.recordbatch(self.alias, 1, nDirection)
+        if xBatch is None:
+            self.cErrorMessage = oCBT.geterrormessage()
+            self.nErrorNumber = oCBT.geterrornumber()
+        oCBT.clearfilter()
+        if not xBatch or not xBatch[1]:
+            return False
+        return oCBT.goto("RECORD", xBatch[1][0])
+
+    def _filterexpr(self, cExpr=""):
+        """ Returns cExpr .AND.'ed with the cursor filter. """
+        if self._cFilter and cExpr:
+            return "(" + self._cFilter + ") .AND. (" + cExpr + ")"
+        return self._cFilter or cExpr
+
+    def recno(self):
+        """ Returns the record number of the cursor, reccount() + 1 at EOF as for recno(). """
+        return self._xPosition[0]
+
+    def eof(self):
+        """ Returns True if the cursor is at EOF. """
+        return self._xPosition[1] == 1
+
+    def bof(self):
+        """ Returns True if the cursor is at BOF. """
+        return self._xPosition[1] == 2
+
+    def order(self):
+        """ Returns the index tag of the cursor, or "" for record number order. """
+        return self._xPosition[2]
+
+    def setfilter(self, forExpr=""):
+        """
+        Sets the filter of the cursor, like SET FILTER TO in VFP.  goto() TOP, BOTTOM, NEXT, PREV and SKIP, skip()\
+        and scan() only stop on records for which forExpr is True, and locate() only finds those.  The cursor\
+        doesn't move.  Pass "" to clear it.  Returns True, or False if the expression is not valid.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        if forExpr:
+            with self:
+                oCBT = self._vfp.cbt
+                if oCBT.preparefilter(forExpr) == 0:
+                    self.cErrorMessage = oCBT.geterrormessage()
+                    self.nErrorNumber = oCBT.geterrornumber()
+                    return False
+                oCBT.clearfilter()
+        self._cFilter = forExpr or ""
+        return True
+
+    def filter(self):
+        """ Returns the filter expression of the cursor, "" if there is none. """
+        return self._cFilter
+
+    def goto(self, gomode, gonum=1):
+        """
+        goto() for the cursor.  TOP, BOTTOM, NEXT, PREV and SKIP honor the cursor filter, RECORD goes to the record\
+        whether or not it passes, as in VFP.  Returns True if OK, otherwise False.
+        """
+        cMode = (gomode or " ")[0].upper()
+        if self._cFilter and (cMode in ("N", "P", "S")):
+            return self.skip(1 if cMode == "N" else (-1 if cMode == "P" else gonum))
+        with self:
+            oVFP = self._vfp
+            bReturn = oVFP.goto(gomode, gonum)
+            self.cErrorMessage = oVFP.cErrorMessage
+            self.nErrorNumber = oVFP.nErrorNumber
+            if bReturn and self._cFilter and (cMode in ("T", "B")):
+                bReturn = self._settle(self._cFilter, (1 if cMode == "T" else -1))
+        return bReturn
+
+    def skip(self, gonum=1):
+        """ skip() for the cursor, counting only the records which pass the cursor filter.  Returns True if OK. """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        with self:
+            oVFP = self._vfp
+            if not self._cFilter:
+                bReturn = oVFP.skip(gonum)
+            else:
+                nDirection = (-1 if gonum < 0 else 1)
+                bReturn = True
+                for jj in range(max(abs(gonum), 1)):
+                    bReturn = oVFP.skip(nDirection) and self._settle(self._cFilter, nDirection)
+                    if not bReturn:
+                        break
+            if (not bReturn) and (not self.nErrorNumber):
+                self.cErrorMessage = oVFP.cErrorMessage
+                self.nErrorNumber = oVFP.nErrorNumber
+        return bReturn
+
+    def locate(self, expr):
+        """
+        LOCATE for the cursor: goes to the first record from the top, in the cursor order, for which expr is True\
+        and passes the cursor filter.  The expression is kept in the cursor for locatecontinue(), so each cursor\
+        has its own.  The engine LOCATE of the _cbTools instance is not touched.  Returns True if found, otherwise\
+        False with the cursor at EOF.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self._cLocate = expr
+        with self:
+            bReturn = self._vfp.goto("TOP") and self._settle(self._filterexpr(expr), 1)
+        return bReturn
+
+    def locatecontinue(self):
+        """ Goes on to the next record matching the locate() expression.  Returns True if found, otherwise False. """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        if not self._cLocate:
+            self.cErrorMessage = "No Locate Active"
+            self.nErrorNumber = -79004
+            return False
+        with self:
+            bReturn = self._vfp.skip(1) and self._settle(self._filterexpr(self._cLocate), 1)
+        return bReturn
+
+    def locateclear(self):
+        """ Drops the locate() expression of the cursor. """
+        self._cLocate = ""
+        return True
+
+    def scan(self, indexTag="", forExpr="", noData=False, fieldList=None, getList=False, stripblanks=False,
+             bNoTop=False, bDescending=False, coding="XX", batchSize=100, view=False):
+        """
+        scan() for the cursor, taking the same parameters, which honors the cursor filter as well as forExpr.  The\
+        records are always read in batches of batchSize (at least 1) with the cursor in place for each batch only,\
+        so scans on other cursors of the same table can run inside the loop, and the loop can seek() and scatter()\
+        with other cursors.  As with batch scans of the table, the cursor runs ahead of the records returned, and\
+        moving this cursor in the loop doesn't change where the scan carries on from.  indexTag sets the cursor order.
+
+        Raises ValueError on an error during the scan, as scan() does.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        oVFP = self._vfp
+        oCBT = oVFP.cbt
+        if indexTag and not self.setorderto(indexTag):
+            return
+        if (fieldList is not None) and (fieldList != "") and (noData is True):
+            raise ValueError("fieldList must be None if noData is True")
+        if view and (noData or getList or fieldList):
+            raise ValueError("noData, fieldList and getList can't be used with view")
+        nDirection = (-1 if bDescending else 1)
+        if not bNoTop:
+            self.goto("BOTTOM" if bDescending else "TOP")
+        cExpr = self._filterexpr(forExpr)
+        oView = None
+        xPosition = self._xPosition
+        while True:
+            self._xPosition = xPosition
+            with self:
+                if cExpr:
+                    if oCBT.preparefilter(cExpr) == 0:
+                        self.cErrorMessage = oCBT.geterrormessage()
+                        self.nErrorNumber = oCBT.geterrornumber()
+                        return
+                else:
+                    oCBT.clearfilter()  # A filter left from an earlier scan would be applied by the engine.
+                if view and (oView is None):
+                    oView = oVFP._viewcontext(self.alias, stripblanks, coding)
+                if view and (oView is None):
+                    xBatch = None
+                elif view or noData:
+                    xBatch = oCBT.recordbatch(self.alias, max(batchSize, 1), nDirection)
+                else:
+                    xBatch = oCBT.scatterbatch(self.alias, max(batchSize, 1), fieldList or "", stripblanks, coding,
+                                               getList, True, nDirection)
+                if xBatch is None:
+                    self.cErrorMessage = (oVFP.cErrorMessage if view else oCBT.geterrormessage())
+                    self.nErrorNumber = (oVFP.nErrorNumber if view else oCBT.geterrornumber())
+                if cExpr:
+                    oCBT.clearfilter()
+            xPosition = self._xPosition
+            if xBatch is None:
+                if view and (oView is None):
+                    return  # Views aren't available, the error is set.
+                if self.nErrorNumber != 0:
+                    raise ValueError("Scan failed with err: " + str(self.cErrorMessage) + " " + self.alias)
+                return
+            if view:
+                xBuffer, xRecnos = xBatch
+                if not xRecnos:
+                    return
+                nWidth = len(xBuffer) // len(xRecnos)
+                for jj, lnRecno in enumerate(xRecnos):
+                    yield RecordView(oView, xBuffer, jj * nWidth, lnRecno)
+            elif noData:
+                if not xBatch[1]:
+                    return
+                for lnRecno in xBatch[1]:
+                    yield lnRecno
+            else:
+                if not xBatch[0]:
+                    return
+                for xRec in xBatch[0]:
+                    yield (list(xRec) if getList else xRec)
+            del xBatch
+
+
+class BulkLoad(object):
+    """
+    Context manager for loading records into a table with its index tags removed, built again all together at the
+    end.  Create it with the bulkload() method of _cbTools, not directly, see bulkload() for the details.  The tags
+    are removed when the with block is entered, or by calling begin(), and built again by close().
+
+    Attributes:
+        alias: The alias of the table.
+
+        xTags: The VFPINDEXTAG objects from ataginfo() for the tags to build again.
+
+        cErrorMessage, nErrorNumber: Error information from the most recent begin() or close().
+    """
+
+    def __init__(self, vfp, alias=""):
+        self._vfp = vfp
+        self.alias = (alias or vfp.alias()).upper()
+        self.xTags = []
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self._cOrder = ""
+        self._bActive = False
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, xType, xValue, xTrace):
+        if not self.close() and (xType is None):
+            raise ValueError("Unable to rebuild the index tags of %s: %s" % (self.alias, self.cErrorMessage))
+        return False
+
+    def begin(self):
+        """
+        Saves the tag definitions and selected order of the table and removes all its tags.  Raises ValueError\
+        if the table isn't open exclusively or the tags can't be removed, in which case any tags removed are\
+        built again.
+        """
+        oVFP = self._vfp
+        if self._bActive:
+            return
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        lcOldAlias = oVFP.alias()
+        try:
+            if not oVFP.select(self.alias):
+                raise ValueError("Unable to bulk load %s: %s" % (self.alias, oVFP.cErrorMessage))
+            if not oVFP.isexclusive():
+                self.cErrorMessage = "Table must be open exclusively"
+                self.nErrorNumber = -9970
+                raise ValueError("Unable to bulk load %s: the table must be open exclusively" % (self.alias,))
+            xTags = oVFP.ataginfo()
+            if xTags is None:
+                raise ValueError("Unable to bulk load %s: %s" % (self.alias, oVFP.cErrorMessage))
+            self.xTags = xTags
+            self._cOrder = oVFP.order()
+            if xTags and not oVFP.deletetagall():
+                self.cErrorMessage = oVFP.cErrorMessage
+                self.nErrorNumber = oVFP.nErrorNumber
+                xLeft = set(xT.cTagName for xT in (oVFP.ataginfo() or []))
+                for xT in xTags:
+                    if xT.cTagName not in xLeft:
+                        oVFP.indexon(xT.cTagName, xT.cTagExpr, xT.cTagFilt or "", xT.nDirection, xT.nUnique)
+                raise ValueError("Unable to remove the index tags of %s: %s" % (self.alias, self.cErrorMessage))
+            self._bActive = True
+        finally:
+            if lcOldAlias:
+                oVFP.select(lcOldAlias)
+
+    def close(self):
+        """
+        Flushes the table, builds all the saved tags again with createtags() and selects the saved order.  Does\
+        nothing if the tags aren't removed.  Returns True if OK, otherwise False with cErrorMessage and\
+        nErrorNumber set.
+        """
+        oVFP = self._vfp
+        if not self._bActive:
+            return True
+        self._bActive = False
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        lcOldAlias = oVFP.alias()
+        if not oVFP.select(self.alias):
+            self.cErrorMessage = oVFP.cErrorMessage
+            self.nErrorNumber = oVFP.nErrorNumber
+            return False
+        oVFP.flush()
+        bReturn = oVFP.createtags(self.xTags)
+        self.cErrorMessage = oVFP.cErrorMessage
+        self.nErrorNumber = oVFP.nErrorNumber
+        if self._cOrder and bReturn:
+            oVFP.setorderto(self._cOrder)
+        if lcOldAlias:
+            oVFP.select(lcOldAlias)
+        return bReturn
+
+
+class TableAppender(object):
+    """
+    Write-behind append buffer for one open table.  Create it with the appender() method of _cbTools, not directly,
+    see appender() for the details.
+
+    Attributes:
+        alias: The alias of the target table.
+
+        nPending: The count of records queued and not yet committed.
+
+        nCommitted: The count of records appended by all commit() calls so far.
+
+        xRejects: The records refused by the engine at commit time as tuples of (record dict, error number, error\
+        message).  Records which fail the checks in append() are never queued and so never appear here.
+
+        cErrorMessage, nErrorNumber: Error information from the most recent append() or commit().
+    """
+
+    def __init__(self, vfp, alias="", maxRows=1000, maxDelayMs=1000):
+        self._vfp = vfp
+        self.alias = (alias or vfp.alias()).upper()
+        self.nMaxRows = max(int(maxRows), 1)
+        self.nMaxDelay = max(maxDelayMs, 0) / 1000.0
+        self.nCommitted = 0
+        self.xRejects = []
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self._xPending = []
+        self._nFirstTime = 0.0
+        self._xSchema = vfp.tableschema(self.alias)
+        self.cErrorMessage = vfp.cErrorMessage
+        self.nErrorNumber = vfp.nErrorNumber
+        if self._xSchema is None:
+            raise ValueError("Unable to append to %s: %s" % (self.alias, self.cErrorMessage))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, xType, xValue, xTrace):
+        self.commit()
+        return False
+
+    def __len__(self):
+        return len(self._xPending)
+
+    @property
+    def nPending(self):
+        return len(self._xPending)
+
+    def append(self, dRecord):
+        """
+        Checks the dict() dRecord against the field types of the table and queues it for appending.  Keys are\
+        field names in any case.  Keys which are not fields are ignored as by insertdict(), but there must be at\
+        least one field.  Numeric fields take numbers or numeric strings, D and T fields take date, datetime, string\
+        or None values.  Commits the queue if it has reached maxRows or the oldest record has waited maxDelayMs.
+
+        Returns True if the record was queued (and any commit it started was OK), False if the record was refused\
+        or the commit failed, in which case cErrorMessage and nErrorNumber tell why.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        xNames = list()
+        xValues = list()
+        for cKey, xValue in dRecord.items():
+            cName = cKey.upper()
+            xField = self._xSchema.field(cName)
+            if xField is None:
+                continue
+            try:
+                xValue = xField.fnConvert(xValue)
+            except (ValueError, TypeError):
+                self.cErrorMessage = "Invalid value for field %s: %r" % (cName, xValue)
+                self.nErrorNumber = -13590
+                return False
+            xNames.append(cName)
+            xValues.append(xValue)
+        if not xNames:
+            self.cErrorMessage = "No fields in Dict matched table structure"
+            self.nErrorNumber = -9985
+            return False
+        if not self._xPending:
+            self._nFirstTime = time()
+        self._xPending.append((",".join(xNames), tuple(xValues)))
+        if len(self._xPending) >= self.nMaxRows or (time() - self._nFirstTime) >= self.nMaxDelay:
+            return self.commit() >= 0
+        return True
+
+    def commit(self):
+        """
+        Appends all the queued records to the table under one appendlock() followed by one flush().  Runs of\
+        records with the same fields go to the engine in one insertbatch() call.  Records the engine refuses are\
+        added to xRejects and the rest are still appended.  If the appendlock() can't be had after a few retries,\
+        nothing is written and the records stay queued.
+
+        Returns the count of records appended, or -1 on error.
+        """
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        if not self._xPending:
+            return 0
+        oVFP = self._vfp
+        lcOldAlias = oVFP.alias()
+        if not oVFP.select(self.alias):
+            self.cErrorMessage = oVFP.cErrorMessage
+            self.nErrorNumber = oVFP.nErrorNumber
+            return -1
+        if not oVFP.appendlock(retries=10, interval=0.05):
+            self.cErrorMessage = oVFP.cErrorMessage
+            self.nErrorNumber = oVFP.nErrorNumber
+            oVFP.select(lcOldAlias)
+            return -1
+        xPending = self._xPending
+        self._xPending = []
+        nRejected = len(self.xRejects)
+        nReturn = 0
+        nStart = 0
+        while nStart < len(xPending):
+            cFieldList = xPending[nStart][0]
+            nEnd = nStart + 1
+            while nEnd < len(xPending) and xPending[nEnd][0] == cFieldList:
+                nEnd += 1
+            xRun = xPending[nStart:nEnd]
+            nDone, xRunRejects = oVFP._insertrows([xRec[1] for xRec in xRun], self.alias, cFieldList)
+            if nDone < 0:
+                self.cErrorMessage = oVFP.cErrorMessage
+                self.nErrorNumber = oVFP.nErrorNumber
+                self._xPending = xPending[nStart:]  # Not written, so kept for the next commit().
+                nReturn = -1
+                break
+            for nRow, nError, cMessage in xRunRejects:
+                xRec = xRun[nRow]
+                self.xRejects.append((dict(zip(xRec[0].split(","), xRec[1])), nError, cMessage))
+            self.nCommitted += nDone
+            nReturn += nDone
+            nStart = nEnd
+        oVFP.flush()
+        oVFP.unlock()
+        oVFP.select(lcOldAlias)
+        if nReturn >= 0 and len(self.xRejects) > nRejected:
+            self.cErrorMessage = "%d records rejected, see xRejects" % (len(self.xRejects) - nRejected)
+            self.nErrorNumber = -9987
+        return nReturn
+
+    def close(self):
+        """ Commits anything still queued.  Returns the result of the commit(). """
+        return self.commit()
+
+
+def _appendervalue(cType, xValue):
+    """
+    Checks xValue against the field type cType for TableAppender.append() and returns the value to queue, with
+    numeric strings converted to numbers.  Raises ValueError or TypeError for a value the field can't take.
+    """
+    if xValue is None:
+        return xValue
+    if cType in ("N", "F", "B", "I"):
+        if isstr(xValue):
+            return _csvconverter(cType)(xValue)
+        if isinstance(xValue, (int, xLongType, float, decimal.Decimal)):
+            return xValue
+        raise TypeError("Not a number")
+    if cType == "Y":
+        if isstr(xValue) or isinstance(xValue, (int, xLongType, float, decimal.Decimal)):
+            return xValue
+        raise TypeError("Not a currency value")
+    if cType in ("D", "T"):
+        if isstr(xValue) or isinstance(xValue, date):  # datetime is a subclass of date.
+            return xValue
+        raise TypeError("Not a date")
+    if cType == "L":
+        if isstr(xValue) or isinstance(xValue, (bool, int, xLongType)):
+            return xValue
+        raise TypeError("Not a logical")
+    if cType in ("C", "M", "V", "Z"):
+        if isstr(xValue) or isinstance(xValue, bytes):
+            return xValue
+        raise TypeError("Not a string")
+    return xValue
+
+
+class KeyAllocator(object):
+    """
+    Hands out NEXTKEY.DBF keys from reserved blocks.  Create it with the keyallocator() method of _cbTools, not
+    directly, see keyallocator() for the details.  Thread safe within the process, all calls are serialized by
+    an internal lock, but the blocks are reserved through the _cbTools instance it was created from, so that
+    instance should not be used by another thread at the same time.
+
+    Attributes:
+        nBlockSize: The default number of keys reserved at a time.
+
+        cErrorMessage, nErrorNumber: Error information from the most recent newkey() or close().
+    """
+
+    def __init__(self, vfp, dataDir, blockSize=100, noFlush=False):
+        self._vfp = vfp
+        self._cDataDir = dataDir
+        self._bNoFlush = noFlush
+        self._xLock = threading.Lock()
+        self._xBlocks = dict()  # table name: [next key to hand out, end of the block]
+        self._xBlockSizes = dict()
+        self._bCloseNextKey = not vfp.used("NEXTKEY")
+        self.nBlockSize = max(int(blockSize), 1)
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, xType, xValue, xTrace):
+        self.close()
+        return False
+
+    def setblocksize(self, filename, blockSize):
+        """ Sets the number of keys reserved at a time for the table filename, in place of nBlockSize. """
+        with self._xLock:
+            self._xBlockSizes[filename.upper().strip()] = max(int(blockSize), 1)
+
+    def newkey(self, filename):
+        """
+        Returns the next key for the table filename, reserving a new block in NEXTKEY.DBF when the current\
+        one is used up.  Returns a negative value on error, as getNewKey() does, with cErrorMessage and\
+        nErrorNumber set.
+        """
+        cName = filename.upper().strip()
+        with self._xLock:
+            self.cErrorMessage = ""
+            self.nErrorNumber = 0
+            xBlock = self._xBlocks.get(cName)
+            if xBlock is None or xBlock[0] >= xBlock[1]:
+                nSize = self._xBlockSizes.get(cName, self.nBlockSize)
+                nFirst = self._vfp.getNewKey(self._cDataDir, cName, stayOpen=True, noFlush=self._bNoFlush,
+                                             count=nSize)
+                if nFirst < 0:
+                    self.cErrorMessage = self._vfp.cErrorMessage
+                    self.nErrorNumber = self._vfp.nErrorNumber
+                    return nFirst
+                xBlock = [nFirst, nFirst + nSize]
+                self._xBlocks[cName] = xBlock
+            nReturn = xBlock[0]
+            xBlock[0] += 1
+            return nReturn
+
+    def close(self):
+        """
+        Returns the unused keys of each block to NEXTKEY.DBF where the NEXTKEYVAL is still the end of the block,\
+        that is no one has taken a key for the table since the block was reserved, and closes NEXTKEY.DBF if the\
+        allocator opened it.  The allocator can still be used afterwards, it will just reserve new blocks.  Returns\
+        the count of keys given back.
+        """
+        nReturn = 0
+        with self._xLock:
+            self.cErrorMessage = ""
+            self.nErrorNumber = 0
+            oVFP = self._vfp
+            xBlocks = [(cName, xBlock) for cName, xBlock in self._xBlocks.items() if xBlock[0] < xBlock[1]]
+            self._xBlocks = dict()
+            if xBlocks and oVFP.used("NEXTKEY"):
+                lcOldAlias = oVFP.alias()
+                for cName, (nNext, nEnd) in xBlocks:
+                    cFilename = ("%-" + str(gnNextKeyTableNameLength) + "s") % (cName,)
+                    if not oVFP.seek(cFilename, "NEXTKEY", "TABLE_NAME"):
+                        continue
+                    oVFP.select("NEXTKEY")
+                    if not oVFP.rlock(retries=5, interval=0.1):
+                        continue  # The keys are just left unused.
+                    oVFP.refreshrecord()
+                    if oVFP.curvallong("NEXTKEYVAL") == nEnd:
+                        if oVFP.replacelong("NEXTKEYVAL", nNext):
+                            nReturn += nEnd - nNext
+                    oVFP.flush()
+                    oVFP.unlock()
+                oVFP.select(lcOldAlias)
+            if self._bCloseNextKey and oVFP.used("NEXTKEY"):
+                oVFP.closetable("NEXTKEY")
+        return nReturn
+
+
+class SessionPool(object):
+    """
+    Pool of _cbTools sessions with their tables kept open, for services which would otherwise create a session,
+    open the same few tables, do a few seeks and close it all again on every request.  Opening a table with its
+    CDX and FPT costs far more than a lookup, and the compiled engine allows only 32 data sessions in a process.
+
+    Example:
+    ::
+        oPool = SessionPool(maxSessions=8)
+        ...
+        with oPool.session([cShipPath, (cZonePath, True)]) as oCBT:
+            if oCBT.seek(cKey, "SHIPMSTR", "SHIPKEY"):
+                xRec = oCBT.scatter("SHIPMSTR")
+
+    Tables are given as a full path name, or a tuple of (path name, readOnly, exclusive, alias) where the items
+    after the path name may be left off, and are opened with the same defaults as use().  An open table is known by
+    its path name, readOnly and exclusive settings and its alias.  checkout() hands out the idle session which
+    already has the most of the requested tables open, opening the others, and selects the first one.  A table
+    opened under the alias of another open table replaces it, as with use(), so one session has only one table per
+    alias.  The same table asked for twice in one checkout() with different settings, like readOnly, must be given
+    its own alias in one of them.  Idle tables are closed, least recently used first, to keep the tables open in all
+    the pool's sessions to maxOpenTables or fewer.  Tables which are open in a session but not asked for stay open
+    and may be asked for by later users.
+
+    When a session comes back with checkin(), or at the end of the with block, it is reset: any locate() is
+    cleared, as is the preparefilter() filter, DELETED is set OFF, the default of a new session, and each of its
+    tables has its changes flushed, its locks released and its order set to record number order.  Tables opened
+    directly with use() while the session was out are not known to the pool, and should be closed before it is
+    returned.  A session whose tables can't all be opened is returned to the pool and checkout() returns None.
+
+    Sessions are created as needed up to maxSessions.  When they are all out, checkout() waits for one to come
+    back, for up to timeout seconds, or for ever if timeout is None.  A checked out session is for one thread, but
+    the pool itself may be shared by any number of threads.
+
+    Attributes:
+        cErrorMessage, nErrorNumber: Error information from the most recent checkout() which failed in this thread\
+        or any other.  See stats() for the counters.
+    """
+
+    def __init__(self, maxSessions=16, maxOpenTables=400, bIsLarge=False, cEngine="", timeout=None):
+        self.nMaxSessions = max(int(maxSessions), 1)
+        self.nMaxOpenTables = max(int(maxOpenTables), 1)
+        self.nTimeout = timeout
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+        self._bIsLarge = bIsLarge
+        self._cEngine = cEngine
+        self._xLock = threading.Condition()
+        self._xIdle = list()  # [oCBT, OrderedDict of table key: alias], the most recently returned last.
+        self._xOut = dict()  # id(oCBT): the same list, for the sessions checked out.
+        self._xLRU = collections.OrderedDict()  # (id(oCBT), table key) of the idle tables, least recently used first.
+        self._nSessions = 0
+        self._nOpenTables = 0
+        self._bClosed = False
+        self.nHits = 0
+        self.nOpens = 0
+        self.nEvictions = 0
+        self.nWaits = 0
+
+    def session(self, tables=None, timeout=-1):
+        """
+        Context manager for checkout() and checkin().  Raises ValueError if checkout() fails, with the reason.\
+        timeout is as for checkout().
+        """
+        return _PoolSession(self, tables, timeout)
+
+    def checkout(self, tables=None, timeout=-1):
+        """
+        Returns a _cbTools instance from the pool with the tables in the list tables open, see the class notes, or\
+        None on error with cErrorMessage and nErrorNumber set.  timeout is the most seconds to wait for a session\
+        when maxSessions are all out, None to wait for ever, or -1 for the pool's timeout.  Every session checked\
+        out must be given back with checkin().
+        """
+        xWanted = [self._tablekey(xTable) for xTable in (tables or [])]
+        nTimeout = (self.nTimeout if timeout == -1 else timeout)
+        nEnd = (None if nTimeout is None else time() + nTimeout)
+        xEntry = None
+        with self._xLock:
+            while xEntry is None:
+                if self._bClosed:
+                    return self._fail("The session pool has been closed", -9979)
+                if self._xIdle:
+                    nBest = -1
+                    for xIdle in reversed(self._xIdle):
+                        nHave = sum(1 for xKey, cAlias in xWanted if xKey in xIdle[1])
+                        if nHave > nBest:
+                            nBest = nHave
+                            xEntry = xIdle
+                    self._xIdle.remove(xEntry)
+                    for xKey in xEntry[1]:
+                        self._xLRU.pop((id(xEntry[0]), xKey), None)
+                elif self._nSessions < self.nMaxSessions:
+                    self._nSessions += 1
+                    xEntry = [None, collections.OrderedDict()]
+                else:
+                    nWait = (None if nEnd is None else nEnd - time())
+                    if nWait is not None and nWait <= 0:
+                        return self._fail("No session became free in %s seconds" % nTimeout, -9978)
+                    self.nWaits += 1
+                    self._xLock.wait(nWait)
+        if xEntry[0] is None:
+            try:
+                xEntry[0] = cbToolsX(self._bIsLarge, self._cEngine)
+            except Exception:
+                with self._xLock:
+                    self._nSessions -= 1
+                    self._xLock.notify()
+                raise
+        oCBT = xEntry[0]
+        with self._xLock:
+            self._xOut[id(oCBT)] = xEntry
+        for nWanted, (xKey, cAlias) in enumerate(xWanted):
+            if xKey in xEntry[1] and oCBT.used(xEntry[1][xKey]):
+                with self._xLock:
+                    self.nHits += 1
+                continue
+            if xKey in xEntry[1]:
+                with self._xLock:
+                    del xEntry[1][xKey]  # Closed by the last user.
+                    self._nOpenTables -= 1
+            self._makeroom()
+            if not oCBT.use(xKey[0], alias=cAlias, readOnly=xKey[1], exclusive=xKey[2]):
+                cError = oCBT.cErrorMessage
+                nError = oCBT.nErrorNumber
+                self.checkin(oCBT)
+                return self._fail("Unable to open %s: %s" % (xKey[0], cError), nError)
+            cNewAlias = oCBT.alias()
+            with self._xLock:
+                # use() closes a table already open under the alias it used, so any key on that alias is gone.
+                xGone = [xOld for xOld, cOld in xEntry[1].items() if cOld.upper() == cNewAlias.upper()]
+                for xOld in xGone:
+                    del xEntry[1][xOld]
+                    self._nOpenTables -= 1
+                xEntry[1][xKey] = cNewAlias
+                self._nOpenTables += 1
+                self.nOpens += 1
+            xClash = [xOld for xOld in xGone if any(xOld == xW[0] for xW in xWanted[:nWanted])]
+            if xClash:
+                self.checkin(oCBT)
+                return self._fail("%s and %s can't both be open under the alias %s, give them their own aliases" %
+                                  (xClash[0][0], xKey[0], cNewAlias), -9969)
+        if xWanted:
+            oCBT.select(xEntry[1][xWanted[0][0]])
+        return oCBT
+
+    def checkin(self, oCBT):
+        """
+        Resets the session oCBT from checkout(), see the class notes, and returns it to the pool, where it waits\
+        for the next checkout() with its tables still open.
+        """
+        with self._xLock:
+            xEntry = self._xOut.pop(id(oCBT), None)
+        if xEntry is None:
+            raise ValueError("The session was not checked out of this pool")
+        oCBT.locateclear()
+        oCBT.cbt.clearfilter()
+        oCBT.setdeleted(False)
+        for xKey, cAlias in list(xEntry[1].items()):
+            if oCBT.select(cAlias):
+                if not xKey[1]:
+                    oCBT.flush()
+                oCBT.unlock()
+                oCBT.setorderto("")
+            else:
+                with self._xLock:
+                    del xEntry[1][xKey]
+                    self._nOpenTables -= 1
+        with self._xLock:
+            if self._bClosed:
+                self._nOpenTables -= len(xEntry[1])
+                self._nSessions -= 1
+                oCBT.cb_shutdown()
+            else:
+                self._xIdle.append(xEntry)
+                for xKey in xEntry[1]:
+                    self._xLRU[(id(oCBT), xKey)] = xEntry
+                self._enforcelimit(self.nMaxOpenTables)
+            self._xLock.notify()
+
+    def stats(self):
+        """
+        Returns a dict() of the pool counters: "hits", tables asked for which were already open, "opens", tables\
+        opened, "evictions", idle tables closed to stay under maxOpenTables, "waits", checkouts which had to wait\
+        for a session, and the current "sessions", "idle" sessions and "openTables".
+        """
+        with self._xLock:
+            return {"hits": self.nHits, "opens": self.nOpens, "evictions": self.nEvictions, "waits": self.nWaits,
+                    "sessions": self._nSessions, "idle": len(self._xIdle), "openTables": self._nOpenTables}
+
+    def close(self):
+        """
+        Shuts down the idle sessions, closing their tables.  Sessions still checked out are shut down when they\
+        are checked in.  The pool can't be used afterwards.
+        """
+        with self._xLock:
+            self._bClosed = True
+            for oCBT, xTables in self._xIdle:
+                self._nOpenTables -= len(xTables)
+                self._nSessions -= 1
+                oCBT.cb_shutdown()
+            self._xIdle = list()
+            self._xLRU = collections.OrderedDict()
+            self._xLock.notify_all()
+
+    def _tablekey(self, xTable):
+        """ Returns ((path name, readOnly, exclusive, alias), alias) for a table given to checkout(). """
+        if isstr(xTable):
+            xTable = (xTable,)
+        cPath = os.path.normcase(os.path.abspath(xTable[0]))
+        bReadOnly = bool(xTable[1]) if len(xTable) > 1 else False
+        bExclusive = bool(xTable[2]) if len(xTable) > 2 else False
+        cAlias = (xTable[3] or "") if len(xTable) > 3 else ""
+        return (cPath, bReadOnly, bExclusive, cAlias.upper()), cAlias
+
+    def _makeroom(self):
+        """ Closes idle tables if need be so that one more can be opened within nMaxOpenTables. """
+        with self._xLock:
+            self._enforcelimit(self.nMaxOpenTables - 1)
+
+    def _enforcelimit(self, nLimit):
+        """ Closes the least recently used idle tables until no more than nLimit are open.  Lock must be held. """
+        while self._nOpenTables > nLimit and self._xLRU:
+            (nId, xKey), xEntry = self._xLRU.popitem(last=False)
+            xEntry[0].closetable(xEntry[1].pop(xKey))
+            self._nOpenTables -= 1
+            self.nEvictions += 1
+
+    def _fail(self, cMessage, nError):
+        self.cErrorMessage = cMessage
+        self.nErrorNumber = nError
+        return None
+
+
+class _PoolSession(object):
+    """ Context manager returned by SessionPool.session(). """
+
+    def __init__(self, oPool, tables, timeout):
+        self._oPool = oPool
+        self._xTables = tables
+        self._nTimeout = timeout
+        self._oCBT = None
+
+    def __enter__(self):
+        self._oCBT = self._oPool.checkout(self._xTables, self._nTimeout)
+        if self._oCBT is None:
+            raise ValueError(self._oPool.cErrorMessage)
+        return self._oCBT
+
+    def __exit__(self, xType, xValue, xTrace):
+        self._oPool.checkin(self._oCBT)
+        return False
+
+
+class AsyncCBTools(object):
+    """
+    asyncio facade for a cbToolsX() session, for programs built on an event loop which can't have it blocked by
+    table work.  The session is created in, and only ever used from, one worker thread owned by the facade, so
+    the session state never crosses threads.  Every public method of _cbTools is available as a coroutine taking
+    the same parameters, so oCBT.seek(...) becomes await oAsync.seek(...), and the calls run one at a time, in
+    the order made, in the worker thread while the event loop goes on with other tasks.
+
+    Example:
+    ::
+        oAsync = AsyncCBTools()
+        if await oAsync.use(cPath, alias="SHIPMSTR", readOnly=True):
+            async for xRec in oAsync.scan("SHIPKEY", forExpr="CARRIER = 'UPS'", batchSize=500):
+                ...
+        await oAsync.close()
+
+    scan() and the other methods which are generators, like scanrange(), become async generators which fetch
+    batchSize records per trip to the worker thread.  A cancelled task gets its CancelledError at once, but a call
+    already running in the worker thread can't be interrupted: it runs to the end in the background, and the calls
+    queued behind it on the one worker thread, from any task, wait until it does.  Calls which haven't started yet
+    are dropped when their task is cancelled, and an async scan stops between batches, closing its scan in the
+    worker thread.
+
+    For a series of calls which must not have other tasks' calls run between them, like select() then scatter(),
+    pass a function to run(), which calls it with the _cbTools instance in the worker thread.  Tasks sharing one
+    facade share its session, selected table and record pointers included, so a task scanning a table should
+    have it to itself.  For work in parallel use one AsyncCBTools per task, each has its own session and thread.
+
+    Attributes:
+        cErrorMessage, nErrorNumber: Error information from the most recently completed call.
+    """
+
+    def __init__(self, bIsLarge=False, cEngine=""):
+        self._xExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="AsyncCBTools")
+        self._xStart = self._xExecutor.submit(cbToolsX, bIsLarge, cEngine)
+        self.cErrorMessage = ""
+        self.nErrorNumber = 0
+
+    def __getattr__(self, cName):
+        if cName.startswith("_") or not callable(getattr(_cbTools, cName, None)):
+            raise AttributeError("AsyncCBTools has no method %s, see run() for other access to the session" % cName)
+        xMethod = functools.partial(self._callmethod, cName)
+        functools.update_wrapper(xMethod, getattr(_cbTools, cName))
+        return xMethod
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, xType, xValue, xTrace):
+        await self.close()
+        return False
+
+    def _call(self, fnWork, *args, **kwargs):
+        """ Runs in the worker thread.  Returns the result of fnWork(oCBT, ...) and the error information. """
+        oCBT = self._xStart.result()
+        xResult = fnWork(oCBT, *args, **kwargs)
+        return xResult, oCBT.cErrorMessage, oCBT.nErrorNumber
+
+    async def _submit(self, fnWork, *args, **kwargs):
+        if self._xExecutor is None:
+            raise ValueError("AsyncCBTools has been closed")
+        xResult, self.cErrorMessage, self.nErrorNumber = await asyncio.wrap_future(
+            self._xExecutor.submit(self._call, fnWork, *args, **kwargs))
+        return xResult
+
+    def _callmethod(self, cName, *args, **kwargs):
+        if inspect.isgeneratorfunction(getattr(_cbTools, cName)):
+            return self._iterate(lambda oCBT: getattr(oCBT, cName)(*args, **kwargs), kwargs.get("batchSize", 500))
+        return self._submit(lambda oCBT: getattr(oCBT, cName)(*args, **kwargs))
+
+    async def _iterate(self, fnStart, nBatch):
+        """
+        Async generator over the generator returned by fnStart(oCBT), which is created, advanced and closed only
+        in the worker thread, nBatch items per trip.
+        """
+        nBatch = max(int(nBatch or 1), 1)
+        xGen = await self._submit(fnStart)
+        try:
+            while True:
+                xBatch = await self._submit(lambda oCBT: list(itertools.islice(xGen, nBatch)))
+                for xItem in xBatch:
+                    yield xItem
+                if len(xBatch) < nBatch:
+                    break
+        finally:
+            if self._xExecutor is not None:
+                # Queued ahead of any later call, so the scan's clean up is done before anything else is run.
+                self._xExecutor.submit(xGen.close)
+
+    def scan(self, indexTag="", forExpr="", noData=False, fieldList=None, getList=False, stripblanks=False,
+             bNoTop=False, bDescending=False, coding="XX", batchSize=500):
+        """
+        Async generator version of _cbTools.scan(), taking the same parameters, for use with async for.  The records\
+        are fetched from the worker thread batchSize at a time, and batchSize is also passed to _cbTools.scan(), so\
+        the engine reads the records in batches too.  See the class notes on cancellation.
+        """
+        return self._iterate(lambda oCBT: oCBT.scan(indexTag, forExpr, noData, fieldList, getList, stripblanks,
+                                                    bNoTop, bDescending, coding, batchSize), batchSize)
+
+    async def run(self, fnWork, *args, **kwargs):
+        """
+        Calls fnWork(oCBT, *args, **kwargs) in the worker thread with the _cbTools instance of the session, and\
+        returns its result.  No other call of this facade runs until it returns.  fnWork must not keep oCBT for\
+        use outside the worker thread.
+        """
+        return await self._submit(fnWork, *args, **kwargs)
+
+    async def close(self):
+        """
+        Closes all the tables and the data session after any calls already made have finished, then ends the\
+        worker thread.  The facade can't be used afterwards.
+        """
+        if self._xExecutor is None:
+            return
+        xExecutor = self._xExecutor
+        try:
+            await self._submit(lambda oCBT: oCBT.cb_shutdown())
+        finally:
+            self._xExecutor = None
+            xExecutor.shutdown(wait=False)
+
+
 #####################################################################################
 # The following function provides a capability that can exploit the cbt object.
 #####################################################################################
@@ -5859,14 +9081,16 @@ class TableObj(object):
 #                 gcLastErrorMessage = "Moving Backup Files to Archive Failed"
 #     return bCopyOK
 
-def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCBT=None):
+def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCBT=None, nBatchSize=0):
     """ Function which copies all files for one DBF type table from one directory to another.
-     Takes 5 parameters:
+     Takes 6 parameters:
      - Name of the table, no path, extension optional unless NOT .DBF
      - Name of the source directory - fully qualified
      - Name of the target directory - fully qualified
      - By Zap, which causes table content to be removed and replaced
      - oCBT which is a handle to a CodeBaseTools object, if an external one is to be used.
+     - nBatchSize, if greater than 0, reads the source records that many at a time when copying by zap.  See
+       the batchSize parameter of scan().
 
      Returns True on success, False on failure.  If there is an existing table in the
      target directory, it and its related files are renamed to a random name prior
@@ -5880,8 +9104,10 @@ def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCB
      This method will attempt to copy by zapping the contents of the
      target table and appending in the source, if the bByZap parameter is True.  If the target table
      can be opened exclusively, the zap() function will be applied to it.  If not, then all existing records
-     will be deleted individually, and the records from the source appended into the table with a search
-     for deleted records into which the new records will be copied.
+     will be deleted with deletewhere(), and the records from the source appended into the table with a search
+     for deleted records into which the new records will be copied.  The deleted records are found in one pass
+     and filled in record number order, and the records are written 500 at a time under one table lock where
+     the lock can be had, so the copy takes time in proportion to the size of the tables.
 
      If bByZap is False, then copies using the operating system copy functions.  If the simple copy fails.
 
@@ -5996,6 +9222,7 @@ def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCB
         if bByZap:
             # print("COPYING BY ZAP", cTargTable)
             bReplaceDeleted = False
+            nLockWindow = 500  # Records written per table lock when the target is open shared.
             if oCBT is None:
                 oCBT = cbTools()
             bOldDeleted = oCBT.setdeleted(None)
@@ -6026,10 +9253,11 @@ def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCB
                         if not bCopyOK:
                             gcLastErrorMessage = "Unable to clear Target Table: " + oCBT.cErrorMessage
                     else:
-                        for nRec in oCBT.scan(noData=True):
-                            if oCBT.rlock(retries=5, interval=0.5):
-                                oCBT.delete()
-                                oCBT.unlock()
+                        # The records are deleted in one pass by the engine, under one table lock if it can be had,
+                        # otherwise with record locks released nLockWindow records at a time.
+                        if oCBT.deletewhere("THETARG", "", batchSize=nLockWindow) < 0:
+                            bCopyOK = False
+                            gcLastErrorMessage = "Unable to remove records from Target Table: " + oCBT.cErrorMessage
                 except:
                     bCopyOK = False
                     gcLastErrorMessage = "Unable to remove records from Target Table: " + oCBT.cErrorMessage
@@ -6039,26 +9267,29 @@ def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCB
                 if not bCopyOK:
                     gcLastErrorMessage = "Unable to reopen cleared table: " + oCBT.cErrorMessage
                 else:
+                    # The deleted records are collected in one pass and then re-used in record number order, the
+                    # order in which a locate("DELETED()") from the top would find them.
+                    xFreeRecs = list()
+                    if bReplaceDeleted:
+                        oCBT.setorderto("")
+                        for nRec in oCBT.scan(noData=True):
+                            if oCBT.deleted():
+                                xFreeRecs.append(nRec)
+                    nNextFree = 0
+                    xChunk = list()
                     oCBT.select("THESOURCE")
-                    for xRec in oCBT.scan():
-                        oCBT.select("THETARG")
-                        bReplaced = False
-                        if bReplaceDeleted:
-                            oCBT.goto("TOP")
-                            bFound = oCBT.locate("DELETED()")
-                            if bFound:
-                                oCBT.recall()
-                                if oCBT.rlock(retries=5, interval=0.5):
-                                    bCopyOK = oCBT.gatherdict(cAlias="THETARG", dData=xRec)
-                                    oCBT.unlock()
-                                if bCopyOK:
-                                    bReplaced = True
-                        if not bReplaceDeleted or not bReplaced:
-                            bCopyOK = oCBT.insertdict(xRec, lcAlias="THETARG")
-                        if not bCopyOK:
-                            gcLastErrorMessage = "Unable to insert record into target table: " + oCBT.cErrorMessage
-                            break
-                        oCBT.select("THESOURCE")
+                    for xRec in oCBT.scan(batchSize=nBatchSize):
+                        xChunk.append(xRec)
+                        if len(xChunk) >= nLockWindow:
+                            nNextFree, bCopyOK = _copyzapchunk(oCBT, xChunk, xFreeRecs, nNextFree)
+                            xChunk = list()
+                            if not bCopyOK:
+                                break
+                            oCBT.select("THESOURCE")
+                    if bCopyOK and xChunk:
+                        nNextFree, bCopyOK = _copyzapchunk(oCBT, xChunk, xFreeRecs, nNextFree)
+                    if not bCopyOK:
+                        gcLastErrorMessage = "Unable to insert record into target table: " + oCBT.cErrorMessage
 
             if not bCopyOK and not gcLastErrorMessage:
                 gcLastErrorMessage = "Codebase ERR: " + oCBT.cErrorMessage
@@ -6112,6 +9343,658 @@ def copydatatable(cTableName="", cSourceDir="", cTargetDir="", bByZap=False, oCB
             gcLastErrorMessage = "Copy Failed.  BACKUP NOT AVAILABLE FOR RESTORE: " + cCurrentMessage
     return bCopyOK
 
+
+_goPlanToken = re.compile(r"""\s*(?:
+    (?P<STR>"[^"]*"|'[^']*'|\[[^\]]*\])|
+    (?P<DATE>\{[^}]*\})|
+    (?P<LOG>\.(?:AND|OR|NOT|T|F|NULL)\.)|
+    (?P<NUM>\d+(?:\.\d+)?|\.\d+)|
+    (?P<NAME>[A-Z_]\w*(?:\.(?!(?:AND|OR|NOT|T|F|NULL)\.)[A-Z_]\w*)?)|
+    (?P<OP>==|<>|!=|<=|>=|\*\*|[-=<>\#+*/%^()$!,]))""", re.X | re.I)
+_goCsvNumber = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$")  # What _csvtofloat() takes.
+_gxPlanFlip = {"=": "=", "==": "==", ">=": "<=", "<=": ">=", ">": "<", "<": ">"}
+
+
+def _plantokens(cExpr):
+    """
+    Splits the VFP expression cExpr into tokens for the query planner, as tuples of (kind, text, start, end) where
+    kind is STR, DATE (a {...} literal), LOG (.AND. etc., also from AND, OR and NOT), NUM, NAME or OP and start and
+    end are the offsets of the token in cExpr.  Names and logical operators are upper cased.  Raises ValueError on
+    anything it doesn't recognize.
+    """
+    xTokens = list()
+    nPos = 0
+    cExpr = cExpr.rstrip()
+    while nPos < len(cExpr):
+        oMatch = _goPlanToken.match(cExpr, nPos)
+        if oMatch is None:
+            raise ValueError("Unrecognized expression at: " + cExpr[nPos:])
+        cKind = oMatch.lastgroup
+        cText = oMatch.group(cKind)
+        if cKind in ("NAME", "LOG"):
+            cText = cText.upper()
+            if cText in ("AND", "OR", "NOT"):
+                cKind = "LOG"
+                cText = "." + cText + "."
+        xTokens.append((cKind, cText, oMatch.start(cKind), oMatch.end(cKind)))
+        nPos = oMatch.end()
+    return xTokens
+
+
+def _plansplit(xTokens, cSep):
+    """ Splits the token list xTokens at the LOG or OP tokens cSep which are outside any parentheses. """
+    xParts = [list()]
+    nDepth = 0
+    for xTok in xTokens:
+        if xTok[0] == "OP" and xTok[1] == "(":
+            nDepth += 1
+        elif xTok[0] == "OP" and xTok[1] == ")":
+            nDepth -= 1
+        elif nDepth == 0 and xTok[0] in ("OP", "LOG") and xTok[1] == cSep:
+            xParts.append(list())
+            continue
+        xParts[-1].append(xTok)
+    return xParts
+
+
+def _planwrapped(xTokens):
+    """ True if all of the token list xTokens is inside one pair of parentheses. """
+    if len(xTokens) < 2 or xTokens[0][:2] != ("OP", "(") or xTokens[-1][:2] != ("OP", ")"):
+        return False
+    nDepth = 0
+    for jj, xTok in enumerate(xTokens):
+        if xTok[:2] == ("OP", "("):
+            nDepth += 1
+        elif xTok[:2] == ("OP", ")"):
+            nDepth -= 1
+            if nDepth == 0 and jj < len(xTokens) - 1:
+                return False
+    return True
+
+
+def _planconjuncts(xTokens):
+    """
+    Returns the top level .AND. terms of the token list xTokens as token lists, taking terms out of any wrapping
+    parentheses.  An expression with a top level .OR. is returned whole as the only term.
+    """
+    while _planwrapped(xTokens):
+        xTokens = xTokens[1:-1]
+    if len(_plansplit(xTokens, ".OR.")) > 1:
+        return [xTokens]
+    xReturn = list()
+    for xPart in _plansplit(xTokens, ".AND."):
+        if _planwrapped(xPart):
+            xReturn.extend(_planconjuncts(xPart))
+        else:
+            xReturn.append(xPart)
+    return xReturn
+
+
+def _plancanonical(xTokens, cAlias):
+    """
+    Returns the tokens xTokens as a string for comparing expressions: names upper cased, alias prefixes naming cAlias
+    dropped, strings in double quotes and one blank between tokens.
+    """
+    xParts = list()
+    for cKind, cText, nStart, nEnd in xTokens:
+        if cKind == "NAME" and cAlias and cText.startswith(cAlias + "."):
+            cText = cText[len(cAlias) + 1:]
+        elif cKind == "STR" and '"' not in cText[1:-1]:
+            cText = '"' + cText[1:-1] + '"'
+        xParts.append(cText)
+    return " ".join(xParts)
+
+
+def _planliteral(xTokens):
+    """
+    Returns (True, value) if the token list xTokens is a literal the query planner can use: a string, a number,
+    DATE(y,m,d), DATETIME(y,m,d[,h,m,s]) or STOD("yyyymmdd").  Otherwise returns (False, None).  {^yyyy-mm-dd}
+    literals aren't used, as CodeBase doesn't take them in expressions (see dtt2expression()).
+    """
+    try:
+        if len(xTokens) == 1:
+            cKind, cText = xTokens[0][:2]
+            if cKind == "STR":
+                return True, cText[1:-1]
+            if cKind == "NUM":
+                return True, (float(cText) if "." in cText else int(cText))
+        elif len(xTokens) == 2 and xTokens[0][:2] == ("OP", "-") and xTokens[1][0] == "NUM":
+            bOK, xValue = _planliteral(xTokens[1:])
+            return bOK, -xValue
+        elif len(xTokens) >= 3 and xTokens[0][0] == "NAME" and xTokens[1][:2] == ("OP", "(") and \
+                _planwrapped(xTokens[1:]):
+            cFunc = xTokens[0][1]
+            xArgs = _plansplit(xTokens[2:-1], ",")
+            if cFunc in ("DATE", "DATETIME") and all(len(xArg) == 1 and xArg[0][0] == "NUM" for xArg in xArgs):
+                xNums = [int(xArg[0][1]) for xArg in xArgs]
+                if cFunc == "DATE" and len(xNums) == 3:
+                    return True, date(*xNums)
+                if cFunc == "DATETIME" and 3 <= len(xNums) <= 6:
+                    return True, datetime(*xNums)
+            if cFunc == "STOD" and len(xArgs) == 1 and len(xArgs[0]) == 1 and xArgs[0][0][0] == "STR":
+                return True, datetime.strptime(xArgs[0][0][1][1:-1], "%Y%m%d").date()
+    except ValueError:
+        pass
+    return False, None
+
+
+def _planterm(xTokens, cAlias):
+    """
+    Reads one .AND. term of a filter for the query planner, as a comparison (=, ==, >=, <=, >, <) of an expression
+    with a literal, either way round, or as BETWEEN(expression, literal, literal).  Returns a tuple of the
+    canonical expression, the operator (with the expression on the left, "BETWEEN" for BETWEEN()), and the low
+    and high values, None for an open end.  Returns None if the term is something else.
+    """
+    if len(xTokens) > 3 and xTokens[0][:2] == ("NAME", "BETWEEN") and _planwrapped(xTokens[1:]):
+        xArgs = _plansplit(xTokens[2:-1], ",")
+        if len(xArgs) != 3 or (not xArgs[0]) or _planliteral(xArgs[0])[0]:
+            return None
+        bLow, xLow = _planliteral(xArgs[1])
+        bHigh, xHigh = _planliteral(xArgs[2])
+        if not (bLow and bHigh):
+            return None
+        return _plancanonical(xArgs[0], cAlias), "BETWEEN", xLow, xHigh
+    nAt = -1
+    nDepth = 0
+    for jj, xTok in enumerate(xTokens):
+        if xTok[0] != "OP":
+            continue
+        if xTok[1] == "(":
+            nDepth += 1
+        elif xTok[1] == ")":
+            nDepth -= 1
+        elif nDepth == 0 and xTok[1] in _gxPlanFlip:
+            if nAt >= 0:
+                return None  # More than one comparison.
+            nAt = jj
+    if nAt <= 0 or nAt == len(xTokens) - 1:
+        return None
+    cOp = xTokens[nAt][1]
+    xExpr = xTokens[:nAt]
+    bOK, xValue = _planliteral(xTokens[nAt + 1:])
+    if bOK:
+        if _planliteral(xExpr)[0]:
+            return None
+    else:
+        bOK, xValue = _planliteral(xExpr)
+        if not bOK:
+            return None
+        xExpr = xTokens[nAt + 1:]
+        cOp = _gxPlanFlip[cOp]
+    if isstr(xValue) and not xValue:
+        return None  # Everything matches an empty string with = in VFP.
+    return (_plancanonical(xExpr, cAlias), cOp, (xValue if cOp in ("=", "==", ">=", ">") else None),
+            (xValue if cOp in ("=", "==", "<=", "<") else None))
+
+
+def _planfits(cType, xValue):
+    """ True if the literal xValue can be used as a key on a tag with the field type cType ("C" for expressions). """
+    if cType in ("C", "V"):
+        return isstr(xValue)
+    if cType in ("N", "F", "I", "B", "Y"):
+        return isinstance(xValue, (int, xLongType, float)) and not isinstance(xValue, bool)
+    if cType == "D":
+        return isinstance(xValue, date) and not isinstance(xValue, datetime)
+    if cType == "T":
+        return isinstance(xValue, datetime)
+    return False
+
+
+def _dbfschematoken(cFileName):
+    """
+    Returns a token for tableschema() which changes when the structure or the tags of the .DBF table cFileName
+    change: the header and record lengths from its header, with the size and modification time of its .CDX file
+    if it has one.  None if the .DBF can't be read.
+    """
+    try:
+        with open(cFileName, "rb") as fFile:
+            cHeader = fFile.read(12)
+    except (IOError, OSError):
+        return None
+    try:
+        xStat = os.stat(FORCEEXT(cFileName, ("cdx" if os.path.splitext(cFileName)[1].islower() else "CDX")))
+        xIndex = (xStat.st_size, xStat.st_mtime)
+    except (IOError, OSError):
+        xIndex = None
+    return cHeader[8:12], xIndex
+
+
+def _dbflayout(cFileName):
+    """
+    Returns the raw record layout of the .DBF table cFileName for tableschema() as a tuple of: a dict() of the upper
+    case field names to (offset in the record, bit in _NullFlags or -1), the offset of the _NullFlags field or -1 if
+    there isn't one, and the record length.  None if the header can't be read.
+    """
+    try:
+        with open(cFileName, "rb") as fFile:
+            cHeader = fFile.read(32)
+            nHeaderLen, nRecLen = struct.unpack_from("<HH", cHeader, 8)
+            cHeader += fFile.read(max(nHeaderLen - 32, 0))
+    except (IOError, OSError, struct.error):
+        return None
+    xFields = dict()
+    nNullFlags = -1
+    nAutoOffset = 1
+    nNullBit = 0
+    nPos = 32
+    while (nPos + 32 <= len(cHeader)) and (cHeader[nPos:nPos + 1] != b"\x0D"):
+        cName = cHeader[nPos:nPos + 11].split(b"\x00")[0].strip().decode("latin-1").upper()
+        cType = cHeader[nPos + 11:nPos + 12].decode("latin-1").upper()
+        nOffset = struct.unpack_from("<I", cHeader, nPos + 12)[0]
+        nWidth, nFlags = struct.unpack_from("<BxB", cHeader, nPos + 16)
+        if nOffset == 0:
+            nOffset = nAutoOffset  # FoxPro 2.x and dBase tables don't store it.
+        nAutoOffset = nOffset + nWidth
+        if cType in ("V", "Q"):
+            nNullBit += 1  # Their length flag comes first.
+        nFieldBit = -1
+        if nFlags & 0x02:
+            nFieldBit = nNullBit
+            nNullBit += 1
+        if cType == "0":
+            nNullFlags = nOffset
+        else:
+            xFields[cName] = (nOffset, nFieldBit)
+        nPos += 32
+    return xFields, nNullFlags, nRecLen
+
+
+def _viewcodes(cCoding):
+    """ Splits the scatter() coding parameter into its text and binary codes, as the engine does. """
+    cCoding = (cCoding or "XX").upper() + "XX"
+    cCodeAsc = (cCoding[0] if cCoding[0] in "W8" else (cCoding[1] if cCoding[1] in "W8" else "X"))
+    cCodeBin = (cCoding[0] if cCoding[0] in "DUCPA" else (cCoding[1] if cCoding[1] in "DUCPA" else "X"))
+    return cCodeAsc, cCodeBin
+
+
+def _viewtext(cRaw, cCodeAsc, bStrip):
+    """ Decodes the bytes of a C or M field with the text code cCodeAsc. """
+    if cCodeAsc == "W":
+        try:
+            return cRaw.decode("mbcs", "replace")
+        except LookupError:
+            return cRaw.decode("cp1252", "replace")  # No mbcs codec outside of Windows.
+    if cCodeAsc == "8":
+        return cRaw.decode("utf-8", "replace")
+    if bStrip:
+        cRaw = cRaw.rstrip(b" ")
+    return cRaw.decode("latin-1")
+
+
+def _viewbinary(cRaw, cCodeBin, bStrip, cCustom):
+    """ Decodes the bytes of a Z, X or G field with the binary code cCodeBin. """
+    if cCodeBin == "D":
+        try:
+            return cRaw.decode("mbcs", "replace")
+        except LookupError:
+            return cRaw.decode("cp1252", "replace")
+    if cCodeBin == "U":
+        return cRaw.decode("utf-8", "replace")
+    if cCodeBin == "C":
+        return cRaw.decode(cCustom, "replace")
+    if bStrip:
+        cRaw = cRaw.rstrip(b" ")
+    return bytes(cRaw)
+
+
+def _viewdecoder(oContext, xField, cCustom):
+    """
+    Returns the function which decodes the SCHEMAFIELD xField out of the raw record of a RecordView made with
+    oContext, giving the same value scatter() would.  Memo fields are read from the table.
+    """
+    cType = xField.cType
+    nOffset = xField.nOffset
+    nEnd = nOffset + xField.nWidth
+    bStrip = oContext.bStrip
+    cCodeAsc, cCodeBin = _viewcodes(oContext.cCoding)
+
+    if cType == "C":
+        def _decode(oView):
+            nBase = oView._nBase
+            return _viewtext(oView._xBuffer[nBase + nOffset:nBase + nEnd], cCodeAsc, bStrip)
+    elif cType == "Z":
+        def _decode(oView):
+            nBase = oView._nBase
+            return _viewbinary(oView._xBuffer[nBase + nOffset:nBase + nEnd], cCodeBin, bStrip, cCustom)
+    elif cType in ("N", "F"):
+        def _decode(oView):
+            nBase = oView._nBase
+            cRaw = oView._xBuffer[nBase + nOffset:nBase + nEnd].strip()
+            try:
+                return (float(cRaw) if cRaw else 0.0)
+            except ValueError:
+                return 0.0
+    elif cType in ("I", "B"):
+        oStruct = struct.Struct("<i" if cType == "I" else "<d")
+
+        def _decode(oView):
+            return oStruct.unpack_from(oView._xBuffer, oView._nBase + nOffset)[0]
+    elif cType == "Y":
+        def _decode(oView):
+            nValue = struct.unpack_from("<q", oView._xBuffer, oView._nBase + nOffset)[0]
+            return decimal.Decimal(nValue).scaleb(-4).quantize(decimal.Decimal("0.0001"))
+    elif cType == "L":
+        def _decode(oView):
+            nBase = oView._nBase
+            return oView._xBuffer[nBase + nOffset:nBase + nOffset + 1] in (b"T", b"t", b"Y", b"y")
+    elif cType == "D":
+        def _decode(oView):
+            nBase = oView._nBase
+            cRaw = oView._xBuffer[nBase + nOffset:nBase + nEnd]
+            try:
+                if int(cRaw[0:4]) < 200:
+                    return None
+                return date(int(cRaw[0:4]), int(cRaw[4:6]), int(cRaw[6:8]))
+            except ValueError:
+                return None
+    elif cType == "T":
+        def _decode(oView):
+            nJulian, nMillis = struct.unpack_from("<ii", oView._xBuffer, oView._nBase + nOffset)
+            if nJulian <= 1721425:
+                return None  # Empty.
+            tValue = datetime.fromordinal(nJulian - 1721425)
+            if tValue.year < 200:
+                return None  # As the engine does for dates before 200 AD.
+            return tValue + timedelta(seconds=(nMillis + 500) // 1000)
+    elif cType in ("M", "X", "G"):
+        cName = xField.cName.upper()
+
+        def _decode(oView):
+            nBase = oView._nBase
+            if nEnd - nOffset == 4:
+                nBlock = struct.unpack_from("<i", oView._xBuffer, nBase + nOffset)[0]
+            else:
+                cRaw = oView._xBuffer[nBase + nOffset:nBase + nEnd].strip()
+                nBlock = (int(cRaw) if cRaw.isdigit() else 0)
+            if nBlock <= 0:
+                if cType == "M":
+                    return _viewtext(b"", cCodeAsc, bStrip)
+                return _viewbinary(b"", cCodeBin, bStrip, cCustom)
+            oVFP = oContext.vfp()
+            if oVFP is None:
+                raise ValueError("Unable to read memo %s, the _cbTools instance is gone" % cName)
+            return oVFP._viewmemo(oContext.cAlias, cName, oView.nRecno, bStrip, oContext.cCoding)
+    else:
+        def _decode(oView):
+            nBase = oView._nBase
+            return oView._xBuffer[nBase + nOffset:nBase + nEnd].decode("latin-1")
+
+    nNullFlags = oContext.xSchema.nNullFlags
+    if (xField.nNullBit < 0) or (nNullFlags < 0):
+        return _decode
+    nNullByte = nNullFlags + xField.nNullBit // 8
+    nNullMask = 1 << (xField.nNullBit % 8)
+
+    def _decodenull(oView):
+        if oView._xBuffer[oView._nBase + nNullByte] & nNullMask:
+            return None
+        return _decode(oView)
+    return _decodenull
+
+
+def _fractionalkey(xKey):
+    """ True if the seek key xKey is a float or Decimal number which isn't a whole number, NaN and infinity included. """
+    if not isinstance(xKey, (float, decimal.Decimal)):
+        return False
+    try:
+        return xKey % 1 != 0
+    except (ArithmeticError, ValueError):
+        return True
+
+
+def _dbfchangetoken(cFileName):
+    """
+    Returns a token for cachedlookup() which changes when the .DBF file cFileName is written: the last update date
+    and record count bytes from its header with the file size and modification time.  None if it can't be read.
+    """
+    try:
+        xStat = os.stat(cFileName)
+        with open(cFileName, "rb") as fFile:
+            cHeader = fFile.read(8)
+    except (IOError, OSError):
+        return None
+    return cHeader[1:8], xStat.st_size, xStat.st_mtime
+
+
+def _csvconverter(cType):
+    """
+    Returns the function _cbTools.appendfrom() uses to convert the text of a CSV or TAB column into a value for
+    a field of type cType, or None where the engine takes the text as it is.  The functions raise ValueError for
+    text which isn't a valid value.
+    """
+    if cType in ("N", "F", "B"):
+        return _csvtofloat
+    if cType == "I":
+        return _csvtoint
+    return None
+
+
+def _csvtofloat(cValue):
+    cValue = cValue.strip()
+    if not cValue:
+        return 0.0
+    if not _goCsvNumber.match(cValue):
+        raise ValueError("Not a number: %r" % cValue)  # float() alone would take "1_000", "nan" and "inf".
+    return float(cValue)
+
+
+def _csvtoint(cValue):
+    cValue = cValue.strip()
+    if not cValue:
+        return 0
+    if not _goCsvNumber.match(cValue):
+        raise ValueError("Not a number: %r" % cValue)
+    try:
+        return int(cValue)
+    except ValueError:
+        return int(float(cValue))
+
+
+def _copyzapchunk(oCBT, xChunk, xFreeRecs, nNextFree):
+    """
+    Writes one chunk of source records for copydatatable() into the THETARG table, which is open shared.  Records
+    go into the deleted records listed in xFreeRecs, starting at position nNextFree, which are recalled, and the
+    rest are appended.  Each of the two parts is written under one table or append lock where the lock can be had,
+    otherwise each record is locked on its own.  Returns a tuple of the new nNextFree and True on success, False
+    on failure with oCBT.cErrorMessage set.
+    """
+    oCBT.select("THETARG")
+    bOK = True
+    nReuse = min(len(xChunk), len(xFreeRecs) - nNextFree)
+    xAppend = xChunk[nReuse:]
+    if nReuse > 0:
+        bLocked = oCBT.flock(retries=5, interval=0.5)
+        for xRec in xChunk[:nReuse]:
+            bOK = oCBT.goto("RECORD", xFreeRecs[nNextFree])
+            nNextFree += 1
+            if not bOK:
+                break
+            if bLocked or oCBT.rlock(retries=5, interval=0.5):
+                oCBT.recall()
+                bOK = oCBT.gatherdict(cAlias="THETARG", dData=xRec)
+                if not bLocked:
+                    oCBT.unlock()
+                if not bOK:
+                    break
+            else:
+                xAppend.append(xRec)  # Someone else has that record locked.  Append this one instead.
+        if bLocked:
+            cError = oCBT.cErrorMessage
+            oCBT.flush()
+            oCBT.unlock()
+            oCBT.cErrorMessage = cError
+    if bOK and xAppend:
+        bLocked = oCBT.appendlock(retries=5, interval=0.5)
+        for xRec in xAppend:
+            bOK = oCBT.insertdict(xRec, lcAlias="THETARG")
+            if not bOK:
+                break
+        if bLocked:
+            cError = oCBT.cErrorMessage
+            oCBT.flush()
+            oCBT.unlock()
+            oCBT.cErrorMessage = cError
+    return nNextFree, bOK
+
+
+def _parallelscanworker(xTask):
+    """
+    Does the work of parallel_scan() for one range of record numbers, normally in a worker process.  Returns a
+    tuple of an error message, "" if all went well, and the list of the results of the map function for each batch.
+    """
+    (cTableName, nFirst, nLast, xFunc, forExpr, fieldList, bDeleted, stripblanks, coding, batchSize, cEngine) = xTask
+    xResults = list()
+    xPending = list()
+    cAlias = "PARALLELSCAN"
+    oCBT = cbToolsX(cEngine=cEngine)
+    try:
+        if not oCBT.use(cTableName, alias=cAlias, readOnly=True):
+            return ("Unable to open " + cTableName + ": " + oCBT.cErrorMessage, xResults)
+        oCBT.setdeleted(bDeleted)
+        oCBT.setorderto("")
+        oEngine = oCBT.cbt
+        if forExpr:
+            if oEngine.preparefilter(forExpr) == 0:
+                return ("Illegal filter expression: " + oEngine.geterrormessage(), xResults)
+        else:
+            oEngine.clearfilter()
+        if not oCBT.goto("RECORD", nFirst):
+            return ("Unable to go to record " + str(nFirst) + ": " + oCBT.cErrorMessage, xResults)
+        bUseBatch = hasattr(oEngine, "scatterbatch")
+        bDone = False
+        while not bDone and not oEngine.eof():
+            if bUseBatch:
+                # scatterbatch() skips deleted records when DELETED is ON, and applies the filter prepared above.
+                xRead = oEngine.scatterbatch(cAlias, batchSize, fieldList, stripblanks, coding, False, True, 1)
+                if xRead is None or not xRead[0]:
+                    if oEngine.geterrornumber() != 0:
+                        return ("Scan failed with err: " + oEngine.geterrormessage(), xResults)
+                    break
+                for xRec, nRecno in zip(xRead[0], xRead[1]):
+                    if nRecno > nLast:
+                        bDone = True
+                        break
+                    xPending.append(xRec)
+            else:
+                if oEngine.recno() > nLast:
+                    break
+                if not (bDeleted and oEngine.deleted()) and ((not forExpr) or oEngine.testfilter()):
+                    xRec = oEngine.scatter(cAlias, True, stripblanks, fieldList, False, coding)
+                    if xRec is None:
+                        return ("Scan failed with err: " + oEngine.geterrormessage(), xResults)
+                    xPending.append(xRec)
+                oEngine.skip(1)
+            while len(xPending) >= batchSize:
+                xResults.append(xFunc(xPending[:batchSize]))
+                del xPending[:batchSize]
+        if xPending:
+            xResults.append(xFunc(xPending))
+    finally:
+        oCBT.cb_shutdown()
+    return ("", xResults)
+
+
+def parallel_scan(table, func, forExpr="", fieldList="", workers=0, reduceFunc=None, initial=None, batchSize=1000,
+                  stripblanks=False, coding="XX", oCBT=None, cEngine=""):
+    """
+    Map/reduce over the records of a table using a pool of worker processes, for aggregates like grouped totals
+    which calcfor() and countfor() can't produce, over tables too large for one Python process to scan quickly.
+
+    The table is split into ranges of record numbers.  Each worker process opens the table read-only in its own
+    cbToolsX() session, reads the records of its range which match forExpr, and passes them to func in batches
+    of batchSize records.  The results of all the func calls are then merged, in record number order, with
+    reduceFunc.
+
+    Parameters:
+    - table: Full path name of the .DBF table.
+    - func: The map function.  Called with a list of up to batchSize records, each a dict() as returned by\
+      scan(), and returns a partial result.  It is sent to the worker processes, so it must be a function\
+      defined at the top level of a module, not a lambda or a nested function.
+    - forExpr: Optional logical expression as for scan().  Only records for which it is True are passed to func.
+    - fieldList: Optional comma delimited list of the fields to include in the records, as for scan().
+    - workers: Number of worker processes.  Pass 0 for the number of CPUs.  With 1, all the work is done in the\
+      calling process, which is handy for debugging func.
+    - reduceFunc: Function of two partial results, returning the merged result, as for functools.reduce().  Must\
+      be picklable like func.  If None, the list of all the partial results is returned instead.
+    - initial: Optional starting value for the reduce step.
+    - batchSize: Number of records passed to each call of func.
+    - stripblanks, coding: As for scan().
+    - oCBT: Optional _cbTools() instance.  Its setdeleted() status is applied in the workers, so the records seen\
+      are the ones oCBT.scan() would return.  It also selects the engine.  If None, DELETED is OFF, the default of\
+      a new instance.
+    - cEngine: The engine to use when oCBT is None.  See cbToolsX().
+
+    Records are processed in record number order, whatever index order the caller has set, and the results of\
+    func are merged in that order, so the result is the same on every run.  It is also independent of the\
+    number of workers as long as reduceFunc is associative.
+
+    Example, counting the open accounts by state with a collections.Counter per batch:
+        def countbystate(xRecords):
+            return collections.Counter(xRec["STATE"] for xRec in xRecords)
+
+        xCounts = parallel_scan("c:/data/accounts.dbf", countbystate, forExpr="BALANCE > 0", fieldList="STATE",
+                                reduceFunc=operator.add, initial=collections.Counter())
+
+    On Windows, worker processes import the calling program's main module, so the call must be protected by an
+    if __name__ == "__main__": block there.
+
+    Returns the reduced result, or the list of partial results if reduceFunc is None.  Returns None on error, in
+    which case call getlasterrormessage() for the description.
+    """
+    global gcLastErrorMessage
+    gcLastErrorMessage = ""
+    if batchSize < 1:
+        batchSize = 1000
+    if fieldList is None:
+        fieldList = ""
+    if oCBT is not None:
+        bDeleted = bool(oCBT.setdeleted(None))
+        cEngine = oCBT.cEngine
+    else:
+        bDeleted = False
+    oCount = cbToolsX(cEngine=cEngine)
+    try:
+        if not oCount.use(table, alias="PARALLELSCAN", readOnly=True):
+            gcLastErrorMessage = "Unable to open " + table + ": " + oCount.cErrorMessage
+            return None
+        nRecords = oCount.reccount()
+    finally:
+        oCount.cb_shutdown()
+    if workers < 1:
+        workers = multiprocessing.cpu_count()
+
+    # A few ranges per worker, so one worker with a slow range doesn't hold up the rest.
+    nRanges = max(1, min(nRecords, workers * 4))
+    xTasks = list()
+    for jj in range(nRanges):
+        nFirst = (nRecords * jj) // nRanges + 1
+        nLast = (nRecords * (jj + 1)) // nRanges
+        if nLast >= nFirst:
+            xTasks.append((table, nFirst, nLast, func, forExpr, fieldList, bDeleted, stripblanks, coding, batchSize,
+                           cEngine))
+    if workers == 1 or len(xTasks) <= 1:
+        xDone = [_parallelscanworker(xTask) for xTask in xTasks]
+    else:
+        oPool = multiprocessing.Pool(min(workers, len(xTasks)))
+        try:
+            xDone = oPool.map(_parallelscanworker, xTasks, 1)
+        finally:
+            oPool.close()
+            oPool.join()
+
+    xPartials = list()
+    for cError, xResults in xDone:
+        if cError:
+            gcLastErrorMessage = cError
+            return None
+        xPartials.extend(xResults)
+    if reduceFunc is None:
+        return xPartials
+    if initial is None:
+        return (functools.reduce(reduceFunc, xPartials) if xPartials else None)
+    return functools.reduce(reduceFunc, xPartials, initial)
+
+
 def getlasterrormessage():
     return gcLastErrorMessage
 
@@ -6588,7 +10471,7 @@ def TestCopyTables() -> bool:
     oCfg.shutdown()
     return bTest
 
-__all__ = ["_cbTools", "cbTools", "cbToolsX", "TableObj", "copydatatable", "VFPFIELD"]
+__all__ = ["_cbTools", "cbTools", "cbToolsX", "TableObj", "TableCursor", "BulkLoad", "TableAppender", "KeyAllocator", "SessionPool", "AsyncCBTools", "TableSchema", "RecordView", "copydatatable", "VFPFIELD", "VFPEXPR"]
 
 if __name__ == "__main__":
     print("***** Testing CodeBaseTools.py components")
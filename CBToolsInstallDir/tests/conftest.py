@@ -0,0 +1,152 @@
+"""
+Fixtures for the CodeBaseTools tests.  The tests run on the pure Python reader engine (CodeBasePYReader), so they
+need no compiled engine, and the tables are written here as VFP free tables with a .CDX index.
+"""
+import os
+import struct
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "codebasetools"))
+
+import CodeBaseTools  # noqa: E402
+
+
+def _numkey(nValue):
+    """ The CDX key of a N, B, D or T value: the IEEE double with the sign bit flipped, or all bits for < 0. """
+    cRaw = bytearray(struct.pack(">d", float(nValue)))
+    if nValue >= 0:
+        cRaw[0] |= 0x80
+    else:
+        cRaw = bytearray(255 - b for b in cRaw)
+    return bytes(cRaw)
+
+
+def _intkey(nValue):
+    """ The CDX key of an I value. """
+    return struct.pack(">I", (int(nValue) + 0x80000000) & 0xFFFFFFFF)
+
+
+def _leafnode(xKeys, nKeyLen, cTrail):
+    """ One CDX leaf node (the root of its tag) holding the sorted (key, recno) tuples in xKeys. """
+    xNode = bytearray(512)
+    struct.pack_into("<HHiiHIBBBBBB", xNode, 0, 3, len(xKeys), -1, -1, 0, 0xFFFF, 0xF, 0xF, 16, 4, 4, 3)
+    nPos = 512
+    nInfo = 24
+    cPrev = b""
+    for cKey, nRecno in xKeys:
+        nDup = 0
+        while nDup < min(len(cPrev), len(cKey), 15) and cPrev[nDup] == cKey[nDup]:
+            nDup += 1
+        nTrail = min(nKeyLen - len(cKey.rstrip(cTrail)), 15)
+        nDup = min(nDup, nKeyLen - nTrail)
+        cNew = cKey[nDup:nKeyLen - nTrail]
+        nPos -= len(cNew)
+        xNode[nPos:nPos + len(cNew)] = cNew
+        nBits = nRecno | (nDup << 16) | (nTrail << 20)
+        xNode[nInfo:nInfo + 3] = nBits.to_bytes(3, "little")
+        nInfo += 3
+        cPrev = cKey
+    return xNode
+
+
+def _writecdx(cPath, xTags):
+    """ Writes a .CDX file with the tags in xTags, tuples of (name, expression, key length, keys, trail byte). """
+    xData = bytearray(1536)
+    xDirectory = []
+    nNext = 1536
+    for cName, cExpr, nKeyLen, xKeys, cTrail in xTags:
+        nHeader = nNext
+        nLeaf = nHeader + 1024
+        nNext = nLeaf + 512
+        xDirectory.append((cName.encode().ljust(10), nHeader))
+        xHeader = bytearray(1024)
+        struct.pack_into("<IiIHBB", xHeader, 0, nLeaf, -1, 0, nKeyLen, 0x60, 1)
+        cExprBytes = cExpr.encode() + b"\0"
+        struct.pack_into("<H", xHeader, 510, len(cExprBytes))
+        xHeader[512:512 + len(cExprBytes)] = cExprBytes
+        xData += b"\0" * (nNext - len(xData))
+        xData[nHeader:nHeader + 1024] = xHeader
+        xData[nLeaf:nLeaf + 512] = _leafnode(sorted(xKeys), nKeyLen, cTrail)
+    struct.pack_into("<IiIHBB", xData, 0, 1024, -1, 0, 10, 0xE0, 1)
+    xData[1024:1536] = _leafnode(sorted(xDirectory), 10, b" ")
+    with open(cPath, "wb") as fOut:
+        fOut.write(xData)
+
+
+def writetable(cPath, xFields, xRows, xTags=None):
+    """
+    Writes the VFP free table cPath.  xFields is a list of (name, type, width, decimals) for C, N, I and D fields,
+    xRows a list of dict()s, and xTags a list of field names to index, each as a tag of the same name.
+    """
+    nHeaderLen = 32 + 32 * len(xFields) + 1 + 263
+    nRecLen = 1 + sum(xF[2] for xF in xFields)
+    xOut = bytearray(struct.pack("<BBBBIHH", 0x30, 126, 10, 18, len(xRows), nHeaderLen, nRecLen))
+    xOut += b"\0" * 16 + bytes([0x01 if xTags else 0, 3]) + b"\0\0"
+    nOffset = 1
+    for cName, cType, nWidth, nDec in xFields:
+        xOut += cName.encode().ljust(11, b"\0") + cType.encode() + struct.pack("<I", nOffset)
+        xOut += bytes([nWidth, nDec, 0]) + b"\0" * 13
+        nOffset += nWidth
+    xOut += b"\r" + b"\0" * 263
+    for xRow in xRows:
+        xOut += b" "
+        for cName, cType, nWidth, nDec in xFields:
+            xValue = xRow[cName]
+            if cType == "C":
+                xOut += xValue.encode("latin-1").ljust(nWidth)
+            elif cType == "N":
+                xOut += ("%*.*f" % (nWidth, nDec, xValue)).encode()
+            elif cType == "I":
+                xOut += struct.pack("<i", xValue)
+            elif cType == "D":
+                xOut += xValue.strftime("%Y%m%d").encode()
+    xOut += b"\x1a"
+    with open(cPath, "wb") as fOut:
+        fOut.write(xOut)
+    if xTags:
+        xTypes = dict((xF[0], xF) for xF in xFields)
+        xCdx = []
+        for cName in xTags:
+            _, cType, nWidth, _ = xTypes[cName]
+            if cType == "C":
+                xCdx.append((cName, cName, nWidth,
+                             [(xRow[cName].encode("latin-1").ljust(nWidth), jj + 1) for jj, xRow in enumerate(xRows)],
+                             b" "))
+            elif cType == "I":
+                xCdx.append((cName, cName, 4, [(_intkey(xRow[cName]), jj + 1) for jj, xRow in enumerate(xRows)],
+                             b"\0"))
+            elif cType == "D":
+                xCdx.append((cName, cName, 8,
+                             [(_numkey(xRow[cName].toordinal() + 1721425), jj + 1) for jj, xRow in enumerate(xRows)],
+                             b"\0"))
+            else:
+                xCdx.append((cName, cName, 8, [(_numkey(xRow[cName]), jj + 1) for jj, xRow in enumerate(xRows)],
+                             b"\0"))
+        _writecdx(os.path.splitext(cPath)[0] + ".cdx", xCdx)
+
+
+SHIPFIELDS = [("SHIPNO", "I", 4, 0), ("CUSTNO", "C", 10, 0), ("QTY", "I", 4, 0), ("AMOUNT", "N", 10, 2),
+              ("SHIPDATE", "D", 8, 0)]
+SHIPROWS = [dict(SHIPNO=jj + 1, CUSTNO=cCust, QTY=nQty, AMOUNT=nQty * 12.5, SHIPDATE=date(2026, 1, jj + 1))
+            for jj, (cCust, nQty) in enumerate([("C001", 3), ("C002", 1), ("C001", 5), ("C003", 2), ("C002", 4),
+                                                ("C004", 3)])]
+
+
+@pytest.fixture
+def shippath(tmp_path):
+    """ The path of a SHIP table with tags on CUSTNO, QTY and SHIPDATE. """
+    cPath = str(tmp_path / "ship.dbf")
+    writetable(cPath, SHIPFIELDS, SHIPROWS, ["CUSTNO", "QTY", "SHIPDATE"])
+    return cPath
+
+
+@pytest.fixture
+def vfp(shippath):
+    """ A cbToolsX instance on the reader engine with the SHIP table open read only. """
+    oVFP = CodeBaseTools.cbToolsX(cEngine="reader")
+    assert oVFP.use(shippath, alias="SHIP", readOnly=True), oVFP.cErrorMessage
+    yield oVFP
+    oVFP.closedatabases()
@@ -0,0 +1,109 @@
+"""
+bulkload() and createtags().  The reader engine can't write, so the tag removal and rebuild are recorded in
+place of being done.
+"""
+import pytest
+
+
+@pytest.fixture
+def tagcalls(vfp, monkeypatch):
+    """ Makes the SHIP table pass as exclusive and records deletetagall() and createtags() calls. """
+    xCalls = []
+    monkeypatch.setattr(vfp, "isexclusive", lambda: True)
+    monkeypatch.setattr(vfp, "deletetagall", lambda: xCalls.append(("deletetagall", vfp.alias())) or True)
+    monkeypatch.setattr(vfp, "createtags", lambda xTags: xCalls.append(("createtags", vfp.alias(), xTags)) or True)
+    return xCalls
+
+
+def test_refuses_shared_table(vfp):
+    vfp.select("SHIP")
+    vfp.setorderto("QTY")
+    oLoad = vfp.bulkload("SHIP")
+    with pytest.raises(ValueError):
+        with oLoad:
+            pass
+    assert oLoad.nErrorNumber == -9970
+    assert [xT.cTagName for xT in vfp.ataginfo()] == ["CUSTNO", "QTY", "SHIPDATE"]
+    assert vfp.order() == "QTY"
+
+
+def test_removes_and_rebuilds_tags(vfp, tagcalls, shippath):
+    assert vfp.use(shippath, alias="OTHER", readOnly=True)
+    vfp.select("SHIP")
+    vfp.setorderto("CUSTNO")
+    vfp.select("OTHER")
+    with vfp.bulkload("SHIP") as oLoad:
+        assert tagcalls == [("deletetagall", "SHIP")]
+        assert vfp.alias() == "OTHER"
+    assert tagcalls[1][:2] == ("createtags", "SHIP")
+    assert [xT.cTagName for xT in tagcalls[1][2]] == ["CUSTNO", "QTY", "SHIPDATE"]
+    assert tagcalls[1][2] is oLoad.xTags
+    assert vfp.alias() == "OTHER"
+    vfp.select("SHIP")
+    assert vfp.order() == "CUSTNO"
+
+
+def test_rebuilds_after_exception(vfp, tagcalls):
+    with pytest.raises(KeyError):
+        with vfp.bulkload("SHIP"):
+            raise KeyError("load failed")
+    assert [xCall[0] for xCall in tagcalls] == ["deletetagall", "createtags"]
+
+
+def test_failed_rebuild_raises(vfp, tagcalls, monkeypatch):
+    def _createtags(xTags):
+        vfp.cErrorMessage = "Duplicate key"
+        vfp.nErrorNumber = -9999
+        return False
+    monkeypatch.setattr(vfp, "createtags", _createtags)
+    oLoad = vfp.bulkload("SHIP")
+    with pytest.raises(ValueError, match="Duplicate key"):
+        with oLoad:
+            pass
+    assert oLoad.nErrorNumber == -9999
+    assert len(oLoad.xTags) == 3
+
+
+class _Engine(object):
+    """ The engine of vfp, with createtags() answering with the error nError. """
+    def __init__(self, oReal, nError):
+        self._oReal = oReal
+        self._nError = nError
+        self.xCalls = []
+
+    def __getattr__(self, cName):
+        return getattr(self._oReal, cName)
+
+    def createtags(self, xTags):
+        self.xCalls.append(xTags)
+        return False
+
+    def geterrornumber(self):
+        return self._nError if self.xCalls else self._oReal.geterrornumber()
+
+    def geterrormessage(self):
+        return "createtags failed" if self.xCalls else self._oReal.geterrormessage()
+
+
+def test_createtags_passes_the_tags(vfp):
+    vfp.select("SHIP")
+    xTags = vfp.ataginfo()
+    oEngine = _Engine(vfp.cbt, -9970)
+    vfp.cbt = oEngine
+    assert not vfp.createtags(xTags)
+    assert oEngine.xCalls == [[("CUSTNO", "CUSTNO", "", 0, 0), ("QTY", "QTY", "", 0, 0),
+                               ("SHIPDATE", "SHIPDATE", "", 0, 0)]]
+    assert vfp.nErrorNumber == -9970
+    assert vfp.tally == 0
+
+
+def test_createtags_falls_back_to_indexon(vfp, monkeypatch):
+    vfp.select("SHIP")
+    xTags = vfp.ataginfo()
+    xIndexed = []
+    monkeypatch.setattr(vfp, "indexon", lambda cTag, *args: xIndexed.append(cTag) or cTag != "QTY")
+    vfp.cbt = _Engine(vfp.cbt, -9991)
+    assert not vfp.createtags(xTags)
+    assert xIndexed == ["CUSTNO", "QTY", "SHIPDATE"]
+    assert vfp.tally == 2
+    assert vfp.createtags([])
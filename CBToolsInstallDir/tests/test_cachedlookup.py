@@ -0,0 +1,34 @@
+"""
+cachedlookup() results belong to the table open under the alias, not to the alias.
+"""
+from conftest import SHIPFIELDS, SHIPROWS, writetable
+
+
+def test_reused_alias_drops_the_cache(vfp, tmp_path):
+    assert vfp.cachedlookup("SHIP", "CUSTNO", "C002")["SHIPNO"] == 2
+    cOther = str(tmp_path / "other.dbf")
+    writetable(cOther, SHIPFIELDS, [dict(xRow, SHIPNO=xRow["SHIPNO"] + 100) for xRow in SHIPROWS], ["CUSTNO"])
+    assert vfp.use(cOther, alias="SHIP", readOnly=True), vfp.cErrorMessage
+    assert vfp.cachedlookup("SHIP", "CUSTNO", "C002")["SHIPNO"] == 102
+
+
+def test_closetable_drops_the_cache(vfp):
+    vfp.cachedlookup("SHIP", "CUSTNO", "C002")
+    assert vfp.lookupcachestats()["entries"] == {"SHIP": 1}
+    vfp.closetable("SHIP")
+    assert vfp.lookupcachestats()["entries"] == {}
+
+
+def test_empty_alias_and_tag_are_the_selected_table_and_order(vfp, tmp_path):
+    cOther = str(tmp_path / "other.dbf")
+    writetable(cOther, SHIPFIELDS, [dict(xRow, SHIPNO=xRow["SHIPNO"] + 100) for xRow in SHIPROWS], ["CUSTNO", "QTY"])
+    assert vfp.use(cOther, alias="OTHER", readOnly=True), vfp.cErrorMessage
+    vfp.select("SHIP")
+    vfp.setorderto("CUSTNO")
+    assert vfp.cachedlookup("", "", "C002")["SHIPNO"] == 2
+    vfp.select("OTHER")
+    vfp.setorderto("CUSTNO")
+    assert vfp.cachedlookup("", "", "C002")["SHIPNO"] == 102
+    vfp.setorderto("QTY")
+    assert vfp.cachedlookup("", "", 4)["SHIPNO"] == 105
+    assert vfp.lookupcachestats()["entries"] == {"SHIP": 1, "OTHER": 2}
@@ -0,0 +1,52 @@
+"""
+calcgroup() statistics per group value, in one pass of the table.
+"""
+import pytest
+
+
+def test_character_groups(vfp):
+    xResult = vfp.calcgroup("SHIP", "CUSTNO", [("SUM", "QTY"), ("AVG", "AMOUNT"), ("MAX", "QTY"), ("MIN", "QTY"),
+                                               ("COUNT", "")])
+    assert xResult == [("C001      ", 8.0, 50.0, 5.0, 3.0, 2),
+                       ("C002      ", 5.0, 31.25, 4.0, 1.0, 2),
+                       ("C003      ", 2.0, 25.0, 2.0, 2.0, 1),
+                       ("C004      ", 3.0, 37.5, 3.0, 3.0, 1)]
+    assert vfp.tally == 4
+
+
+def test_numeric_groups_in_value_order(vfp):
+    xResult = vfp.calcgroup("SHIP", "QTY", [("COUNT", ""), ("SUM", "AMOUNT")])
+    assert xResult == [(1.0, 1, 12.5), (2.0, 1, 25.0), (3.0, 2, 75.0), (4.0, 1, 50.0), (5.0, 1, 62.5)]
+
+
+def test_for_expression_and_one_group(vfp):
+    assert vfp.calcgroup("SHIP", "", [("SUM", "QTY"), ("COUNT", "")], "SHIPDATE >= DATE(2026,1,3)") == \
+        [(None, 14.0, 4)]
+    assert vfp.calcgroup("SHIP", "CUSTNO", [("COUNT", "")], "QTY > 100") == []
+    assert vfp.tally == 0
+
+
+def test_sorted_follows_the_order(vfp):
+    vfp.select("SHIP")
+    vfp.setorderto("CUSTNO")
+    vfp.goto("RECORD", 4)
+    xResult = vfp.calcgroup("", "CUSTNO", [("SUM", "QTY")], bSorted=True)
+    assert xResult == [("C001      ", 8.0), ("C002      ", 5.0), ("C003      ", 2.0), ("C004      ", 3.0)]
+    assert vfp.recno() == 4
+
+
+def test_alias_leaves_the_selected_table(vfp, shippath):
+    assert vfp.use(shippath, alias="SHIP2", readOnly=True), vfp.cErrorMessage
+    assert vfp.alias() == "SHIP2"
+    assert vfp.calcgroup("SHIP", "", [("COUNT", "")]) == [(None, 6)]
+    assert vfp.alias() == "SHIP2"
+
+
+@pytest.mark.parametrize("cGroupExpr, xStats, nError", [
+    ("CUSTNO", [("MEDIAN", "QTY")], -34934),
+    ("SHIPDATE", [("COUNT", "")], -59385),
+])
+def test_errors(vfp, cGroupExpr, xStats, nError):
+    assert vfp.calcgroup("SHIP", cGroupExpr, xStats) is None
+    assert vfp.nErrorNumber == nError
+    assert vfp.cErrorMessage
@@ -0,0 +1,28 @@
+"""
+calcmulti() statistics over the whole table in one pass.
+"""
+
+
+def test_single_expression(vfp):
+    assert vfp.calcmulti("QTY", ["sum", "AVG", "MIN", "MAX", "COUNT"], "CUSTNO = 'C001'", "SHIP") == \
+        {"SUM": 8.0, "AVG": 4.0, "MIN": 3.0, "MAX": 5.0, "COUNT": 2}
+
+
+def test_expression_list(vfp):
+    vfp.select("SHIP")
+    assert vfp.calcmulti(["QTY", "AMOUNT"], ["SUM", "MAX"]) == \
+        {("SUM", "QTY"): 18.0, ("MAX", "QTY"): 5.0, ("SUM", "AMOUNT"): 225.0, ("MAX", "AMOUNT"): 62.5}
+
+
+def test_pairs(vfp):
+    assert vfp.calcmulti([("Sum", "QTY * 2"), ("COUNT", "")], alias="SHIP",
+                         forexpr="SHIPDATE <= DATE(2026,1,2)") == {("SUM", "QTY * 2"): 8.0, ("COUNT", ""): 2}
+
+
+def test_no_matching_records(vfp):
+    assert vfp.calcmulti("QTY", ["SUM", "COUNT"], "QTY > 100", "SHIP") == {"SUM": None, "COUNT": 0}
+
+
+def test_bad_statistic(vfp):
+    assert vfp.calcmulti("QTY", ["MEDIAN"], alias="SHIP") is None
+    assert vfp.nErrorNumber == -34934
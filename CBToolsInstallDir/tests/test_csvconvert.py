@@ -0,0 +1,21 @@
+"""
+The numeric conversions of the CSV and TAB/TXT bulk loader of appendfrom() take plain numbers only.
+"""
+import pytest
+
+import CodeBaseTools
+
+
+@pytest.mark.parametrize("cType, cText, xValue", [
+    ("N", "1234.50", 1234.5), ("N", " -7 ", -7.0), ("B", "1.5E3", 1500.0), ("F", ".5", 0.5), ("N", "", 0.0),
+    ("I", "42", 42), ("I", "3.7", 3), ("I", "-2", -2), ("I", "", 0),
+])
+def test_plain_numbers_convert(cType, cText, xValue):
+    assert CodeBaseTools._csvconverter(cType)(cText) == xValue
+
+
+@pytest.mark.parametrize("cType", ["N", "F", "B", "I"])
+@pytest.mark.parametrize("cText", ["1,234.50", "$12.00", "1_000", "nan", "inf", "12abc"])
+def test_formatted_numbers_are_rejected(cType, cText):
+    with pytest.raises(ValueError):
+        CodeBaseTools._csvconverter(cType)(cText)
@@ -0,0 +1,54 @@
+"""
+The query planner of scan() must select the same records as a full scan of the table.
+"""
+import pytest
+
+
+def _scanrecnos(vfp, cFilter, bPlanner):
+    vfp.bQueryPlanner = bPlanner
+    vfp.select("SHIP")
+    return sorted(vfp.scan(forExpr=cFilter, noData=True))
+
+
+@pytest.mark.parametrize("cFilter", [
+    "QTY = 3.5",
+    "QTY == 2.5",
+    "QTY >= 2.5 .AND. QTY <= 3.5",
+    "QTY >= 2.5",
+    "QTY <= 3.5",
+    "QTY > 2.5",
+    "QTY < 3.5",
+    "BETWEEN(QTY, 1.5, 4.5)",
+    "QTY >= -0.5 .AND. QTY <= 2.9",
+    "QTY = 3",
+    "QTY >= 2 .AND. QTY <= 4",
+])
+def test_fractional_bounds_on_integer_tag(vfp, cFilter):
+    xPlanned = _scanrecnos(vfp, cFilter, True)
+    xFull = _scanrecnos(vfp, cFilter, False)
+    assert xPlanned == xFull, cFilter
+
+
+def test_fractional_bounds_use_the_tag(vfp):
+    vfp.select("SHIP")
+    xPlan = vfp._queryplan("QTY >= 2.5 .AND. QTY <= 3.5")
+    assert xPlan["tag"] == "QTY"
+    assert (xPlan["low"], xPlan["high"]) == ("3", "3")
+
+
+@pytest.mark.parametrize("cFilter", [
+    "SHIPDATE >= DATE(2026,1,3)",
+    "SHIPDATE = STOD('20260104')",
+    "BETWEEN(SHIPDATE, STOD('20260102'), DATE(2026,1,5))",
+])
+def test_date_literals(vfp, cFilter):
+    vfp.select("SHIP")
+    assert vfp._queryplan(cFilter)["tag"] == "SHIPDATE"
+    xPlanned = _scanrecnos(vfp, cFilter, True)
+    assert xPlanned == _scanrecnos(vfp, cFilter, False)
+    assert xPlanned
+
+
+def test_braced_date_literal_is_not_planned(vfp):
+    vfp.select("SHIP")
+    assert vfp._queryplan("SHIPDATE >= {^2026-01-03}") is None
@@ -0,0 +1,51 @@
+"""
+scatterview() and scan(view=True) give RecordView objects with the same values as scatter() and scan().
+"""
+import pytest
+
+
+def test_scatterview_matches_scatter(vfp):
+    vfp.select("SHIP")
+    vfp.goto("RECORD", 3)
+    xView = vfp.scatterview()
+    assert xView.nRecno == 3
+    assert xView.todict() == vfp.scatter("SHIP")
+    assert dict(xView) == xView.todict()
+    assert vfp.scatterview("ship", stripblanks=True).todict() == vfp.scatter("SHIP", stripblanks=True)
+
+
+def test_field_access(vfp):
+    vfp.goto("RECORD", 2)
+    xView = vfp.scatterview("SHIP", stripblanks=True)
+    assert xView["CUSTNO"] == "C002"
+    assert xView.custno == "C002"
+    assert xView.get("qty") == 1
+    assert xView.get("NOTAFIELD", "x") == "x"
+    assert "Amount" in xView
+    assert "NOTAFIELD" not in xView
+    assert list(xView) == ["SHIPNO", "CUSTNO", "QTY", "AMOUNT", "SHIPDATE"]
+    assert len(xView) == 5
+    assert not xView.isdeleted()
+    with pytest.raises(KeyError):
+        xView["NOTAFIELD"]
+    with pytest.raises(AttributeError):
+        xView.NOTAFIELD
+    with pytest.raises(AttributeError):
+        xView.QTY = 2
+
+
+def test_scan_views(vfp):
+    vfp.select("SHIP")
+    xDicts = list(vfp.scan("CUSTNO", forExpr="QTY >= 3"))
+    for nBatch in (0, 1, 4):
+        xViews = list(vfp.scan("CUSTNO", forExpr="QTY >= 3", batchSize=nBatch, view=True))
+        assert [xView.todict() for xView in xViews] == xDicts
+    assert [xView.SHIPNO for xView in xViews] == [1, 3, 5, 6]
+
+
+def test_no_current_record(vfp):
+    vfp.select("SHIP")
+    vfp.goto("BOTTOM")
+    vfp.skip(1)
+    assert vfp.scatterview() is None
+    assert vfp.nErrorNumber != 0
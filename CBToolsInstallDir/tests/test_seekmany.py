@@ -0,0 +1,26 @@
+"""
+seekmany() and cachedlookup() on a tag on an I field find whole number keys only.
+"""
+from decimal import Decimal
+
+import pytest
+
+
+@pytest.mark.parametrize("xKey", [3.7, 2.5, -0.5, Decimal("3.7"), float("nan"), float("inf")])
+def test_fractional_key_on_integer_tag_is_not_found(vfp, xKey):
+    assert vfp.seekmany("SHIP", "QTY", [xKey]) == [None]
+    assert vfp.tally == 0
+    assert vfp.cachedlookup("SHIP", "QTY", xKey) is None
+
+
+def test_mixed_keys_stay_aligned(vfp):
+    xRecords = vfp.seekmany("SHIP", "QTY", [5, 3.7, 1, 4.0, Decimal("2")], missing={})
+    assert [xRec.get("SHIPNO") for xRec in xRecords] == [3, None, 2, 5, 4]
+    assert vfp.tally == 4
+    assert vfp.cachedlookup("SHIP", "QTY", 4.0)["SHIPNO"] == 5
+
+
+def test_current_order_integer_tag(vfp):
+    vfp.select("SHIP")
+    vfp.setorderto("QTY")
+    assert vfp.seekmany("", "", [3.7, 5], asDict=True) == {3.7: None, 5: vfp.seekmany("", "", [5])[0]}
@@ -0,0 +1,33 @@
+"""
+SessionPool keeps one table per alias in a session, so its open table count and cache hits stay true.
+"""
+import CodeBaseTools
+
+
+def test_tables_on_one_alias_replace_each_other(shippath):
+    oPool = CodeBaseTools.SessionPool(maxSessions=1, cEngine="reader")
+    for xTable in [(shippath, True), (shippath, True, False, "SHIP"), (shippath, False)]:
+        oCBT = oPool.checkout([xTable])
+        assert oCBT is not None, oPool.cErrorMessage
+        assert oCBT.alias() == "SHIP"
+        oPool.checkin(oCBT)
+        assert oPool.stats()["openTables"] == 1
+    oCBT = oPool.checkout([(shippath, True)])
+    assert oPool.stats()["hits"] == 0  # The read write table holds SHIP, so the read only one is opened again.
+    oPool.checkin(oCBT)
+    oCBT = oPool.checkout([(shippath, True)])
+    assert oPool.stats()["hits"] == 1
+    oPool.checkin(oCBT)
+    oPool.close()
+
+
+def test_one_checkout_needs_an_alias_per_table(shippath):
+    oPool = CodeBaseTools.SessionPool(maxSessions=1, cEngine="reader")
+    assert oPool.checkout([(shippath, True), (shippath, False)]) is None
+    assert oPool.nErrorNumber == -9969
+    oCBT = oPool.checkout([(shippath, True), (shippath, False, False, "SHIP2")])
+    assert oCBT is not None, oPool.cErrorMessage
+    assert oCBT.used("SHIP") and oCBT.used("SHIP2")
+    assert oPool.stats()["openTables"] == 2
+    oPool.checkin(oCBT)
+    oPool.close()
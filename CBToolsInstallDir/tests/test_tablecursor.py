@@ -0,0 +1,60 @@
+"""
+TableCursor: independent record pointers, orders, filters and locates on one open of a table.
+"""
+import pytest
+
+
+def test_cursors_move_independently(vfp):
+    vfp.select("SHIP")
+    vfp.goto("RECORD", 4)
+    oByCust = vfp.tablecursor("SHIP", order="CUSTNO")
+    oByQty = vfp.tablecursor("SHIP", order="QTY")
+    assert (oByCust.recno(), oByQty.recno()) == (1, 2)
+    assert oByCust.skip(2) and oByQty.skip(1)
+    assert oByCust.scatter()["SHIPNO"] == 2
+    assert oByQty.scatter()["SHIPNO"] == 4
+    assert (oByCust.order(), oByQty.order()) == ("CUSTNO", "QTY")
+    assert vfp.recno() == 4
+    assert vfp.order() == ""
+
+
+def test_nested_scan_with_lookups(vfp):
+    oOuter = vfp.tablecursor("SHIP", order="CUSTNO")
+    oInner = vfp.tablecursor("SHIP", order="QTY")
+    xPairs = []
+    for xRec in oOuter.scan(batchSize=2):
+        assert oInner.seek(str(xRec["QTY"]))
+        xPairs.append((xRec["SHIPNO"], oInner.scatter()["SHIPNO"]))
+    assert xPairs == [(1, 1), (3, 3), (2, 2), (5, 5), (4, 4), (6, 1)]
+
+
+def test_filter(vfp):
+    oCursor = vfp.tablecursor("SHIP", order="")
+    assert oCursor.setfilter("QTY >= 3")
+    assert oCursor.goto("TOP") and oCursor.recno() == 1
+    assert oCursor.skip(1) and oCursor.recno() == 3
+    assert oCursor.goto("NEXT") and oCursor.recno() == 5
+    assert oCursor.goto("BOTTOM") and oCursor.recno() == 6
+    assert list(oCursor.scan(noData=True)) == [1, 3, 5, 6]
+    assert [xView.SHIPNO for xView in oCursor.scan(forExpr="CUSTNO = 'C001'", view=True)] == [1, 3]
+    assert not oCursor.setfilter("QTY >=")
+    assert oCursor.filter() == "QTY >= 3"
+
+
+def test_locate_per_cursor(vfp):
+    oOne = vfp.tablecursor("SHIP", order="")
+    oTwo = vfp.tablecursor("SHIP", order="")
+    assert oOne.locate("CUSTNO = 'C002'") and oOne.recno() == 2
+    assert oTwo.locate("QTY = 3") and oTwo.recno() == 1
+    assert oOne.locatecontinue() and oOne.recno() == 5
+    assert oTwo.locatecontinue() and oTwo.recno() == 6
+    assert not oOne.locatecontinue()
+    oOne.locateclear()
+    assert not oOne.locatecontinue()
+    assert oOne.nErrorNumber == -79004
+
+
+@pytest.mark.parametrize("cAlias, xOrder", [("NOTOPEN", None), ("SHIP", "NOTATAG")])
+def test_bad_alias_or_order(vfp, cAlias, xOrder):
+    with pytest.raises(ValueError):
+        vfp.tablecursor(cAlias, order=xOrder)
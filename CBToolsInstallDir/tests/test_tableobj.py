@@ -0,0 +1,25 @@
+"""
+TableObj reads the same field values in cursor mode as in plain mode.
+"""
+from conftest import SHIPFIELDS
+
+
+def _rows(oTable):
+    return [dict((xF[0], oTable[xF[0]]) for xF in SHIPFIELDS) for xRec in oTable]
+
+
+def test_cursor_mode_matches_plain_mode(vfp, shippath):
+    xPlain = _rows(vfp.TableObj(shippath, readOnly=True))
+    for nBatch in (1, 4, 100):
+        xCursor = _rows(vfp.TableObj(shippath, readOnly=True, cursor=True, batchSize=nBatch))
+        assert xCursor == xPlain
+    assert xPlain[0]["CUSTNO"] == "C001"
+
+
+def test_cursor_mode_first_read_matches_plain_mode(vfp, shippath):
+    oPlain = vfp.TableObj(shippath, readOnly=True)
+    oPlain.goto("TOP")
+    cPlain = oPlain.CUSTNO
+    oCursor = vfp.TableObj(shippath, readOnly=True, cursor=True)
+    oCursor.goto("TOP")
+    assert oCursor.CUSTNO == cPlain == "C001"
@@ -0,0 +1,97 @@
+"""
+replacewhere() and deletewhere().  The reader engine can't write, so the engine side of the pass is played by
+_Engine, which takes the calls meant for the engine and otherwise hands them on to the reader.
+"""
+import CodeBaseTools
+
+
+class _Engine(object):
+    """
+    Stands in for the engine of a _cbTools instance.  replacewhere() and deletewhere() are recorded, and answer
+    with the count xDone and the error (cMessage, nError) as the engine does when its pass stops part way.
+    """
+    def __init__(self, oReal, xDone=0, cMessage="", nError=0):
+        self._oReal = oReal
+        self._xDone = xDone
+        self._cMessage = cMessage
+        self._nError = nError
+        self._bCalled = False
+        self.xCalls = []
+
+    def __getattr__(self, cName):
+        return getattr(self._oReal, cName)
+
+    def _pass(self, cName, xArgs):
+        self.xCalls.append((cName, xArgs))
+        self._bCalled = True
+        return self._xDone
+
+    def replacewhere(self, *xArgs):
+        return self._pass("replacewhere", xArgs)
+
+    def deletewhere(self, *xArgs):
+        return self._pass("deletewhere", xArgs)
+
+    def gettally(self):
+        return (self._xDone or 0) if self._bCalled else self._oReal.gettally()
+
+    def geterrornumber(self):
+        return self._nError if self._bCalled else self._oReal.geterrornumber()
+
+    def geterrormessage(self):
+        return self._cMessage if self._bCalled else self._oReal.geterrormessage()
+
+
+def test_bad_value_stops_pass_and_sets_error(vfp):
+    vfp.cbt = _Engine(vfp.cbt, xDone=2, cMessage="Couldn't save data to field AMOUNT: bad value", nError=-13590)
+    assert vfp.replacewhere("SHIP", "", {"AMOUNT": 10.0}) == -1
+    assert vfp.nErrorNumber == -13590
+    assert vfp.cErrorMessage.startswith("Couldn't save data to field AMOUNT")
+    assert vfp.tally == 2
+
+
+def test_bad_value_is_refused_before_the_engine(vfp):
+    oEngine = _Engine(vfp.cbt, xDone=6)
+    vfp.cbt = oEngine
+    assert vfp.replacewhere("SHIP", "", {"AMOUNT": "12,50"}) == -1
+    assert vfp.nErrorNumber == -13590
+    assert "AMOUNT" in vfp.cErrorMessage
+    assert oEngine.xCalls == []
+
+
+def test_replacewhere_passes_values_and_planner_records(vfp):
+    oEngine = _Engine(vfp.cbt, xDone=4)
+    vfp.cbt = oEngine
+    vfp.select("SHIP")
+    vfp.setorderto("CUSTNO")
+    assert vfp.replacewhere("ship", "QTY >= 3", {"amount": 1.5, "CUSTNO": "C009", "NOTAFIELD": 1,
+                                                 "QTY": CodeBaseTools.VFPEXPR("QTY + 1")}) == 4
+    assert vfp.tally == 4
+    assert vfp.nErrorNumber == 0
+    cName, xArgs = oEngine.xCalls[0]
+    assert cName == "replacewhere"
+    assert xArgs[:2] == ("SHIP", "QTY >= 3")
+    assert dict(zip(xArgs[2].split(","), xArgs[3])) == {"AMOUNT": 1.5, "CUSTNO": "C009"}
+    assert (xArgs[4], xArgs[5]) == ("QTY", ["QTY + 1"])
+    assert sorted(xArgs[7]) == [1, 3, 5, 6]
+    assert vfp.order() == "CUSTNO"
+
+
+def test_deletewhere_passes_all_records_without_filter(vfp):
+    oEngine = _Engine(vfp.cbt, xDone=6)
+    vfp.cbt = oEngine
+    assert vfp.deletewhere("SHIP") == 6
+    assert oEngine.xCalls == [("deletewhere", ("SHIP", "", None, 1000))]
+
+
+def test_no_matching_fields(vfp):
+    assert vfp.replacewhere("SHIP", "", {"NOTAFIELD": 1}) == -1
+    assert vfp.nErrorNumber == -9985
+
+
+def test_read_only_engine_reports_error(vfp):
+    assert vfp.replacewhere("SHIP", "QTY = 3", {"QTY": 4}) == -1
+    assert vfp.nErrorNumber != 0
+    assert vfp.deletewhere("SHIP", "QTY = 3") == -1
+    assert vfp.nErrorNumber != 0
+    assert vfp.tally == 0